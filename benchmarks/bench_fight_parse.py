@@ -0,0 +1,166 @@
+# micro-benchmark: per page parse time of fight pages, old multi-pass
+# extraction vs single pass extractor on the same tree.
+# checks both give identical dicts.
+#
+# run from repo root:
+# python -m benchmarks.bench_fight_parse
+# python -m benchmarks.bench_fight_parse --archive data/fixtures.zip --parser lxml
+
+import argparse
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from src.ufctools.filepaths_and_schema import web_fight_cols, web_strike_cols
+from src.ufctools.fixtures import FixtureArchive, generate_synthetic_site
+from src.ufctools.scraping import FightDataScraper
+from src.ufctools.utils import add_prefix_label, add_suffix_label
+
+# old multi-pass extractor, kept here as the reference the single pass
+# extractor (FightDataScraper.parse_fight_page) is timed and checked against.
+# each helper does its own find/findAll over the whole page.
+
+
+def multi_pass_stats(scraper, fight_link, fight_soup):
+    # get_fight_stats as it was before the single pass extractor
+    fight_stats = {"FIGHT_ID": fight_link.split("/")[-1], "FIGHT_LINK": fight_link}
+    fight_stats.update(get_fighters(scraper, fight_soup))
+    fight_stats.update(get_fight_attr(scraper, fight_soup))
+    fight_stats.update(
+        get_fight_table_stats(
+            scraper,
+            fight_soup,
+            header_lbls=web_fight_cols,
+            omit_lbls=["FIGHTER", "SIG_STR", "SIG_STR_PCT"],
+            table_index=0,
+        )
+    )
+    fight_stats.update(
+        get_fight_table_stats(
+            scraper,
+            fight_soup,
+            header_lbls=web_strike_cols,
+            omit_lbls=["FIGHTER"],
+            table_index=2,
+        )
+    )
+    return fight_stats
+
+
+def get_fighters(scraper, fight_soup):
+    r_raw, b_raw = fight_soup.find_all("div", {"class": "b-fight-details__person"})
+    r = scraper._get_fighter(r_raw)
+    b = scraper._get_fighter(b_raw)
+    return add_prefix_label(r, "R") | add_prefix_label(b, "B")
+
+
+def get_fight_attr(scraper, fight_soup):
+    attr_raw = fight_soup.find("div", {"class": "b-fight-details__fight"})
+    return scraper._parse_fight_attr(attr_raw)
+
+
+def get_fight_table_stats(scraper, fight_soup, header_lbls, omit_lbls, table_index):
+    # table_index: 0 for other stats, 2 for strike stats. totals table first,
+    # then the round by round table
+    tables = fight_soup.find_all("tbody")
+    stats_dict = unpack_table_row(
+        scraper, tables[table_index].find("tr"), header_lbls, omit_lbls
+    )
+    stats_dict = add_suffix_label(stats_dict, "TOT")
+    stats_dict.update(
+        parse_round_table(scraper, tables[table_index + 1], header_lbls, omit_lbls)
+    )
+    return stats_dict
+
+
+def parse_round_table(scraper, round_tbody_soup, header_lbls, omit_lbls):
+    # look for the text elements with the word "Round" in them and
+    # parse the first tr element after each
+    all_round_stats = {}
+    round_text_elts = round_tbody_soup.find_all(string=re.compile("Round"))
+    for round_num, elt in enumerate(round_text_elts, start=1):
+        round_stats_dict = unpack_table_row(
+            scraper, elt.find_next("tr"), header_lbls, omit_lbls
+        )
+        all_round_stats.update(add_suffix_label(round_stats_dict, f"R{round_num}"))
+    return all_round_stats
+
+
+def unpack_table_row(scraper, tr_soup, header_lbls, omit_lbls):
+    return scraper._unpack_cells(tr_soup.find_all("td"), header_lbls, omit_lbls)
+
+
+def time_per_page(func, pages, repeat):
+    best = float("inf")
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(link, html) for link, html in pages]
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fight page parse benchmark")
+    parser.add_argument("--archive", help="fixture archive (.zip), default synthetic")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--parser", default="html.parser")
+    args = parser.parse_args()
+
+    if args.archive:
+        archive = FixtureArchive.load(args.archive)
+    else:
+        archive = generate_synthetic_site(
+            n_events=args.pages // 10 + 1, fights_per_event=10, n_fighters=200
+        )
+    pages = [
+        (archive.base_url + path, html.encode("ascii", "replace"))
+        for path, html in sorted(archive.pages.items())
+        if path.startswith("/fight-details/")
+    ][: args.pages]
+
+    # parser/extractors don't touch network, no need to go through __init__
+    scraper = FightDataScraper.__new__(FightDataScraper)
+
+    def make_soup(link, html):
+        return BeautifulSoup(html, args.parser)
+
+    def before(link, html):
+        return multi_pass_stats(scraper, link, make_soup(link, html))
+
+    def after(link, html):
+        return scraper.parse_fight_page(link, make_soup(link, html))
+
+    soups = [(link, make_soup(link, html)) for link, html in pages]
+
+    rows = [
+        ("build tree", time_per_page(make_soup, pages, args.repeat)[0]),
+        (
+            "extract (multi-pass)",
+            time_per_page(
+                lambda link, soup: multi_pass_stats(scraper, link, soup),
+                soups,
+                args.repeat,
+            )[0],
+        ),
+        (
+            "extract (single pass)",
+            time_per_page(scraper.parse_fight_page, soups, args.repeat)[0],
+        ),
+    ]
+    before_ms, before_results = time_per_page(before, pages, args.repeat)
+    after_ms, after_results = time_per_page(after, pages, args.repeat)
+    rows += [("total before", before_ms), ("total after", after_ms)]
+
+    assert before_results == after_results, "extractors disagree"
+
+    print(f"{len(pages)} fight pages, parser={args.parser}, best of {args.repeat}")
+    for label, ms in rows:
+        print(f"{label:<24}{ms:8.3f} ms/page")
+    print(f"{'speedup':<24}{before_ms / after_ms:8.2f} x")
+
+
+if __name__ == "__main__":
+    main()
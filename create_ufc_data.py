@@ -1,24 +1,63 @@
 #moved this to root, might make it explode, fix later.
 
+import argparse
 import time
-from src.ufctools.legacy.preprocess import Preprocessor
-from src.ufctools.legacy.scrape_fight_data import FightDataScraper
-from src.ufctools.legacy.scrape_fighter_details import FighterDetailsScraper
-
-time_start = time.time()
-print("Creating fight data \n")
-fight_data_scraper = FightDataScraper()
-fight_data_scraper.create_fight_data_csv()  # Scrapes raw ufc fight data from website
-print(f'elapsed seconds = {(time.time() - time_start):.2f}')
-
-time_start = time.time()
-print("Creating fighter data \n")
-fighter_details_scraper = FighterDetailsScraper()
-fighter_details_scraper.create_fighter_data_csv()  # Scrapes raw ufc fighter data from website
-print(f'elapsed seconds = {(time.time() - time_start):.2f}')
-
-time_start = time.time()
-print("Starting Preprocessing \n")
-preprocessor = Preprocessor()
-preprocessor.process_raw_data()  # Preprocesses the raw data and saves the csv files in data folder
-print(f'elapsed seconds = {(time.time() - time_start):.3f}')
+
+parser = argparse.ArgumentParser()
+# the legacy preprocessor reads the text csvs the legacy scrapers write
+# (total_fight_data.csv, fighter_details.csv), not the typed fight log,
+# so data.csv/preprocessed_data.csv only come out of the default run
+parser.add_argument(
+    "--typed",
+    action="store_true",
+    help="scrape new fights into the typed fight log and refresh details of "
+    "just their fighters (no preprocessing)",
+)
+# preprocessing only handles fights the feature store hasn't seen by default
+parser.add_argument(
+    "--full-rebuild",
+    action="store_true",
+    help="preprocess every fight again instead of just the new ones",
+)
+args = parser.parse_args()
+
+if args.typed:
+    from src.ufctools.fighters import FighterDetailsRefresher
+    from src.ufctools.scraping import FightDataScraper
+
+    time_start = time.time()
+    print("Scraping new fights \n")
+    fight_data_scraper = FightDataScraper()
+    new_fights = fight_data_scraper.scrape_new_fights()  # None if nothing new
+    print(f'elapsed seconds = {(time.time() - time_start):.2f}')
+
+    time_start = time.time()
+    print("Refreshing fighter details \n")
+    # only the fighters in new fights (plus any whose last fetch failed),
+    # not a rescan of all 26 fighter listings
+    fighter_details_refresher = FighterDetailsRefresher()
+    fighter_details_refresher.refresh(new_fights)
+    print(f'elapsed seconds = {(time.time() - time_start):.2f}')
+else:
+    from src.ufctools.legacy.preprocess import Preprocessor
+    from src.ufctools.legacy.scrape_fight_data import FightDataScraper
+    from src.ufctools.legacy.scrape_fighter_details import FighterDetailsScraper
+
+    time_start = time.time()
+    print("Creating fight data \n")
+    fight_data_scraper = FightDataScraper()
+    fight_data_scraper.create_fight_data_csv()  # Scrapes raw ufc fight data from website
+    print(f'elapsed seconds = {(time.time() - time_start):.2f}')
+
+    time_start = time.time()
+    print("Creating fighter data \n")
+    fighter_details_scraper = FighterDetailsScraper()
+    fighter_details_scraper.create_fighter_data_csv()  # Scrapes raw ufc fighter data from website
+    print(f'elapsed seconds = {(time.time() - time_start):.2f}')
+
+    time_start = time.time()
+    print("Starting Preprocessing \n")
+    preprocessor = Preprocessor()
+    # Preprocesses the raw data and saves the csv files in data folder
+    preprocessor.process_raw_data(incremental=not args.full_rebuild)
+    print(f'elapsed seconds = {(time.time() - time_start):.3f}')
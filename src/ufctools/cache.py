@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.ufctools.fileio import atomic_write
+from src.ufctools.throttle import FetchError
+from src.ufctools.filepaths_and_schema import HTML_CACHE_PATH
+
+# persistent on disk cache of scraped pages.
+# layout under cache dir:
+#   objects/<sha256 of page>.html.gz -- gzipped page bodies, content addressed
+#                                       so identical pages are only stored once
+#   urls/<sha1 of url>.json          -- one entry per url pointing at its body,
+#                                       with validators for conditional GETs
+# e.g.
+# {
+#     "url": "http://ufcstats.com/fight-details/eaa885cf7ae31e0b",
+#     "content_hash": "9f86d08...",
+#     "etag": null,
+#     "last_modified": "Sat, 04 Apr 2020 07:12:03 GMT",
+#     "fetched_at": 1586000000.0
+# }
+# only etag and last_modified are sent as validators (If-None-Match /
+# If-Modified-Since). content_hash is just where the body is stored, the server
+# never sees it, so a url with neither validator is fetched in full on revalidate.
+
+# cache modes used by fetching layer
+# off        - never touch the cache
+# revalidate - conditional GET with stored validators, 304 served from cache
+# prefer     - serve from cache without asking the server, fetch on miss
+#              (fine for fight/fighter pages of completed events, they don't change)
+# only       - serve from cache, never hit the network (miss raises CacheMissError)
+CACHE_MODES = ("off", "revalidate", "prefer", "only")
+
+
+class CacheMissError(FetchError, LookupError):
+    # a FetchError so callers treat a page missing from the cache like one that
+    # couldn't be fetched, e.g. its event stays unscraped instead of losing fights
+    pass
+
+
+class HTMLCache:
+    def __init__(self, cache_dir: Path = HTML_CACHE_PATH):
+        self.CACHE_DIR = Path(cache_dir)
+        self.OBJECTS_PATH = self.CACHE_DIR / "objects"
+        self.URLS_PATH = self.CACHE_DIR / "urls"
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, url: str) -> Path:
+        url_key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        # two char fan out so no single directory ends up with ~10k files
+        return self.URLS_PATH / url_key[:2] / f"{url_key}.json"
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.OBJECTS_PATH / content_hash[:2] / f"{content_hash}.html.gz"
+
+    def get(self, url: str) -> Optional[Dict]:
+        # returns url entry if url cached and its body is present, otherwise None
+        entry_path = self._entry_path(url)
+        if not entry_path.exists():
+            return None
+        with open(entry_path, "r") as f:
+            entry = json.load(f)
+        if not self._object_path(entry["content_hash"]).exists():
+            return None
+        return entry
+
+    def read(self, entry: Dict) -> str:
+        with open(self._object_path(entry["content_hash"]), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def get_text(self, url: str) -> Optional[str]:
+        entry = self.get(url)
+        return None if entry is None else self.read(entry)
+
+    def put(
+        self,
+        url: str,
+        text: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Dict:
+        content_hash = self.content_hash(text)
+        object_path = self._object_path(content_hash)
+
+        # same content already stored (under this url or another) -> just repoint entry
+        if not object_path.exists():
+            with atomic_write(object_path, "wb") as f:
+                f.write(gzip.compress(text.encode("utf-8")))
+
+        entry = {
+            "url": url,
+            "content_hash": content_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        self._write_entry(entry)
+        return entry
+
+    def touch(self, entry: Dict) -> Dict:
+        # server confirmed cached copy still valid (304), only bump timestamp
+        entry = dict(entry, fetched_at=time.time())
+        self._write_entry(entry)
+        return entry
+
+    def _write_entry(self, entry: Dict) -> None:
+        with atomic_write(self._entry_path(entry["url"]), "w") as f:
+            json.dump(entry, f)
+
+    @staticmethod
+    def validator_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        # headers for conditional GET given cached entry
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
@@ -0,0 +1,111 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Set
+
+from src.ufctools.filepaths_and_schema import SCRAPE_JOURNAL_PATH
+
+# append only journal of scraped events so a long scrape can be resumed.
+# one json line per event, holding the event's fight rows:
+# {
+#     "event_id": "6420efac0578988b",
+#     "event_link": "http://ufcstats.com/event-details/6420efac0578988b",
+#     "fight_links": ["http://ufcstats.com/fight-details/eaa885cf7ae31e0b", ...],
+#     "records": [{"FIGHT_ID": "eaa885cf7ae31e0b", ...}, ...]
+# }
+# a line is the commit: the rows and the "this event is scraped" flag are
+# written (and fsynced) together, so an event is either fully in the journal
+# or not in it at all. a line torn by a crash mid write is dropped on load.
+
+
+class ScrapeJournal:
+    def __init__(self, journal_path: Path = SCRAPE_JOURNAL_PATH):
+        self.JOURNAL_PATH = Path(journal_path)
+        # event ids committed so far (records are left on disk)
+        self.event_ids: Set[str] = set()
+        self._file = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self.JOURNAL_PATH.exists():
+            return
+        good_size = 0
+        with open(self.JOURNAL_PATH, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn write from a crash, everything after it is garbage
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self.event_ids.add(entry["event_id"])
+                good_size += len(line)
+        # cut off partial tail so new commits don't get glued onto it
+        if good_size != self.JOURNAL_PATH.stat().st_size:
+            with open(self.JOURNAL_PATH, "r+b") as f:
+                f.truncate(good_size)
+
+    def __len__(self) -> int:
+        return len(self.event_ids)
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self.event_ids
+
+    def commit(
+        self,
+        event_id: str,
+        event_link: str,
+        fight_links: List[str],
+        records: List[Dict],
+    ) -> None:
+        # durably record one finished event
+        if self._file is None:
+            self.JOURNAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.JOURNAL_PATH, "a", encoding="utf-8")
+        entry = {
+            "event_id": event_id,
+            "event_link": event_link,
+            "fight_links": fight_links,
+            "records": records,
+        }
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.event_ids.add(event_id)
+
+    def iter_entries(self) -> Iterator[Dict]:
+        # streams committed events back, one at a time
+        if not self.JOURNAL_PATH.exists():
+            return
+        with open(self.JOURNAL_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def iter_records(self) -> Iterator[Dict]:
+        for entry in self.iter_entries():
+            yield from entry["records"]
+
+    def iter_chunks(self, max_rows: int) -> Iterator[List[Dict]]:
+        # records in lists of whole events, up to max_rows each (an event with
+        # more rows than that gets a chunk to itself)
+        chunk = []
+        for entry in self.iter_entries():
+            if chunk and len(chunk) + len(entry["records"]) > max_rows:
+                yield chunk
+                chunk = []
+            chunk.extend(entry["records"])
+        if chunk:
+            yield chunk
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def clear(self) -> None:
+        # called once journal contents are merged into fight data
+        self.close()
+        if self.JOURNAL_PATH.exists():
+            os.remove(self.JOURNAL_PATH)
+        self.event_ids = set()
@@ -0,0 +1,231 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.ufctools.fileio import atomic_write
+from src.ufctools.filepaths_and_schema import RAW_FIGHT_DATASET_PATH
+
+# typed, columnar (parquet) copy of fight data, partitioned by event year:
+#   <dataset dir>/YEAR=2019/data.parquet
+#   <dataset dir>/YEAR=2020/data.parquet
+# reading only the years/columns/rows asked for skips most of the data
+# instead of re-parsing hundreds of wide string columns out of a csv.
+# works for raw fight data or any processed frame with a date column.
+#
+# pyarrow is only imported when a dataset is actually read or written,
+# so the rest of the package works without it.
+
+PARTITION_FILE = "data.parquet"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("columnar datasets need pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+class ColumnarDataset:
+    def __init__(
+        self, dataset_dir: Path = RAW_FIGHT_DATASET_PATH, date_col: str = "EVENT_DATE"
+    ):
+        """
+        Args:
+            dataset_dir (Path): root directory of dataset
+            date_col (str): datetime column rows are partitioned (by year) and
+                date filtered on
+        """
+        self.DATASET_DIR = Path(dataset_dir)
+        self.date_col = date_col
+
+    def _partition_path(self, year: int) -> Path:
+        return self.DATASET_DIR / f"YEAR={year}" / PARTITION_FILE
+
+    def years(self) -> List[int]:
+        if not self.DATASET_DIR.exists():
+            return []
+        return sorted(
+            int(path.parent.name.split("=")[1])
+            for path in self.DATASET_DIR.glob(f"YEAR=*/{PARTITION_FILE}")
+        )
+
+    def columns(self) -> List[str]:
+        # union of columns over all partitions, in first seen order
+        pa = _import_pyarrow()
+        columns = {}
+        for year in self.years():
+            schema = pa.parquet.read_schema(self._partition_path(year))
+            columns.update(dict.fromkeys(schema.names))
+        return list(columns)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Upserts rows into dataset. only partitions (years) present in df are
+        rewritten, rows already in them with the same index are replaced.
+
+        Args:
+            df (pd.DataFrame): rows to write, with a named unique index
+                (e.g. FIGHT_ID) and datetime date_col
+        """
+        _import_pyarrow()
+        missing_date = df[self.date_col].isna()
+        if missing_date.any():
+            print(f"{missing_date.sum()} row/s with no {self.date_col} not written")
+            df = df[~missing_date]
+        df = to_typed(df)
+        for year, year_df in df.groupby(df[self.date_col].dt.year):
+            year = int(year)
+            existing_df = self._read_partition(year)
+            if existing_df is not None:
+                existing_df = existing_df.drop(year_df.index, errors="ignore")
+                year_df = pd.concat([year_df, existing_df])
+            self._write_partition(year, year_df)
+
+    def _write_partition(self, year: int, year_df: pd.DataFrame) -> None:
+        pa = _import_pyarrow()
+        # sorted by date so parquet row group stats can skip on date filters
+        year_df = year_df.sort_values(self.date_col, ascending=False, kind="stable")
+        table = pa.Table.from_pandas(year_df, preserve_index=True)
+        partition_path = self._partition_path(year)
+        with atomic_write(partition_path, mode="wb") as f:
+            pa.parquet.write_table(table, f)
+
+    def _read_partition(self, year: int) -> Optional[pd.DataFrame]:
+        pa = _import_pyarrow()
+        partition_path = self._partition_path(year)
+        if not partition_path.exists():
+            return None
+        return pa.parquet.read_table(partition_path).to_pandas()
+
+    def read(
+        self,
+        columns: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+        filters: Optional[Dict[str, Iterable]] = None,
+    ) -> pd.DataFrame:
+        """
+        Reads rows/columns of dataset. only partitions in the date range are
+        opened and filters are pushed down to the parquet reader.
+
+        Args:
+            columns (Iterable[str], optional): columns to load (plus index).
+                all columns if None
+            start_date (optional): only rows with date_col on or after this
+            end_date (optional): only rows with date_col on or before this
+            filters (Dict[str, Iterable], optional): column -> allowed values,
+                e.g. {"WEIGHT_CLASS": ["LIGHTWEIGHT", "WELTERWEIGHT"]}
+
+        Returns:
+            pd.DataFrame: matching rows, newest first
+        """
+        pa = _import_pyarrow()
+        ds = pa.dataset
+        start = None if start_date is None else pd.Timestamp(start_date)
+        end = None if end_date is None else pd.Timestamp(end_date)
+
+        expr = None
+        if start is not None:
+            expr = _and(expr, ds.field(self.date_col) >= start.to_pydatetime())
+        if end is not None:
+            expr = _and(expr, ds.field(self.date_col) <= end.to_pydatetime())
+        for col, values in (filters or {}).items():
+            values = list(values)
+            col_expr = ds.field(col) == values[0]
+            for value in values[1:]:
+                col_expr = col_expr | (ds.field(col) == value)
+            expr = _and(expr, col_expr)
+
+        frames = []
+        for year in reversed(self.years()):
+            # partition pruning
+            if start is not None and year < start.year:
+                continue
+            if end is not None and year > end.year:
+                continue
+            dataset = ds.dataset(self._partition_path(year), format="parquet")
+            names = dataset.schema.names
+            read_cols = None
+            if columns is not None:
+                # index is stored as a column, partitions may lack some columns
+                index_cols = _index_columns(dataset.schema)
+                read_cols = [c for c in index_cols if c in names] + [
+                    c for c in columns if c in names and c not in index_cols
+                ]
+            table = dataset.to_table(columns=read_cols, filter=expr)
+            frames.append(_table_to_pandas(table, dataset.schema))
+
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames)
+        if columns is not None:
+            df = df.reindex(columns=[c for c in columns if c != df.index.name])
+        return df
+
+
+def _and(expr, other):
+    return other if expr is None else expr & other
+
+
+def _index_columns(schema) -> List[str]:
+    # index columns recorded by pyarrow's pandas metadata
+    metadata = schema.pandas_metadata or {}
+    return [col for col in metadata.get("index_columns", []) if isinstance(col, str)]
+
+
+def _table_to_pandas(table, schema) -> pd.DataFrame:
+    df = table.to_pandas()
+    index_cols = [c for c in _index_columns(schema) if c in df.columns]
+    if index_cols:
+        df = df.set_index(index_cols)
+    return df
+
+
+def to_typed(df: pd.DataFrame) -> pd.DataFrame:
+    # text columns that are entirely numbers become numeric columns,
+    # everything else (e.g. "10 of 20", "55%", "3:51") stays as strings
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            continue
+        if pd.api.types.is_datetime64_any_dtype(series):
+            continue
+        numeric = pd.to_numeric(series, errors="coerce")
+        if numeric.notna().sum() == series.notna().sum():
+            df[col] = numeric
+        else:
+            df[col] = series.where(series.isna(), series.astype(str))
+    return df
+
+
+def add_event_info(
+    fight_df: pd.DataFrame,
+    event_df: pd.DataFrame,
+    fight_links: Dict[str, List[str]],
+) -> pd.DataFrame:
+    """
+    Adds EVENT_ID/EVENT_DATE to fight data, which only has fight links.
+
+    Args:
+        fight_df (pd.DataFrame): fight data (e.g. FightDataScraper.fight_data)
+        event_df (pd.DataFrame): event data (e.g. UFCLinks.EVENT_DATA)
+        fight_links (Dict[str, List[str]]): event link -> fight links
+            (e.g. UFCLinks.FIGHT_LINKS)
+
+    Returns:
+        pd.DataFrame: fight_df with EVENT_ID and EVENT_DATE columns
+    """
+    event_ids = {
+        fight_link: event_link.split("/")[-1]
+        for event_link, links in fight_links.items()
+        for fight_link in links
+    }
+    fight_df = fight_df.copy()
+    fight_df["EVENT_ID"] = fight_df["FIGHT_LINK"].map(event_ids)
+    fight_df["EVENT_DATE"] = fight_df["EVENT_ID"].map(event_df["DATE"])
+    return fight_df
@@ -0,0 +1,189 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from src.ufctools.fetching import DEFAULT_POOL_SIZE, ensure_pool_size
+from src.ufctools.throttle import FetchError
+
+# asyncio crawl engine for event -> fight pages.
+# event pages and fight pages go through one shared semaphore so the whole
+# crawl is pipelined: as soon as an event page comes back its fight pages get
+# queued, instead of walking events (and then fights) one round trip at a time.
+#
+# the actual http calls are still the blocking pooled session from fetching.py
+# run on a thread pool (no async http client in requirements), asyncio is
+# doing the scheduling/bounding.
+
+# callback signatures
+# event_fetcher: event link -> list of fight links on that event page
+# fight_fetcher: fight link -> dict of fight stats
+# on_event: called once per event as soon as all its fights are done
+EventFetcher = Callable[[str], List[str]]
+FightFetcher = Callable[[str], dict]
+EventCallback = Callable[[str, List[str], List[dict]], None]
+
+
+class AsyncCrawler:
+    def __init__(self, max_concurrency: int = DEFAULT_POOL_SIZE):
+        self.max_concurrency = max_concurrency
+        # no point having more requests in flight than pooled connections
+        ensure_pool_size(max_concurrency)
+
+    def crawl(
+        self,
+        event_links: Iterable[str],
+        event_fetcher: EventFetcher,
+        fight_fetcher: Optional[FightFetcher] = None,
+        known_fight_links: Optional[Dict[str, List[str]]] = None,
+        on_event: Optional[EventCallback] = None,
+        keep_records: bool = True,
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[dict]]]:
+        """
+        Crawls event pages and (optionally) their fight pages as one pipeline.
+
+        Args:
+            event_links (Iterable[str]): events to crawl
+            event_fetcher (EventFetcher): gets list of fight links from event link
+            fight_fetcher (FightFetcher, optional): gets stats dict from fight link.
+                if None, only fight links are collected.
+            known_fight_links (Dict[str, List[str]], optional): events with fight
+                links already scraped. these skip the event page fetch.
+            on_event (EventCallback, optional): called with
+                (event_link, fight_links, fight_records) as each event finishes
+            keep_records (bool): if False, fight records are dropped once on_event
+                has had them, so memory is bounded by events in flight
+
+        Returns:
+            Tuple[Dict, Dict]: (event link -> fight links, event link -> fight records).
+            both keyed in same order as event_links, events that failed are left out.
+        """
+        return _run_coroutine(
+            self._crawl(
+                list(event_links),
+                event_fetcher,
+                fight_fetcher,
+                known_fight_links or {},
+                on_event,
+                keep_records,
+            )
+        )
+
+    async def _crawl(
+        self,
+        event_links: List[str],
+        event_fetcher: EventFetcher,
+        fight_fetcher: Optional[FightFetcher],
+        known_fight_links: Dict[str, List[str]],
+        on_event: Optional[EventCallback],
+        keep_records: bool,
+    ):
+        self._keep_records = keep_records
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._lock = asyncio.Lock()
+        self._progress = tqdm(total=len(event_links), unit="event")
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency
+        ) as executor:
+            self._executor = executor
+            results = await asyncio.gather(
+                *[
+                    self._crawl_event(
+                        link, event_fetcher, fight_fetcher, known_fight_links, on_event
+                    )
+                    for link in event_links
+                ]
+            )
+        self._progress.close()
+
+        event_fight_dict = {}
+        event_records = {}
+        for link, result in zip(event_links, results):
+            if result is None:
+                continue
+            event_fight_dict[link], event_records[link] = result
+
+        return event_fight_dict, event_records
+
+    async def _call(self, func, link):
+        # bounded by semaphore so at most max_concurrency requests in flight
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, link)
+
+    async def _crawl_event(
+        self, event_link, event_fetcher, fight_fetcher, known_fight_links, on_event
+    ):
+        if event_link in known_fight_links:
+            fight_links = known_fight_links[event_link]
+        else:
+            try:
+                fight_links = await self._call(event_fetcher, event_link)
+            except Exception as e:
+                print(f"error processing {event_link}: {e}")
+                self._progress.update()
+                return None
+
+        fight_records = []
+        if fight_fetcher is not None:
+            # gather keeps fight order the same as the event page
+            try:
+                results = await asyncio.gather(
+                    *[self._crawl_fight(link, fight_fetcher) for link in fight_links]
+                )
+            except FetchError as e:
+                # a fight page that couldn't be fetched even after retries fails
+                # the whole event, so it stays unscraped and is picked up next run
+                # rather than being committed with missing fights
+                print(f"error processing {event_link}, leaving unscraped: {e}")
+                self._progress.update()
+                return None
+            fight_records = [record for record in results if record is not None]
+
+        if on_event is not None:
+            # serialize callbacks so they don't have to be thread/task safe
+            async with self._lock:
+                on_event(event_link, fight_links, fight_records)
+            if not self._keep_records:
+                fight_records = []
+
+        self._progress.update()
+        return fight_links, fight_records
+
+    async def _crawl_fight(self, fight_link, fight_fetcher):
+        # fetch failures (already retried by fetch layer) propagate to the event.
+        # pages that come back but don't parse are reported and skipped.
+        try:
+            return await self._call(fight_fetcher, fight_link)
+        except FetchError:
+            raise
+        except Exception as e:
+            print(f"error processing {fight_link}: {e}")
+            return None
+
+
+def _run_coroutine(coro):
+    # asyncio.run blows up if there's already a running loop (e.g. jupyter),
+    # in that case run the crawl on its own loop in a helper thread
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
@@ -0,0 +1,70 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# date based fighter features computed on whole columns:
+# - age at fight
+# - days since fighter's previous fight (current layoff)
+# - longest layoff of fighter's career so far
+# missing dates (e.g. no DOB on record) give NaN, first fights have no layoff.
+
+DAYS_PER_YEAR = 365.25
+
+
+def age_in_years(date: pd.Series, dob: pd.Series) -> pd.Series:
+    # completed years between dob and date, NaN where either is missing
+    days = (pd.to_datetime(date) - pd.to_datetime(dob)).dt.days
+    return np.floor(days / DAYS_PER_YEAR)
+
+
+def layoff_days(
+    fights: pd.DataFrame,
+    fighter_cols: Tuple[str, str] = ("R_fighter", "B_fighter"),
+    date_col: str = "date",
+) -> pd.DataFrame:
+    """
+    Layoff features of both corners of every fight.
+
+    Args:
+        fights (pd.DataFrame): one row per fight, newest first (as scraped)
+        fighter_cols (Tuple[str, str]): red and blue fighter columns
+        date_col (str): fight date column
+
+    Returns:
+        pd.DataFrame: per corner prefix (R_/B_, taken from fighter_cols)
+        days_since_last_fight and longest_layoff, indexed like fights
+    """
+    dates = pd.to_datetime(fights[date_col]).to_numpy()
+    n_fights = len(fights)
+    # fights are newest first, so a higher position is an earlier fight.
+    # used to order fights on the same date
+    order = np.arange(n_fights)[::-1]
+
+    # one row per (fight, corner)
+    long = pd.DataFrame(
+        {
+            "fight": np.tile(np.arange(n_fights), len(fighter_cols)),
+            "corner": np.repeat(np.arange(len(fighter_cols)), n_fights),
+            "fighter": np.concatenate(
+                [fights[col].to_numpy(dtype=object) for col in fighter_cols]
+            ),
+            "date": np.tile(dates, len(fighter_cols)),
+            "order": np.tile(order, len(fighter_cols)),
+        }
+    )
+    long = long.sort_values(["fighter", "date", "order"], kind="stable")
+
+    by_fighter = long.groupby("fighter", sort=False)
+    long["days_since_last_fight"] = by_fighter["date"].diff().dt.days
+    long["longest_layoff"] = long.groupby("fighter", sort=False)[
+        "days_since_last_fight"
+    ].cummax()
+
+    features = {}
+    for corner, fighter_col in enumerate(fighter_cols):
+        prefix = fighter_col.split("_")[0]
+        corner_rows = long[long["corner"] == corner].sort_values("fight")
+        for feature in ("days_since_last_fight", "longest_layoff"):
+            features[f"{prefix}_{feature}"] = corner_rows[feature].to_numpy()
+    return pd.DataFrame(features, index=fights.index)
@@ -0,0 +1,324 @@
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.ufctools.date_features import layoff_days
+from src.ufctools.fileio import atomic_write
+from src.ufctools.fighter_history import (
+    averages_frame,
+    corner_frames,
+    fight_results,
+    fight_totals,
+    fighter_fights_long,
+    total_columns,
+)
+from src.ufctools.ragged_ewm import EWMState, FighterHistories
+from src.ufctools.streaks import next_record, result_stats, streak_stats
+
+from src.ufctools.filepaths_and_schema import FEATURE_STORE_PICKLE  # isort:skip
+
+# running per fighter state of the history features, so new fights only cost
+# as much as the fights themselves instead of a rebuild of every history:
+# - ewm state of every span (ragged_ewm.EWMState)
+# - win/loss record and streaks (streaks.py)
+# - cumulative totals: rounds fought, title bouts, win methods
+# - last fight date and longest layoff (date_features.py)
+# built once from all fights with the vectorized engines (fighter_history.py),
+# then update() / layoff_days() take new fights, return their features and
+# move the state of just the fighters in them along. pickled between runs.
+#
+#   store = FighterFeatureStore.from_fights(fights, numerical_columns, win_by_columns)
+#   store.save()
+#   ...
+#   store = FighterFeatureStore.load()
+#   red_frame, blue_frame = store.update(new_fights)
+
+
+class FighterFeatureStore:
+    def __init__(
+        self,
+        numerical_columns: List[str],
+        win_by_columns: List[str],
+        spans: Sequence[int] = (3,),
+        career: bool = False,
+    ):
+        """
+        Args:
+            numerical_columns (List[str]): stats to take ewm averages of
+            win_by_columns (List[str]): one hot win method columns
+            spans (Sequence[int]): ewm spans, see fighter_history.history_features
+            career (bool): also keep career averages
+        """
+        self.numerical_columns = list(numerical_columns)
+        self.win_by_columns = list(win_by_columns)
+        self.spans = list(spans)
+        self.career = career
+        # fighter -> slot in the state arrays
+        self.slots: Dict[str, int] = {}
+        self.ewm = EWMState(self.spans, 0, len(self.numerical_columns))
+        self.record = np.zeros((0, len(result_stats)), dtype=np.int64)
+        self.totals = np.zeros((0, len(self.total_columns)))
+        self.last_fight_date = np.array([], dtype="datetime64[ns]")
+        self.longest_layoff = np.array([], dtype=float)
+        # (R_fighter, B_fighter, date) of fights already in the state
+        self.fight_keys = set()
+        self.latest_date = None
+        # anything a caller needs to carry over between runs (e.g. fill values)
+        self.extras = {}
+
+    @property
+    def total_columns(self) -> List[str]:
+        return total_columns + self.win_by_columns
+
+    ########
+    # building
+
+    @classmethod
+    def from_fights(
+        cls,
+        fights: pd.DataFrame,
+        numerical_columns: List[str],
+        win_by_columns: List[str],
+        spans: Sequence[int] = (3,),
+        career: bool = False,
+    ) -> "FighterFeatureStore":
+        """
+        State of every fighter after all of fights.
+
+        Args:
+            fights (pd.DataFrame): one row per fight, newest first, as passed to
+                fighter_history.fighter_fights_long (win_by one hot encoded)
+            numerical_columns, win_by_columns, spans, career: see __init__
+
+        Returns:
+            FighterFeatureStore
+        """
+        store = cls(numerical_columns, win_by_columns, spans, career)
+        long = fighter_fights_long(fights)
+        histories = FighterHistories.from_long(long, store.numerical_columns)
+        starts = histories.offsets[:-1]
+        last = histories.offsets[1:] - 1
+        first = np.zeros(len(long), dtype=bool)
+        first[starts] = True
+
+        fighters = long["hero_fighter"].to_numpy()[starts]
+        store.slots = {fighter: slot for slot, fighter in enumerate(fighters)}
+        _, store.ewm = histories.sweep(store.spans)
+
+        records = streak_stats(fight_results(long), first, before=False)
+        store.record = np.column_stack([records[stat][last] for stat in result_stats])
+        totals = fight_totals(long, store.win_by_columns)[store.total_columns]
+        if len(long):
+            store.totals = np.add.reduceat(totals.to_numpy(), starts)
+
+        store._set_layoff_state(fights)
+        store._add_fight_keys(fights)
+        return store
+
+    def _set_layoff_state(
+        self,
+        fights: pd.DataFrame,
+        fighter_cols: Tuple[str, str] = ("R_fighter", "B_fighter"),
+        date_col: str = "date",
+    ) -> None:
+        # last fight date and longest layoff as of each fighter's last fight,
+        # fights ordered the way date_features.layoff_days orders them
+        layoffs = layoff_days(fights, fighter_cols, date_col)
+        corners = []
+        for fighter_col in fighter_cols:
+            prefix = fighter_col.split("_")[0]
+            corners.append(
+                pd.DataFrame(
+                    {
+                        "fighter": fights[fighter_col].to_numpy(dtype=object),
+                        "date": pd.to_datetime(fights[date_col]).to_numpy(),
+                        "order": np.arange(len(fights))[::-1],
+                        "longest_layoff": layoffs[f"{prefix}_longest_layoff"],
+                    }
+                )
+            )
+        last = pd.concat(corners).sort_values(["date", "order"], kind="stable")
+        last = last.drop_duplicates("fighter", keep="last").set_index("fighter")
+        last = last.reindex(list(self.slots))
+        # copied, with copy on write pandas hands out read only arrays and
+        # layoff_days() updates these in place
+        self.last_fight_date = last["date"].to_numpy(dtype="datetime64[ns]", copy=True)
+        self.longest_layoff = last["longest_layoff"].to_numpy(dtype=float, copy=True)
+
+    def _add_slots(self, fighters: Sequence[str]) -> None:
+        new = [
+            fighter for fighter in dict.fromkeys(fighters) if fighter not in self.slots
+        ]
+        if not new:
+            return
+        for fighter in new:
+            self.slots[fighter] = len(self.slots)
+        self.ewm.grow(len(new))
+        self.record = np.concatenate(
+            [self.record, np.zeros((len(new), len(result_stats)), dtype=np.int64)]
+        )
+        self.totals = np.concatenate(
+            [self.totals, np.zeros((len(new), len(self.total_columns)))]
+        )
+        self.last_fight_date = np.concatenate(
+            [self.last_fight_date, np.full(len(new), np.datetime64("NaT", "ns"))]
+        )
+        self.longest_layoff = np.concatenate(
+            [self.longest_layoff, np.full(len(new), np.nan)]
+        )
+
+    def _add_fight_keys(self, fights: pd.DataFrame) -> None:
+        self.fight_keys.update(_fight_keys(fights))
+        if len(fights):
+            latest = pd.to_datetime(fights["date"]).max()
+            if self.latest_date is None or latest > self.latest_date:
+                self.latest_date = latest
+
+    ########
+    # new fights
+
+    def is_new(self, fights: pd.DataFrame) -> np.ndarray:
+        # fights not in the state yet
+        return np.array([key not in self.fight_keys for key in _fight_keys(fights)])
+
+    def can_update(self, fights: pd.DataFrame) -> bool:
+        # new fights have to come after everything in the state, an older fight
+        # showing up (e.g. a backfilled event) changes histories after it
+        if self.latest_date is None or not len(fights):
+            return True
+        return pd.to_datetime(fights["date"]).min() >= self.latest_date
+
+    def update(self, fights: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        History features of new fights, then adds them to the state.
+
+        Args:
+            fights (pd.DataFrame): fights not in the state yet, newest first, laid
+                out like from_fights' fights
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: red and blue corner features
+            indexed by fight, same columns as fighter_history.history_features
+        """
+        long = fighter_fights_long(fights)
+        self._add_slots(long["hero_fighter"])
+        slots = long["hero_fighter"].map(self.slots).to_numpy()
+        # k-th new fight of its fighter (long is oldest first per fighter)
+        nth = long.groupby("hero_fighter", sort=False).cumcount().to_numpy()
+
+        # stored as float32 like FighterHistories, so both give the same averages
+        values = long[self.numerical_columns].to_numpy(dtype=np.float32)
+        results = fight_results(long)
+        totals = fight_totals(long, self.win_by_columns)[self.total_columns].to_numpy()
+
+        keys = self.ewm.keys(self.career)
+        averages = {key: np.full(values.shape, np.nan) for key in keys}
+        records = np.zeros((len(long), len(result_stats)), dtype=np.int64)
+        totals_before = np.zeros_like(totals)
+        # one step per fight of whoever fought most, each fighter once per step
+        for k in range(nth.max(initial=-1) + 1):
+            rows = np.flatnonzero(nth == k)
+            fighters = slots[rows]
+            for key, current in self.ewm.averages(fighters, self.career).items():
+                averages[key][rows] = current
+            records[rows] = self.record[fighters]
+            totals_before[rows] = self.totals[fighters]
+
+            self.ewm.update(fighters, values[rows])
+            self.record[fighters] = next_record(self.record[fighters], results[rows])
+            self.totals[fighters] += totals[rows]
+
+        features = averages_frame(
+            averages, self.numerical_columns, self.spans, long.index
+        )
+        totals_before = pd.DataFrame(
+            totals_before, index=long.index, columns=self.total_columns
+        )
+        features[total_columns] = totals_before[total_columns]
+        features["hero_fighter"] = long["hero_fighter"]
+        features[result_stats] = pd.DataFrame(
+            records, index=long.index, columns=result_stats
+        )
+        features[self.win_by_columns] = totals_before[self.win_by_columns]
+
+        self._add_fight_keys(fights)
+        return corner_frames(long, features)
+
+    def layoff_days(
+        self,
+        fights: pd.DataFrame,
+        fighter_cols: Tuple[str, str] = ("R_fighter", "B_fighter"),
+        date_col: str = "date",
+    ) -> pd.DataFrame:
+        """
+        Layoff features of new fights, then adds them to the layoff state.
+        same output as date_features.layoff_days had it been given all fights.
+
+        Args:
+            fights (pd.DataFrame): fights not in the layoff state yet, newest first
+            fighter_cols (Tuple[str, str]): red and blue fighter columns
+            date_col (str): fight date column
+
+        Returns:
+            pd.DataFrame: per corner prefix days_since_last_fight and
+            longest_layoff, indexed like fights
+        """
+        n_fights = len(fights)
+        dates = pd.to_datetime(fights[date_col]).to_numpy()
+        fighters = np.concatenate(
+            [fights[col].to_numpy(dtype=object) for col in fighter_cols]
+        )
+        self._add_slots(fighters)
+        slots = np.array([self.slots[fighter] for fighter in fighters], dtype=np.int64)
+        fight = np.tile(np.arange(n_fights), len(fighter_cols))
+        corner_dates = np.tile(dates, len(fighter_cols))
+
+        # oldest fight first
+        order = np.lexsort((-fight, corner_dates))
+        days = np.full(len(fighters), np.nan)
+        longest = np.full(len(fighters), np.nan)
+        for row in order:
+            slot = slots[row]
+            days[row] = _days_between(self.last_fight_date[slot], corner_dates[row])
+            self.longest_layoff[slot] = np.fmax(self.longest_layoff[slot], days[row])
+            longest[row] = self.longest_layoff[slot]
+            self.last_fight_date[slot] = corner_dates[row]
+
+        features = {}
+        for corner, fighter_col in enumerate(fighter_cols):
+            prefix = fighter_col.split("_")[0]
+            rows = slice(corner * n_fights, (corner + 1) * n_fights)
+            features[f"{prefix}_days_since_last_fight"] = days[rows]
+            features[f"{prefix}_longest_layoff"] = longest[rows]
+        return pd.DataFrame(features, index=fights.index)
+
+    ########
+    # persistence
+
+    def save(self, filepath: Path = FEATURE_STORE_PICKLE) -> None:
+        with atomic_write(filepath, mode="wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(filepath: Path = FEATURE_STORE_PICKLE) -> Optional["FighterFeatureStore"]:
+        # None if there's no store yet
+        filepath = Path(filepath)
+        if not filepath.exists():
+            return None
+        print(f"Loading fighter feature store from {filepath}")
+        with open(filepath, "rb") as f:
+            return pickle.load(f)
+
+
+def _fight_keys(fights: pd.DataFrame) -> List[tuple]:
+    return list(
+        zip(fights["R_fighter"], fights["B_fighter"], fights["date"].astype(str))
+    )
+
+
+def _days_between(start, end):
+    # whole days, NaN where start is missing
+    return (end - start).astype("timedelta64[D]").astype(float)
@@ -0,0 +1,229 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.ufctools.cache import CACHE_MODES, CacheMissError, HTMLCache
+from src.ufctools.throttle import (
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    FetchError,
+    backoff_delay,
+    is_retryable_status,
+)
+
+# shared http layer for all the scrapers.
+# every page used to go through a bare requests.get, which means a fresh
+# tcp (and dns) setup per page. one pooled session reuses keep-alive
+# connections per host and can be shared by all the worker threads.
+
+# number of keep-alive connections kept open per host.
+# should match (or exceed) the number of worker threads hitting the site,
+# otherwise workers queue up waiting for a free connection.
+DEFAULT_POOL_SIZE = 8
+
+# (connect timeout, read timeout) in seconds.
+# bare requests.get has no timeout at all, so one stalled page could hang a worker forever.
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+# see cache.py for modes.
+# revalidate by default so unchanged pages come back as cheap 304s
+DEFAULT_CACHE_MODE = "revalidate"
+
+# retries (on connection errors, timeouts, 429 and 5xx) before giving up on a page
+DEFAULT_MAX_RETRIES = 5
+
+
+class FetchSession:
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        cache: Optional[HTMLCache] = None,
+        cache_mode: str = DEFAULT_CACHE_MODE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"cache_mode must be one of {CACHE_MODES}")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cache = HTMLCache() if cache is None else cache
+        self.cache_mode = cache_mode
+        self.max_retries = max_retries
+        # shared by all threads using this session
+        self.limiter = AdaptiveRateLimiter(max_concurrency=pool_size)
+        self.breaker = CircuitBreaker()
+        self.session = self._pooled_session(pool_size)
+        self._grow_lock = threading.Lock()
+
+    @staticmethod
+    def _pooled_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        # pool_block makes threads wait for a free connection instead of opening
+        # throwaway connections that get discarded once the pool is full
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def grow_pool(self, pool_size: int) -> None:
+        # swaps in a bigger pooled session. the old one isn't closed: requests
+        # already out on it finish there and its connections go when it's collected.
+        # (mounting onto the live session instead would mutate its adapter dict
+        # while other threads look adapters up in it)
+        with self._grow_lock:
+            if pool_size <= self.pool_size:
+                return
+            self.session = self._pooled_session(pool_size)
+            self.pool_size = pool_size
+            self.limiter.raise_ceiling(pool_size)
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        # rate limited get with retries.
+        # raises FetchError if page still failing after max_retries, or straight
+        # away on an error status a retry won't fix (e.g. 403/404)
+        for attempt in range(self.max_retries + 1):
+            response, error, retry_after = self._attempt(url, headers)
+            if error is None:
+                if response.status_code >= 400:
+                    raise FetchError(f"{url} failed: status {response.status_code}")
+                return response
+            if attempt < self.max_retries:
+                time.sleep(backoff_delay(attempt, retry_after=retry_after))
+
+        raise FetchError(
+            f"{url} failed after {self.max_retries + 1} attempts: {error}"
+        ) from error
+
+    def _attempt(self, url: str, headers: Optional[Dict[str, str]]):
+        # single request through circuit breaker/rate limiter.
+        # returns (response, error, retry after seconds)
+        self.breaker.wait()
+        self.limiter.acquire()
+        start = time.monotonic()
+        response, error, retry_after = None, None, None
+        try:
+            response = self.session.get(
+                url, headers=headers, allow_redirects=False, timeout=self.timeout
+            )
+            if is_retryable_status(response.status_code):
+                error = FetchError(f"status {response.status_code}")
+                retry_after = self._parse_retry_after(response)
+        except requests.RequestException as e:
+            error = e
+        finally:
+            ok = error is None
+            # 304s carry no body, their latency says nothing about page latency
+            full_page = response is not None and response.status_code != 304
+            self.limiter.release(time.monotonic() - start, ok=ok, sample=full_page)
+            self.breaker.record(ok)
+        return response, error, retry_after
+
+    @staticmethod
+    def _parse_retry_after(response: requests.Response) -> Optional[float]:
+        # only handles delay-seconds form, http-date form is ignored
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return None
+
+    def get_text(self, url: str) -> str:
+        if self.cache_mode == "off":
+            return self.get(url).text
+
+        entry = self.cache.get(url)
+
+        if entry is not None and self.cache_mode in ("prefer", "only"):
+            return self.cache.read(entry)
+        if self.cache_mode == "only":
+            raise CacheMissError(f"{url} not in cache at {self.cache.CACHE_DIR}")
+
+        # revalidate (or cache miss in prefer mode)
+        response = self.get(url, headers=self.cache.validator_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(entry)
+            return self.cache.read(entry)
+
+        text = response.text
+        # only cache real pages, not errors/redirects
+        if response.status_code == 200:
+            self.cache.put(
+                url,
+                text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return text
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# module level session shared by every scraper/thread.
+# created lazily so importing doesn't open anything.
+_SESSION: Optional[FetchSession] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> FetchSession:
+    global _SESSION
+    # double checked so the common path doesn't take the lock
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = FetchSession()
+    return _SESSION
+
+
+def configure_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+    cache: Optional[HTMLCache] = None,
+    cache_mode: str = DEFAULT_CACHE_MODE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> FetchSession:
+    # replaces shared session with new pool size/timeout/cache/retry policy.
+    # shouldn't be called while other threads are mid-fetch.
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+        _SESSION = FetchSession(
+            pool_size=pool_size,
+            timeout=timeout,
+            cache=cache,
+            cache_mode=cache_mode,
+            max_retries=max_retries,
+        )
+    return _SESSION
+
+
+def ensure_pool_size(pool_size: int) -> FetchSession:
+    # grow shared pool to fit worker count, keeping current timeout/cache policy.
+    # never shrinks, so callers with fewer workers don't thrash the pool.
+    # safe while other threads are fetching, the shared session is kept
+    session = get_session()
+    session.grow_pool(pool_size)
+    return session
+
+
+def set_cache_mode(cache_mode: str) -> FetchSession:
+    # e.g. set_cache_mode("only") to rerun parsers over cached pages with no network io
+    session = get_session()
+    return configure_session(
+        pool_size=session.pool_size,
+        timeout=session.timeout,
+        cache=session.cache,
+        cache_mode=cache_mode,
+        max_retries=session.max_retries,
+    )
+
+
+def fetch_text(url: str) -> str:
+    return get_session().get_text(url)
@@ -0,0 +1,108 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# fight durations from the time format, e.g. "3 Rnd (5-5-5)" or
+# "1 Rnd + 2OT (15-3-3)". the minutes of every round are listed in the
+# parentheses, so any format (including ones not seen before) gets its round
+# lengths parsed straight from the string. formats with no round lengths in
+# them are listed in format_round_minutes.
+#
+# formats are compiled into a table of seconds elapsed before each round
+# (one row per format), then total time is a single lookup per fight:
+#   elapsed_before_round[format, last_round - 1] + last_round_time
+
+# formats the round lengths can't be parsed from.
+# no time limit fights have no set round length, each round past the first
+# counts as one second (as the legacy preprocessor had it)
+format_round_minutes: Dict[str, List[float]] = {
+    "No Time Limit": [1 / 60],
+}
+# formats whose last round length repeats for however many rounds were fought
+open_ended_formats = {"No Time Limit"}
+
+_ROUND_MINUTES_RE = re.compile(r"\(\s*(\d+(?:\s*-\s*\d+)*)\s*\)")
+
+
+def round_seconds(time_format: str) -> Optional[List[float]]:
+    """
+    Length of each round of a time format.
+
+    Args:
+        time_format (str): e.g. "5 Rnd (5-5-5-5-5)"
+
+    Returns:
+        List[float]: seconds per round, e.g. [300, 300, 300, 300, 300].
+        None if format isn't known.
+    """
+    if not isinstance(time_format, str):
+        return None
+    time_format = time_format.strip()
+    if time_format in format_round_minutes:
+        minutes = format_round_minutes[time_format]
+    else:
+        match = _ROUND_MINUTES_RE.search(time_format)
+        if match is None:
+            return None
+        minutes = [float(m) for m in match.group(1).split("-")]
+    return [60 * m for m in minutes]
+
+
+def compile_formats(
+    time_formats: Iterable[str], min_rounds: int = 1
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Table of seconds elapsed before each round, one row per format.
+
+    Args:
+        time_formats (Iterable[str]): distinct time formats
+        min_rounds (int): min number of rounds in table, so open ended
+            formats cover fights that went that long
+
+    Returns:
+        Tuple[List[str], np.ndarray]: formats and table of shape
+        (formats, max rounds). rows of unknown formats and rounds past a
+        format's last round are NaN.
+    """
+    time_formats = list(time_formats)
+    rounds = [round_seconds(time_format) for time_format in time_formats]
+    max_rounds = max([min_rounds] + [len(r) for r in rounds if r is not None])
+    table = np.full((len(time_formats), max_rounds), np.nan)
+    for row, seconds in enumerate(rounds):
+        if seconds is None:
+            continue
+        if time_formats[row].strip() in open_ended_formats:
+            seconds = seconds + seconds[-1:] * (max_rounds - len(seconds))
+        # a round starts once all rounds before it are done
+        table[row, : len(seconds)] = np.concatenate([[0], np.cumsum(seconds[:-1])])
+    return time_formats, table
+
+
+def total_time_fought(
+    time_format: pd.Series, last_round: pd.Series, last_round_time: pd.Series
+) -> pd.Series:
+    """
+    Seconds fought in each fight.
+
+    Args:
+        time_format (pd.Series): time format of fight, e.g. "3 Rnd (5-5-5)"
+        last_round (pd.Series): round fight ended in (1 based)
+        last_round_time (pd.Series): seconds into last round fight ended at
+
+    Returns:
+        pd.Series: seconds fought, NaN for unknown formats or rounds past
+        the format's last round
+    """
+    codes, time_formats = pd.factorize(time_format)
+    round_idx = pd.to_numeric(last_round, errors="coerce").to_numpy(float) - 1
+    max_round = np.nanmax(round_idx, initial=0) + 1
+    _, table = compile_formats(time_formats, min_rounds=int(max_round))
+
+    valid = (codes >= 0) & (round_idx >= 0) & (round_idx < table.shape[1])
+    elapsed = np.full(len(codes), np.nan)
+    elapsed[valid] = table[codes[valid], round_idx[valid].astype(np.int64)]
+
+    seconds = elapsed + pd.to_numeric(last_round_time, errors="coerce").to_numpy(float)
+    return pd.Series(seconds, index=time_format.index)
@@ -0,0 +1,158 @@
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.ufctools.ragged_ewm import CAREER, FighterHistories
+from src.ufctools.streaks import DRAW, LOSS, WIN, result_stats, streak_stats
+
+# per fighter "before this fight" features for every fight, in one pass:
+# fights (one row per fight, red/blue columns) are stacked once into a long
+# table with one row per (fight, corner), columns renamed to hero_/opp_ from
+# that corner's point of view, sorted by fighter and then oldest fight first.
+# every feature is then a grouped op over that table, shifted by one fight so
+# a fight only sees the fights before it:
+# - ewm averages of stats (ragged_ewm.py)
+# - cumulative rounds fought, title bouts, win methods
+# - wins/losses and streaks (streaks.py)
+# feature_store.py keeps the same features going fight by fight.
+
+total_columns = ["total_rounds_fought", "total_title_bouts"]
+
+
+def fighter_fights_long(
+    fights: pd.DataFrame, corners: Tuple[str, str] = ("R", "B")
+) -> pd.DataFrame:
+    """
+    Stacks both corners of every fight into one row per fighter per fight.
+
+    Args:
+        fights (pd.DataFrame): one row per fight, newest first (as scraped),
+            with R_/B_ prefixed corner columns
+        corners (Tuple[str, str]): corner prefixes
+
+    Returns:
+        pd.DataFrame: columns renamed to hero_ (that row's fighter) and opp_
+        (their opponent), plus "fight" (index label in fights) and "corner".
+        sorted by hero_fighter, oldest fight first.
+    """
+    stacked = []
+    for hero, opp in (corners, corners[::-1]):
+        rename = {}
+        for col in fights.columns:
+            if col.startswith(f"{hero}_"):
+                rename[col] = "hero_" + col[len(hero) + 1 :]
+            elif col.startswith(f"{opp}_"):
+                rename[col] = "opp_" + col[len(opp) + 1 :]
+        corner_df = fights.rename(columns=rename)
+        corner_df["fight"] = fights.index
+        corner_df["corner"] = hero
+        # fights are newest first, so a higher position is an earlier fight
+        corner_df["fight_pos"] = np.arange(len(fights))
+        stacked.append(corner_df)
+
+    long = pd.concat(stacked, ignore_index=True)
+    long = long.sort_values(
+        ["hero_fighter", "fight_pos"], ascending=[True, False], kind="stable"
+    )
+    return long.reset_index(drop=True)
+
+
+def _exclusive_cumsum(values: pd.DataFrame, group: pd.Series) -> pd.DataFrame:
+    # running total of everything before each row within its group
+    values = values.astype(float)
+    return values.groupby(group, sort=False).cumsum() - values
+
+
+def fight_results(long: pd.DataFrame) -> np.ndarray:
+    # WIN/LOSS/DRAW of each row's fighter
+    won = (long["Winner"] == long["hero_fighter"]).to_numpy()
+    lost = (long["Winner"] == long["opp_fighter"]).to_numpy()
+    # anything else is a draw / no contest
+    return np.where(won, WIN, np.where(lost, LOSS, DRAW))
+
+
+def fight_totals(long: pd.DataFrame, win_by_columns: List[str]) -> pd.DataFrame:
+    # what each fight adds to its fighter's running totals
+    won = fight_results(long) == WIN
+    totals = pd.DataFrame(
+        {
+            "total_rounds_fought": long["last_round"],
+            "total_title_bouts": long["title_bout"] == True,  # noqa: E712
+        },
+        index=long.index,
+    )
+    wins_by = long.reindex(columns=win_by_columns, fill_value=0).astype(float)
+    totals[win_by_columns] = wins_by.mul(won, axis=0)
+    return totals.astype(float)
+
+
+def averages_frame(
+    averages: Dict[Union[int, str], np.ndarray],
+    numerical_columns: List[str],
+    spans: Sequence[int],
+    index: pd.Index,
+) -> pd.DataFrame:
+    # ewm averages named as history_features names them
+    frames = []
+    for key, values in averages.items():
+        if key == spans[0]:
+            names = numerical_columns
+        else:
+            suffix = CAREER if key == CAREER else f"ewm{key}"
+            names = [f"{col}_{suffix}" for col in numerical_columns]
+        frames.append(pd.DataFrame(values, index=index, columns=names))
+    return pd.concat(frames, axis=1)
+
+
+def history_features(
+    long: pd.DataFrame,
+    numerical_columns: List[str],
+    win_by_columns: List[str],
+    spans: Sequence[int] = (3,),
+    career: bool = False,
+) -> pd.DataFrame:
+    """
+    Features of each fighter's history before each fight.
+
+    Args:
+        long (pd.DataFrame): from fighter_fights_long
+        numerical_columns (List[str]): stats to take ewm averages of
+        win_by_columns (List[str]): one hot win method columns to count wins by
+        spans (Sequence[int]): ewm spans (adjust=False). averages of the first
+            span keep the stat's name, others are named <stat>_ewm<span>
+        career (bool): also average of all fights before, named <stat>_career
+
+    Returns:
+        pd.DataFrame: indexed like long. ewm averages (NaN before a fighter's
+        first fight), total_rounds_fought, total_title_bouts, hero_fighter,
+        result stats and win_by counts
+    """
+    fighter = long["hero_fighter"]
+    first = (fighter != fighter.shift(1)).to_numpy()
+
+    histories = FighterHistories.from_long(long, numerical_columns)
+    averages = histories.ewm_before(spans, career)
+    features = averages_frame(averages, numerical_columns, spans, long.index)
+
+    totals = _exclusive_cumsum(fight_totals(long, win_by_columns), fighter)
+    features[total_columns] = totals[total_columns]
+    features["hero_fighter"] = fighter
+
+    stats = streak_stats(fight_results(long), first)
+    features[result_stats] = pd.DataFrame(stats, index=long.index)[result_stats]
+
+    features[win_by_columns] = totals[win_by_columns]
+    return features
+
+
+def corner_frames(
+    long: pd.DataFrame, features: pd.DataFrame
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # features split back into red and blue corner rows, indexed by fight
+    frames = []
+    for corner in ("R", "B"):
+        rows = (long["corner"] == corner).to_numpy()
+        frame = features[rows].set_index(long.loc[rows, "fight"].to_numpy())
+        frames.append(frame.sort_index())
+    return frames[0], frames[1]
@@ -0,0 +1,178 @@
+from typing import Optional
+
+import pandas as pd
+
+from src.ufctools.fetching import DEFAULT_POOL_SIZE
+from src.ufctools.pipeline import FetchParsePipeline
+from src.ufctools.utils import parse_page
+
+from src.ufctools.filepaths_and_schema import (  # isort:skip
+    FIGHTER_DETAILS_DATA_PATH,
+    fighter_detail_labels,
+)
+
+# fighter details keyed by FIGHTER_ID, refreshed only for fighters that need it:
+# - fighters in newly scraped fights (their career stats just changed)
+# - fighters whose details are older than max_age_days
+# - fighters whose last fetch failed
+# instead of re-reading all 26 fighters?char=X listings and diffing names
+# like legacy/scrape_fighter_details.py does.
+
+fighter_detail_cols = ["FIGHTER", "FIGHTER_LINK"] + list(fighter_detail_labels.values())
+
+
+class FighterDetailsRefresher:
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_POOL_SIZE,
+        parse_workers: Optional[int] = None,
+        store=None,
+    ):
+        self.FIGHTER_DETAILS_PATH = FIGHTER_DETAILS_DATA_PATH
+        # optional UFCStore (see storage.py), replaces raw_fighter_details.csv
+        self.store = store
+        # max number of fighter pages requested at once
+        self.max_concurrency = max_concurrency
+        # parser processes, defaults to cpu count
+        self.parse_workers = parse_workers
+        self.fighter_details = self._load_fighter_details()
+
+    def _load_fighter_details(self) -> pd.DataFrame:
+        if self.store is not None:
+            fighter_df = self.store.get_fighters()
+            return fighter_df.reindex(columns=fighter_detail_cols + ["SCRAPED_AT"])
+        if self.FIGHTER_DETAILS_PATH.exists():
+            print(f"Reading local fighter details from {self.FIGHTER_DETAILS_PATH}")
+            return pd.read_csv(
+                self.FIGHTER_DETAILS_PATH,
+                sep=";",
+                index_col="FIGHTER_ID",
+                parse_dates=["SCRAPED_AT"],
+            )
+        empty_df = pd.DataFrame(columns=fighter_detail_cols + ["SCRAPED_AT"])
+        empty_df.index.name = "FIGHTER_ID"
+        empty_df["SCRAPED_AT"] = pd.to_datetime(empty_df["SCRAPED_AT"])
+        return empty_df
+
+    def _write_fighter_details(self) -> None:
+        self.fighter_details.to_csv(self.FIGHTER_DETAILS_PATH, sep=";")
+
+    def refresh(
+        self,
+        new_fights: Optional[pd.DataFrame] = None,
+        max_age_days: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        Fetches profile pages of fighters that need updating and saves details.
+
+        Args:
+            new_fights (pd.DataFrame, optional): newly scraped fights
+                (e.g. from FightDataScraper.scrape_new_fights). every fighter in
+                them is refreshed.
+            max_age_days (float, optional): also refresh fighters whose details
+                are older than this. if None, age is ignored.
+
+        Returns:
+            pd.DataFrame: refreshed rows, indexed by FIGHTER_ID
+        """
+        targets = self._fighters_to_refresh(new_fights, max_age_days)
+        if targets.empty:
+            print("No fighter details to refresh.")
+            return targets
+
+        print(f"Refreshing details for {targets.shape[0]} fighter/s.")
+        scraped_at = pd.Timestamp.now()
+        scraped = {}
+
+        pipeline = FetchParsePipeline(
+            io_workers=self.max_concurrency, parse_workers=self.parse_workers
+        )
+        items = list(zip(targets["FIGHTER_LINK"], targets.index))
+        for fighter_link, fighter_id, details, error in pipeline.run(
+            items, parse_fighter_page
+        ):
+            if error is not None:
+                print(f"error processing {fighter_link}: {error}")
+                continue
+            details["SCRAPED_AT"] = scraped_at
+            scraped[fighter_id] = details
+
+        scraped_df = pd.DataFrame.from_dict(scraped, orient="index")
+        scraped_df = targets.loc[scraped_df.index].join(scraped_df)
+
+        # fighters that failed keep any details they had, but with no SCRAPED_AT
+        # so they're retried on next refresh
+        failed_ids = targets.index.difference(scraped_df.index)
+        failed_df = self.fighter_details.reindex(failed_ids)
+        failed_df[["FIGHTER", "FIGHTER_LINK"]] = targets.loc[failed_ids]
+        failed_df["SCRAPED_AT"] = pd.NaT
+
+        refreshed = pd.concat([scraped_df, failed_df]).reindex(
+            index=targets.index, columns=fighter_detail_cols + ["SCRAPED_AT"]
+        )
+        self._update_fighter_details(refreshed)
+        return refreshed
+
+    def _fighters_to_refresh(
+        self, new_fights: Optional[pd.DataFrame], max_age_days: Optional[float]
+    ) -> pd.DataFrame:
+        # FIGHTER/FIGHTER_LINK of every fighter to refetch, indexed by FIGHTER_ID
+        details = self.fighter_details
+        stale = details["SCRAPED_AT"].isna()
+        if max_age_days is not None:
+            cutoff = pd.Timestamp.now() - pd.Timedelta(days=max_age_days)
+            stale |= details["SCRAPED_AT"] < cutoff
+
+        targets = [details.loc[stale, ["FIGHTER", "FIGHTER_LINK"]]]
+        if new_fights is not None:
+            targets.append(fighters_in_fights(new_fights))
+
+        targets = pd.concat(targets)
+        # newest name/link wins for fighters listed more than once
+        return targets[~targets.index.duplicated(keep="last")]
+
+    def _update_fighter_details(self, refreshed: pd.DataFrame) -> None:
+        # replace rows of refreshed fighters, add new ones
+        details = self.fighter_details
+        self.fighter_details = pd.concat(
+            [refreshed, details.drop(refreshed.index, errors="ignore")]
+        )
+        if self.store is not None:
+            # only refreshed rows need writing
+            self.store.upsert_fighters(refreshed)
+            return
+        print(f"Saving fighter details to {self.FIGHTER_DETAILS_PATH}")
+        self._write_fighter_details()
+
+
+def fighters_in_fights(fights: pd.DataFrame) -> pd.DataFrame:
+    # both corners of each fight stacked into one FIGHTER_ID indexed table
+    corners = []
+    for corner in ("R", "B"):
+        corner_df = fights[
+            [f"{corner}_FIGHTER_ID", f"{corner}_FIGHTER", f"{corner}_FIGHTER_LINK"]
+        ]
+        corners.append(
+            corner_df.rename(columns=lambda col: col[len(corner) + 1 :]).set_index(
+                "FIGHTER_ID"
+            )
+        )
+    fighters = pd.concat(corners)
+    return fighters[~fighters.index.duplicated(keep="first")]
+
+
+# module level so it can run in the pipeline's worker processes, see pipeline.py
+def parse_fighter_page(fighter_link: str, page: bytes, fighter_id: str) -> dict:
+    fighter_soup = parse_page(page)
+    details = {}
+    for item in fighter_soup.findAll("li"):
+        title = item.find("i", {"class": "b-list__box-item-title"})
+        if title is None:
+            continue
+        label = title.text.strip()
+        if label not in fighter_detail_labels:
+            continue
+        value = item.text.replace(title.text, "", 1).strip()
+        # "--" is used for missing stats
+        details[fighter_detail_labels[label]] = None if value in ("", "--") else value
+    return details
@@ -0,0 +1,197 @@
+import csv
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.ufctools.fileio import atomic_write
+from src.ufctools.stat_parsing import cast_stat_columns
+
+from src.ufctools.filepaths_and_schema import (  # isort:skip
+    FIGHT_LOG_PATH,
+    RAW_FIGHT_DATA_PATH,
+)
+
+# log structured fight data, so an update costs as much as the new fights
+# rather than a rewrite of every fight ever scraped:
+# - base file: raw_fight_data.csv, everything as of the last compaction
+# - segments: one immutable csv per update, <log dir>/segment_000001.csv, ...
+# reads merge base and segments by FIGHT_ID, last write wins (a re-scraped
+# fight replaces the old copy instead of showing up twice).
+# compaction folds segments into a fresh base file (sorted by FIGHT_ID) and
+# removes them. it runs in a background thread once enough segments pile up,
+# or on demand.
+#
+#   log = FightLog()
+#   log.append(new_fights_df)
+#   fight_df = log.read()
+
+SEGMENT_PREFIX = "segment_"
+# segments before an append kicks off compaction
+COMPACT_AFTER = 8
+
+
+class FightLog:
+    def __init__(
+        self,
+        base_path: Path = RAW_FIGHT_DATA_PATH,
+        log_dir: Path = FIGHT_LOG_PATH,
+        compact_after: Optional[int] = COMPACT_AFTER,
+    ):
+        """
+        Args:
+            base_path (Path): compacted fight data csv
+            log_dir (Path): directory of segments appended since last compaction
+            compact_after (int, optional): number of segments that triggers a
+                background compaction on append. never compacts by itself if None
+        """
+        self.BASE_PATH = Path(base_path)
+        self.LOG_DIR = Path(log_dir)
+        self.compact_after = compact_after
+        # held while the set of files making up the log changes,
+        # so a read never sees a segment disappear from under it
+        self._files_lock = threading.Lock()
+        # one compaction at a time
+        self._compact_lock = threading.Lock()
+        self._compaction = None
+
+    def segments(self) -> List[Path]:
+        # oldest first
+        if not self.LOG_DIR.exists():
+            return []
+        return sorted(self.LOG_DIR.glob(f"{SEGMENT_PREFIX}*.csv"))
+
+    def exists(self) -> bool:
+        return self.BASE_PATH.exists() or bool(self.segments())
+
+    def append(self, fight_df: pd.DataFrame) -> Path:
+        """
+        Writes new/updated fights as a new segment.
+
+        Args:
+            fight_df (pd.DataFrame): fights indexed by FIGHT_ID
+
+        Returns:
+            Path: segment written
+        """
+        return self._append(lambda f: fight_df.to_csv(f, sep=";"))
+
+    def append_records(self, records: List[Dict], index_col: str = "FIGHT_ID") -> Path:
+        """
+        Writes fight records (e.g. straight from the scrape journal) as a new
+        segment, without going through a DataFrame.
+
+        Args:
+            records (List[Dict]): one dict per fight, typed stats as scraped
+            index_col (str): column written first (read back as index)
+
+        Returns:
+            Path: segment written
+        """
+        # fights have a different number of per round columns,
+        # header is the union of keys in first seen order
+        columns = {index_col: None}
+        for record in records:
+            columns.update(dict.fromkeys(record))
+
+        def write(f):
+            writer = csv.DictWriter(f, fieldnames=list(columns), delimiter=";")
+            writer.writeheader()
+            writer.writerows(records)
+
+        return self._append(write)
+
+    def _append(self, write) -> Path:
+        with self._files_lock:
+            segments = self.segments()
+            seq = int(segments[-1].stem[len(SEGMENT_PREFIX) :]) + 1 if segments else 1
+            segment_path = self.LOG_DIR / f"{SEGMENT_PREFIX}{seq:06d}.csv"
+            # atomic so a crash never leaves a half written segment to be read
+            with atomic_write(segment_path, newline="", encoding="utf-8") as f:
+                write(f)
+            n_segments = len(segments) + 1
+
+        if self.compact_after is not None and n_segments >= self.compact_after:
+            self.compact_in_background()
+        return segment_path
+
+    def read(self) -> Optional[pd.DataFrame]:
+        """
+        Merges base file and segments, newest write of each fight wins.
+
+        Returns:
+            pd.DataFrame: fight data indexed by FIGHT_ID, fights updated since the
+            last compaction first (newest first), then the rest by FIGHT_ID.
+            None if there is no fight data.
+        """
+        with self._files_lock:
+            segments = self.segments()
+            frames = [_read_fights(path) for path in reversed(segments)]
+            if self.BASE_PATH.exists():
+                frames.append(_read_fights(self.BASE_PATH))
+        return _merge(frames)
+
+    def compact(self) -> None:
+        # folds all current segments into the base file
+        with self._compact_lock:
+            segments = self.segments()
+            if not segments:
+                return
+            # segments are immutable and the base only changes here,
+            # so the merge can happen without blocking appends/reads
+            frames = [_read_fights(path) for path in reversed(segments)]
+            if self.BASE_PATH.exists():
+                frames.append(_read_fights(self.BASE_PATH))
+            fight_df = _merge(frames).sort_index()
+
+            with self._files_lock:
+                with atomic_write(self.BASE_PATH, newline="", encoding="utf-8") as f:
+                    fight_df.to_csv(f, sep=";")
+                # segments appended meanwhile weren't merged and stay
+                for path in segments:
+                    os.remove(path)
+
+    def compact_in_background(self) -> threading.Thread:
+        # non daemon thread, so an exiting interpreter waits for it to finish
+        if self._compaction is not None and self._compaction.is_alive():
+            return self._compaction
+        self._compaction = threading.Thread(target=self._compact_and_report)
+        self._compaction.start()
+        return self._compaction
+
+    def _compact_and_report(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            # segments are still there, next compaction retries
+            print(f"error compacting fight log: {e}")
+
+    def wait(self) -> None:
+        # blocks until a background compaction (if any) is done
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def clear(self) -> None:
+        # removes all fight data
+        self.wait()
+        with self._files_lock:
+            for path in self.segments():
+                os.remove(path)
+            if self.BASE_PATH.exists():
+                os.remove(self.BASE_PATH)
+
+
+def _read_fights(path: Path) -> pd.DataFrame:
+    fight_df = pd.read_csv(path, sep=";", index_col="FIGHT_ID")
+    return cast_stat_columns(fight_df)
+
+
+def _merge(frames: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    # frames newest first, first copy of each FIGHT_ID wins
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return None
+    fight_df = pd.concat(frames)
+    return fight_df[~fight_df.index.duplicated(keep="first")]
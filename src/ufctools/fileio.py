@@ -0,0 +1,23 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# write to temp file in same directory, then rename over the target.
+# os.replace is atomic on the same filesystem, so readers only ever see
+# the old file or the complete new one, never a half written file.
+@contextmanager
+def atomic_write(filepath: Path, mode: str = "w", **open_kwargs):
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            yield f
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
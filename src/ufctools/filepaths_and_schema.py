@@ -1,13 +1,31 @@
 import os
 from pathlib import Path
 
+# ###URLS####
+
+# override (e.g. with a local stand-in server, see standin.py) for offline runs/benchmarks
+UFCSTATS_BASE_URL = "http://ufcstats.com"
+
 # ###FILEPATHS####
 
 BASE_PATH = Path(os.getcwd()) / "data"
 FIGHT_LINKS_PICKLE = BASE_PATH / "fight_links.pickle"
 RAW_NEW_FIGHT_DATA_PATH = BASE_PATH / "temp_raw_fight_data.csv"
 RAW_FIGHT_DATA_PATH = BASE_PATH / "raw_fight_data.csv"
+# fight data appended since last compaction of raw_fight_data.csv (see fightlog.py)
+FIGHT_LOG_PATH = BASE_PATH / "fight_log"
+# parquet copy of fight data partitioned by year (see columnar.py)
+RAW_FIGHT_DATASET_PATH = BASE_PATH / "raw_fight_dataset"
 EVENT_DATA_PATH = BASE_PATH / "event_data.csv"
+# sqlite store, alternative to the csv/pickle files above (see storage.py)
+UFC_DB_PATH = BASE_PATH / "ufc.sqlite3"
+# per event commits of an in progress fight scrape (see checkpoint.py)
+SCRAPE_JOURNAL_PATH = BASE_PATH / "scrape_journal.jsonl"
+# compressed copies of scraped pages (see cache.py)
+HTML_CACHE_PATH = BASE_PATH / "html_cache"
+# per fighter state of preprocessed features, for incremental preprocessing
+# (see feature_store.py)
+FEATURE_STORE_PICKLE = BASE_PATH / "feature_store.pickle"
 
 # haven't used this stuff yet -- will probably change
 SCRAPED_FIGHTER_DATA_DICT_PICKLE = BASE_PATH / "scraped_fighter_data_dict.pickle"
@@ -16,6 +34,14 @@ PREPROCESSED_DATA_PATH = BASE_PATH / "preprocessed_data.csv"
 FIGHTER_DETAILS_DATA_PATH = BASE_PATH / "raw_fighter_details.csv"
 UFC_DATA_PATH = BASE_PATH / "data.csv"
 
+# files of the legacy scrapers/preprocessor (see legacy/), text stats as on the site
+TOTAL_EVENT_AND_FIGHTS = BASE_PATH / "total_fight_data.csv"
+TOTAL_FIGHTS_DATA_PATH = TOTAL_EVENT_AND_FIGHTS
+NEW_FIGHTS_DATA_PATH = BASE_PATH / "new_fight_data.csv"
+FIGHTER_DETAILS = BASE_PATH / "fighter_details.csv"
+PREPROCESSED_DATA = PREPROCESSED_DATA_PATH
+UFC_DATA = UFC_DATA_PATH
+
 
 # ###TABLE HEADERS###
 
@@ -64,6 +90,23 @@ event_cols = [
     "FIGHT_DATA_SCRAPED",
 ]
 
+# fighter profile page labels -> cols of fighter details saved locally
+fighter_detail_labels = {
+    "Height:": "HEIGHT",
+    "Weight:": "WEIGHT",
+    "Reach:": "REACH",
+    "STANCE:": "STANCE",
+    "DOB:": "DOB",
+    "SLpM:": "SLPM",
+    "Str. Acc.:": "STR_ACC",
+    "SApM:": "SAPM",
+    "Str. Def:": "STR_DEF",
+    "TD Avg.:": "TD_AVG",
+    "TD Acc.:": "TD_ACC",
+    "TD Def.:": "TD_DEF",
+    "Sub. Avg.:": "SUB_AVG",
+}
+
 # ###UNSURE IF USING STUFF BELOW THIS###
 
 # column labels for processed fight data
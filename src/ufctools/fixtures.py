@@ -0,0 +1,388 @@
+import json
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from src.ufctools.cache import HTMLCache
+from src.ufctools.filepaths_and_schema import UFCSTATS_BASE_URL
+
+# recorded/synthetic ufcstats pages for offline runs and benchmarking.
+#
+# fixture archive format: a zip file with
+#   manifest.json -- {"base_url": "http://ufcstats.com",
+#                     "pages": {"/fight-details/eaa885cf7ae31e0b": "pages/000001.html", ...}}
+#   pages/*.html  -- page bodies (utf-8, zip deflated)
+# pages are keyed by path + query relative to base_url, so an archive can be
+# served from any host (see standin.py) or loaded back into the html cache
+# under the real urls for cache-only replay.
+
+MANIFEST_NAME = "manifest.json"
+
+
+def url_to_path(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class FixtureArchive:
+    def __init__(self, pages: Dict[str, str], base_url: str = UFCSTATS_BASE_URL):
+        # pages: path (+ query) -> html
+        self.pages = pages
+        self.base_url = base_url
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def save(self, filepath: Path) -> Path:
+        manifest = {"base_url": self.base_url, "pages": {}}
+        with zipfile.ZipFile(filepath, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for i, (path, html) in enumerate(sorted(self.pages.items())):
+                member = f"pages/{i:06d}.html"
+                zf.writestr(member, html.encode("utf-8"))
+                manifest["pages"][path] = member
+            zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1))
+        return Path(filepath)
+
+    @classmethod
+    def load(cls, filepath: Path) -> "FixtureArchive":
+        with zipfile.ZipFile(filepath, "r") as zf:
+            manifest = json.loads(zf.read(MANIFEST_NAME))
+            pages = {
+                path: zf.read(member).decode("utf-8")
+                for path, member in manifest["pages"].items()
+            }
+        return cls(pages, base_url=manifest["base_url"])
+
+    @classmethod
+    def from_cache(
+        cls, cache: Optional[HTMLCache] = None, base_url: str = UFCSTATS_BASE_URL
+    ) -> "FixtureArchive":
+        # record everything in the html cache under base_url into an archive
+        cache = HTMLCache() if cache is None else cache
+        pages = {}
+        for entry_path in cache.URLS_PATH.glob("*/*.json"):
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+            if not entry["url"].startswith(base_url):
+                continue
+            pages[url_to_path(entry["url"])] = cache.read(entry)
+        return cls(pages, base_url=base_url)
+
+    def load_into_cache(self, cache: Optional[HTMLCache] = None) -> HTMLCache:
+        # offline replay: put pages in cache under their real urls,
+        # then run scrapers with set_cache_mode("only")
+        cache = HTMLCache() if cache is None else cache
+        for path, html in self.pages.items():
+            cache.put(self.base_url + path, html)
+        return cache
+
+
+########
+# synthetic site generation
+# markup below is the minimum structure the scrapers/parsers rely on,
+# modelled on the real ufcstats pages.
+
+# events per page of paginated completed events listing
+EVENTS_PER_PAGE = 25
+_FIRST_NAMES = ["Frankie", "Benson", "Gray", "Jose", "Max", "BJ", "Cub", "Chad"]
+_LAST_NAMES = ["Edgar", "Henderson", "Maynard", "Aldo", "Holloway", "Penn", "Swanson"]
+_METHODS = ["KO/TKO", "Submission", "Decision - Unanimous", "Decision - Split"]
+_WEIGHTS = ["Lightweight", "Featherweight", "Bantamweight", "Welterweight"]
+_STANCES = ["Orthodox", "Southpaw", "Switch"]
+_MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+
+def _hex_id(rng: random.Random) -> str:
+    return "%016x" % rng.getrandbits(64)
+
+
+def _of(rng: random.Random, hi: int) -> str:
+    att = rng.randint(0, hi)
+    return f"{rng.randint(0, att)} of {att}"
+
+
+def _pct(landed_of_att: str) -> str:
+    landed, att = (int(x) for x in landed_of_att.split(" of "))
+    return "---" if att == 0 else f"{round(100 * landed / att)}%"
+
+
+def _cell(r_stat: str, b_stat: str) -> str:
+    return (
+        '<td class="b-fight-details__table-col">'
+        f'<p class="b-fight-details__table-text">{r_stat}</p>'
+        f'<p class="b-fight-details__table-text">{b_stat}</p></td>'
+    )
+
+
+def _fighter_cell(r_name: str, b_name: str) -> str:
+    return (
+        '<td class="b-fight-details__table-col l-page_align_left">'
+        f'<p class="b-fight-details__table-text"><a class="b-link b-link_style_black" href="#">{r_name}</a></p>'
+        f'<p class="b-fight-details__table-text"><a class="b-link b-link_style_black" href="#">{b_name}</a></p></td>'
+    )
+
+
+def _stats_row(rng: random.Random, names: List[str], strikes: bool) -> str:
+    # one <tr> of totals or single round stats for both fighters
+    cells = [_fighter_cell(*names)]
+    sig = [_of(rng, 80), _of(rng, 80)]
+    if strikes:
+        cells.append(_cell(*sig))
+        cells.append(_cell(_pct(sig[0]), _pct(sig[1])))
+        for _ in range(6):  # head/body/leg/distance/clinch/ground
+            cells.append(_cell(_of(rng, 40), _of(rng, 40)))
+    else:
+        td = [_of(rng, 6), _of(rng, 6)]
+        ctrl = [
+            rng.choice(["--", f"{rng.randint(0, 4)}:{rng.randint(0, 59):02d}"])
+            for _ in range(2)
+        ]
+        cells.append(_cell(str(rng.randint(0, 1)), str(rng.randint(0, 1))))
+        cells.append(_cell(*sig))
+        cells.append(_cell(_pct(sig[0]), _pct(sig[1])))
+        cells.append(_cell(_of(rng, 120), _of(rng, 120)))
+        cells.append(_cell(*td))
+        cells.append(_cell(_pct(td[0]), _pct(td[1])))
+        cells.append(_cell(str(rng.randint(0, 2)), str(rng.randint(0, 2))))
+        cells.append(_cell(str(rng.randint(0, 1)), str(rng.randint(0, 1))))
+        cells.append(_cell(*ctrl))
+    return f'<tr class="b-fight-details__table-row">{"".join(cells)}</tr>'
+
+
+def _stats_tables(rng: random.Random, names: List[str], rounds: int, strikes: bool):
+    # totals tbody + per round tbody.
+    # real site puts round header theads inside the per round tbody, keeping that.
+    totals = f'<table class="b-fight-details__table"><tbody class="b-fight-details__table-body">{_stats_row(rng, names, strikes)}</tbody></table>'
+    per_round = "".join(
+        '<thead class="b-fight-details__table-row b-fight-details__table-row_type_head">'
+        f'<tr><th class="b-fight-details__table-col" colspan="10">Round {r}</th></tr></thead>'
+        + _stats_row(rng, names, strikes)
+        for r in range(1, rounds + 1)
+    )
+    per_round = f'<table class="b-fight-details__table js-fight-table"><tbody class="b-fight-details__table-body">{per_round}</tbody></table>'
+    return totals + per_round
+
+
+def _person(name: str, link: str, result: str) -> str:
+    style = {"W": "green", "L": "gray", "D": "gray", "NC": "gray"}[result]
+    return (
+        '<div class="b-fight-details__person">'
+        f'<i class="b-fight-details__person-status b-fight-details__person-status_style_{style}">{result}</i>'
+        '<div class="b-fight-details__person-text">'
+        f'<h3 class="b-fight-details__person-name"><a class="b-link b-fight-details__person-link" href="{link}">{name} </a></h3>'
+        "</div></div>"
+    )
+
+
+def _fight_page(rng: random.Random, base_url: str, red: Dict, blue: Dict) -> str:
+    rounds = rng.choice([3, 3, 3, 5])
+    last_round = rng.randint(1, rounds)
+    method = _METHODS[rng.randrange(2)] if last_round < rounds else rng.choice(_METHODS)
+    red_result, blue_result = rng.choice([("W", "L"), ("L", "W"), ("W", "L")])
+    title = rng.random() < 0.1
+    weight = rng.choice(_WEIGHTS)
+    fight_name = f"UFC {weight} Title Bout" if title else f"{weight} Bout"
+    bonus = (
+        '<img src="http://1e49bc5171d173577ecd-1323f4090557a33db01577564f60846c.r80.cf1.rackcdn.com/perf.png">'
+        if rng.random() < 0.1
+        else ""
+    )
+    fmt = "5 Rnd (5-5-5-5-5)" if rounds == 5 else "3 Rnd (5-5-5)"
+    names = [red["name"], blue["name"]]
+
+    return (
+        "<html><body>"
+        '<div class="b-fight-details__persons clearfix">'
+        + _person(red["name"], f"{base_url}/fighter-details/{red['id']}", red_result)
+        + _person(blue["name"], f"{base_url}/fighter-details/{blue['id']}", blue_result)
+        + "</div>"
+        '<div class="b-fight-details__fight">'
+        f'<div class="b-fight-details__fight-head"><i class="b-fight-details__fight-title">{bonus}{fight_name}</i></div>'
+        '<div class="b-fight-details__content">'
+        '<p class="b-fight-details__text">'
+        f'<i class="b-fight-details__text-item_first"><i class="b-fight-details__label">Method:</i><i style="font-style: normal">{method}</i></i>'
+        f'<i class="b-fight-details__text-item"><i class="b-fight-details__label">Round:</i>{last_round}</i>'
+        f'<i class="b-fight-details__text-item"><i class="b-fight-details__label">Time:</i>{rng.randint(0, 4)}:{rng.randint(0, 59):02d}</i>'
+        f'<i class="b-fight-details__text-item"><i class="b-fight-details__label">Time format:</i>{fmt}</i>'
+        f'<i class="b-fight-details__text-item"><i class="b-fight-details__label">Referee:</i><span>Herb Dean</span></i>'
+        "</p>"
+        '<p class="b-fight-details__text"><i class="b-fight-details__label">Details:</i> Synthetic fight.</p>'
+        "</div></div>"
+        + _stats_tables(rng, names, last_round, strikes=False)
+        + _stats_tables(rng, names, last_round, strikes=True)
+        + "</body></html>"
+    )
+
+
+def _event_page(event: Dict, fight_links: List[str]) -> str:
+    rows = "".join(
+        '<tr class="b-fight-details__table-row b-fight-details__table-row__hover js-fight-details-click" '
+        f'data-link="{link}"><td class="b-fight-details__table-col"></td></tr>'
+        for link in fight_links
+    )
+    return (
+        "<html><body>"
+        f'<h2 class="b-content__title"><span class="b-content__title-highlight">{event["title"]}</span></h2>'
+        '<ul class="b-list__box-list">'
+        f'<li class="b-list__box-list-item"><i class="b-list__box-item-title">Date:</i>{event["date"]}</li>'
+        f'<li class="b-list__box-list-item"><i class="b-list__box-item-title">Location:</i>{event["location"]}</li>'
+        "</ul>"
+        f'<table class="b-fight-details__table"><tbody class="b-fight-details__table-body">{rows}</tbody></table>'
+        "</body></html>"
+    )
+
+
+def _events_listing(events: Iterable[Dict]) -> str:
+    rows = "".join(
+        '<tr class="b-statistics__table-row">'
+        '<td class="b-statistics__table-col"><i class="b-statistics__table-content">'
+        f'<a href="{event["link"]}" class="b-link b-link_style_black">{event["title"]}</a>'
+        f'<span class="b-statistics__date">{event["date"]}</span></i></td>'
+        f'<td class="b-statistics__table-col b-statistics__table-col_style_big-top-padding">{event["location"]}</td>'
+        "</tr>"
+        for event in events
+    )
+    # blank row at top of table, like the real page
+    blank = '<tr class="b-statistics__table-row"><td class="b-statistics__table-col_type_clear"></td></tr>'
+    return f'<html><body><table class="b-statistics__table-events"><tbody>{blank}{rows}</tbody></table></body></html>'
+
+
+def _fighter_listing(fighters: Iterable[Dict]) -> str:
+    rows = "".join(
+        '<tr class="b-statistics__table-row">'
+        f'<td><a href="{f["link"]}" class="b-link b-link_style_black">{f["first"]}</a></td>'
+        f'<td><a href="{f["link"]}" class="b-link b-link_style_black">{f["last"]}</a></td>'
+        f'<td><a href="{f["link"]}" class="b-link b-link_style_black"></a></td>'
+        "</tr>"
+        for f in fighters
+    )
+    return f'<html><body><table class="b-statistics__table"><tbody>{rows}</tbody></table></body></html>'
+
+
+def _fighter_page(rng: random.Random, fighter: Dict) -> str:
+    items = [
+        ("Height:", f"5' {rng.randint(4, 11)}\""),
+        ("Weight:", f"{rng.choice([135, 145, 155, 170])} lbs."),
+        ("Reach:", f'{rng.randint(64, 76)}"'),
+        ("STANCE:", rng.choice(_STANCES)),
+        (
+            "DOB:",
+            f"{rng.choice(_MONTHS)[:3]} {rng.randint(1, 28):02d}, {rng.randint(1975, 1998)}",
+        ),
+        ("SLpM:", f"{rng.uniform(1, 7):.2f}"),
+        ("Str. Acc.:", f"{rng.randint(30, 60)}%"),
+        ("SApM:", f"{rng.uniform(1, 6):.2f}"),
+        ("Str. Def:", f"{rng.randint(40, 70)}%"),
+        ("", ""),
+        ("TD Avg.:", f"{rng.uniform(0, 5):.2f}"),
+        ("TD Acc.:", f"{rng.randint(0, 70)}%"),
+        ("TD Def.:", f"{rng.randint(30, 90)}%"),
+        ("Sub. Avg.:", f"{rng.uniform(0, 2):.1f}"),
+    ]
+    lis = "".join(
+        '<li class="b-list__box-list-item b-list__box-list-item_type_block">'
+        f'<i class="b-list__box-item-title">{label}</i>{value}</li>'
+        for label, value in items
+    )
+    return (
+        "<html><body>"
+        f'<span class="b-content__title-highlight">{fighter["first"]} {fighter["last"]}</span>'
+        f"<ul>{lis}</ul></body></html>"
+    )
+
+
+def generate_synthetic_site(
+    n_events: int = 50,
+    fights_per_event: int = 12,
+    n_fighters: int = 400,
+    seed: int = 0,
+    base_url: str = UFCSTATS_BASE_URL,
+) -> FixtureArchive:
+    """
+    Generates a fake (but structurally faithful) ufcstats site.
+
+    Args:
+        n_events (int): number of completed events
+        fights_per_event (int): fights on each event card
+        n_fighters (int): size of fighter roster fights are drawn from
+        seed (int): rng seed, same seed gives same site
+        base_url (str): host links in pages point at
+
+    Returns:
+        FixtureArchive: all events listing, event, fight, fighter listing and fighter pages
+    """
+    rng = random.Random(seed)
+    pages = {}
+
+    fighters = []
+    for _ in range(n_fighters):
+        fighter_id = _hex_id(rng)
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        fighters.append(
+            {
+                "id": fighter_id,
+                "first": first,
+                "last": last,
+                "name": f"{first} {last}",
+                "link": f"{base_url}/fighter-details/{fighter_id}",
+            }
+        )
+
+    events = []
+    for i in range(n_events):
+        event_id = _hex_id(rng)
+        # newest event first, like the real listing
+        year = 2020 - (i * 20) // 365
+        events.append(
+            {
+                "id": event_id,
+                "title": f"UFC Synthetic {n_events - i}",
+                "date": f"{rng.choice(_MONTHS)} {rng.randint(1, 28):02d}, {year}",
+                "location": "Las Vegas, Nevada, USA",
+                "link": f"{base_url}/event-details/{event_id}",
+            }
+        )
+
+    for event in events:
+        fight_links = []
+        for _ in range(fights_per_event):
+            fight_id = _hex_id(rng)
+            fight_link = f"{base_url}/fight-details/{fight_id}"
+            red, blue = rng.sample(fighters, 2)
+            pages[url_to_path(fight_link)] = _fight_page(rng, base_url, red, blue)
+            fight_links.append(fight_link)
+        pages[url_to_path(event["link"])] = _event_page(event, fight_links)
+
+    pages["/statistics/events/completed?page=all"] = _events_listing(events)
+    # paginated listing, newest first like page=all
+    for page_num, start in enumerate(range(0, n_events, EVENTS_PER_PAGE), start=1):
+        pages[f"/statistics/events/completed?page={page_num}"] = _events_listing(
+            events[start : start + EVENTS_PER_PAGE]
+        )
+    # the site answers one page past the end with an empty table, not a 404
+    last_page = -(-n_events // EVENTS_PER_PAGE)
+    pages[f"/statistics/events/completed?page={last_page + 1}"] = _events_listing([])
+
+    for alpha in (chr(i) for i in range(ord("a"), ord("a") + 26)):
+        group = [f for f in fighters if f["last"].lower().startswith(alpha)]
+        pages[f"/statistics/fighters?char={alpha}&page=all"] = _fighter_listing(group)
+
+    for fighter in fighters:
+        pages[url_to_path(fighter["link"])] = _fighter_page(rng, fighter)
+
+    return FixtureArchive(pages, base_url=base_url)
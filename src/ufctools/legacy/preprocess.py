@@ -1,17 +1,37 @@
-import math
+import csv
+import shutil
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
-from src.ufctools.legacy.preprocess_fighter_data import FighterDetailProcessor
+from src.ufctools.date_features import age_in_years, layoff_days
+from src.ufctools.feature_store import FighterFeatureStore
+from src.ufctools.fight_time import total_time_fought
+from src.ufctools.fileio import atomic_write
+from src.ufctools.legacy.preprocess_fighter_data import (
+    FighterDetailProcessor,
+    numerical_columns,
+    win_by_columns,
+)
+from src.ufctools.stat_parsing import (
+    pct_to_fraction,
+    split_landed_of_attempted,
+    time_to_seconds,
+)
 
 from src.ufctools.filepaths_and_schema import (  # isort:skip
+    FEATURE_STORE_PICKLE,
     FIGHTER_DETAILS,
     PREPROCESSED_DATA,
     TOTAL_EVENT_AND_FIGHTS,
     UFC_DATA,
 )
 
+# reads the text csvs written by the legacy scrapers ("12 of 20", "45%",
+# "2:31", ...) and nothing else. the typed fight data from scraping.py goes
+# to the fight log / parquet / sqlite stores, not through here.
+
 
 class Preprocessor:
     def __init__(self):
@@ -19,14 +39,59 @@ class Preprocessor:
         self.TOTAL_EVENT_AND_FIGHTS_PATH = TOTAL_EVENT_AND_FIGHTS
         self.PREPROCESSED_DATA_PATH = PREPROCESSED_DATA
         self.UFC_DATA_PATH = UFC_DATA
+        self.FEATURE_STORE_PATH = FEATURE_STORE_PICKLE
         self.fights = None
         self.fighter_details = None
         self.store = None
-
-    def process_raw_data(self):
+        # running fighter features, see feature_store.py
+        self.feature_store = None
+        # only fights not in feature_store are being processed
+        self.incremental = False
+
+    def process_raw_data(self, incremental=False, verify=False):
+        """
+        Args:
+            incremental (bool): only preprocess fights the feature store hasn't
+                seen and put them on top of data.csv / preprocessed_data.csv.
+                everything is rebuilt if there is no store yet or fights older
+                than the ones in it showed up
+            verify (bool): check incremental rows against a full rebuild
+        """
         print("Reading Files")
         self.fights, self.fighter_details = self._read_files()
+        self.incremental = incremental and self._keep_new_fights_only()
+        if self.incremental and self.fights.empty:
+            print("No new fights to preprocess\n")
+            return
+
+        self._build_data()
+        if self.incremental and verify:
+            self._verify_against_full_rebuild()
+        data = self.store.copy()
+
+        print("Fill NaNs")
+        self._fill_nas()
+        print("Dropping Non Essential Columns")
+        self._drop_non_essential_cols()
+
+        outputs = [
+            (data, self.UFC_DATA_PATH),
+            (self.store, self.PREPROCESSED_DATA_PATH),
+        ]
+        replaced_rows = {}
+        if self.incremental:
+            # lined up with both files before either is written
+            outputs = [(self._on_file_columns(df, path), path) for df, path in outputs]
+            replaced_rows = self._rows_from_interrupted_run(data)
+        for df, filepath in outputs:
+            self._save(
+                df, filepath=filepath, replaced_rows=replaced_rows.get(filepath, 0)
+            )
+        self.feature_store.save(self.FEATURE_STORE_PATH)
+        print("Successfully preprocessed and saved ufc data!\n")
 
+    def _build_data(self):
+        # everything in data.csv
         print("Drop columns that contain information not yet occurred")
         self._drop_future_fighter_details_columns()
 
@@ -45,14 +110,6 @@ class Preprocessor:
         self._create_winner_feature()
         self._create_fighter_attributes()
         self._create_fighter_age()
-        self._save(filepath=self.UFC_DATA_PATH)
-
-        print("Fill NaNs")
-        self._fill_nas()
-        print("Dropping Non Essential Columns")
-        self._drop_non_essential_cols()
-        self._save(filepath=self.PREPROCESSED_DATA_PATH)
-        print("Successfully preprocessed and saved ufc data!\n")
 
     def _read_files(self):
         try:
@@ -71,6 +128,56 @@ class Preprocessor:
 
         return fights_df, fighter_details_df
 
+    def _keep_new_fights_only(self):
+        # drops fights already preprocessed, False if everything needs rebuilding
+        if not (
+            Path(self.UFC_DATA_PATH).exists()
+            and Path(self.PREPROCESSED_DATA_PATH).exists()
+        ):
+            return False
+        feature_store = FighterFeatureStore.load(self.FEATURE_STORE_PATH)
+        if feature_store is None:
+            return False
+
+        new_fights = self.fights[feature_store.is_new(self.fights)]
+        if not feature_store.can_update(new_fights):
+            print("Found fights older than preprocessed ones, rebuilding everything")
+            return False
+        print(f"Preprocessing {len(new_fights)} new fights")
+        self.feature_store = feature_store
+        self.fights = new_fights.reset_index(drop=True)
+        return True
+
+    def _verify_against_full_rebuild(self):
+        # new rows have to be what preprocessing all fights would give them
+        print("Verifying new rows against a full rebuild")
+        full = type(self)()
+        full.FIGHTER_DETAILS_PATH = self.FIGHTER_DETAILS_PATH
+        full.TOTAL_EVENT_AND_FIGHTS_PATH = self.TOTAL_EVENT_AND_FIGHTS_PATH
+        full.fights, full.fighter_details = full._read_files()
+        full._build_data()
+
+        key = ["R_fighter", "B_fighter", "date"]
+        expected = full.store.set_index(key)
+        rows = self.store.set_index(key)
+        expected = expected.loc[rows.index, rows.columns]
+        mismatched = []
+        for column in rows.columns:
+            got, want = rows[column], expected[column]
+            if pd.api.types.is_numeric_dtype(got) and pd.api.types.is_numeric_dtype(
+                want
+            ):
+                same = np.isclose(got.astype(float), want.astype(float), equal_nan=True)
+            else:
+                same = (got == want) | (got.isna() & want.isna())
+            if not np.all(same):
+                mismatched.append(column)
+        if mismatched:
+            raise ValueError(
+                f"incremental rows differ from a full rebuild in {mismatched}"
+            )
+        print("New rows match a full rebuild")
+
     def _drop_future_fighter_details_columns(self):
         self.fighter_details.drop(
             columns=[
@@ -111,32 +218,29 @@ class Preprocessor:
         attempt_suffix = "_att"
         landed_suffix = "_landed"
 
+        # one vectorized pass over all of them
+        landed, attempted = split_landed_of_attempted(self.fights, columns)
+        split_columns = {}
         for column in columns:
-            self.fights[column + attempt_suffix] = self.fights[column].apply(
-                lambda X: int(X.split("of")[1])
-            )
-            self.fights[column + landed_suffix] = self.fights[column].apply(
-                lambda X: int(X.split("of")[0])
-            )
+            split_columns[column + attempt_suffix] = attempted[column]
+            split_columns[column + landed_suffix] = landed[column]
 
-        self.fights.drop(columns, axis=1, inplace=True)
+        self.fights = pd.concat(
+            [self.fights.drop(columns, axis=1), pd.DataFrame(split_columns)],
+            axis=1,
+        )
 
     def _replacing_winner_nans_draw(self):
-        self.fights["Winner"].fillna("Draw", inplace=True)
+        self.fights["Winner"] = self.fights["Winner"].fillna("Draw")
 
     def _convert_percentages_to_fractions(self):
         pct_columns = ["R_SIG_STR_pct", "B_SIG_STR_pct", "R_TD_pct", "B_TD_pct"]
 
-        def pct_to_frac(X):
-            if X != "---":
-                return float(X.replace("%", "")) / 100
-            else:
-                # if '---' means it's taking pct of `0 of 0`.
-                # Taking a call here to consider 0 landed of 0 attempted as 0 percentage
-                return 0
+        self.fights[pct_columns] = pct_to_fraction(self.fights, pct_columns)
 
-        for column in pct_columns:
-            self.fights[column] = self.fights[column].apply(pct_to_frac)
+        # if '---' means it's taking pct of `0 of 0`.
+        # Taking a call here to consider 0 landed of 0 attempted as 0 percentage
+        self.fights[pct_columns] = self.fights[pct_columns].fillna(0)
 
     def _create_title_bout_feature(self):
         self.fights["title_bout"] = self.fights["Fight_type"].apply(
@@ -195,80 +299,33 @@ class Preprocessor:
 
     def _convert_last_round_to_seconds(self):
         # Converting to seconds
-        self.fights["last_round_time"] = self.fights["last_round_time"].apply(
-            lambda X: int(X.split(":")[0]) * 60 + int(X.split(":")[1])
-        )
+        self.fights["last_round_time"] = time_to_seconds(
+            self.fights, ["last_round_time"]
+        )["last_round_time"]
 
     def _convert_CTRL_to_seconds(self):
         # Converting to seconds
         CTRL_columns = ["R_CTRL", "B_CTRL"]
 
-        def conv_to_sec(X):
-            if X != "--":
-                return int(X.split(":")[0]) * 60 + int(X.split(":")[1])
-            else:
-                # if '--' means there was no time spent on the ground.
-                # Taking a call here to consider this as 0 seconds
-                return 0
+        seconds = time_to_seconds(self.fights, CTRL_columns)
 
+        # if '--' means there was no time spent on the ground.
+        # Taking a call here to consider this as 0 seconds
         for column in CTRL_columns:
-            self.fights[column + "_time(seconds)"] = self.fights[column].apply(
-                conv_to_sec
+            self.fights[column + "_time(seconds)"] = (
+                seconds[column].fillna(0).astype("int64")
             )
 
         # drop original columns
         self.fights.drop(["R_CTRL", "B_CTRL"], axis=1, inplace=True)
 
     def _get_total_time_fought(self):
-        # '1 Rnd + 2OT (15-3-3)' and '1 Rnd + 2OT (24-3-3)' is not included because it has 3 uneven timed rounds.
-        # We'll have to deal with it separately
-        time_in_first_round = {
-            "3 Rnd (5-5-5)": 5 * 60,
-            "5 Rnd (5-5-5-5-5)": 5 * 60,
-            "1 Rnd + OT (12-3)": 12 * 60,
-            "No Time Limit": 1,
-            "3 Rnd + OT (5-5-5-5)": 5 * 60,
-            "1 Rnd (20)": 1 * 20,
-            "2 Rnd (5-5)": 5 * 60,
-            "1 Rnd (15)": 15 * 60,
-            "1 Rnd (10)": 10 * 60,
-            "1 Rnd (12)": 12 * 60,
-            "1 Rnd + OT (30-5)": 30 * 60,
-            "1 Rnd (18)": 18 * 60,
-            "1 Rnd + OT (15-3)": 15 * 60,
-            "1 Rnd (30)": 30 * 60,
-            "1 Rnd + OT (31-5)": 31 * 5,
-            "1 Rnd + OT (27-3)": 27 * 60,
-            "1 Rnd + OT (30-3)": 30 * 60,
-        }
-
-        exception_format_time = {
-            "1 Rnd + 2OT (15-3-3)": [15 * 60, 3 * 60],
-            "1 Rnd + 2OT (24-3-3)": [24 * 60, 3 * 60],
-        }
-
-        def get_total_time(row):
-            if row["Format"] in time_in_first_round.keys():
-                return (row["last_round"] - 1) * time_in_first_round[
-                    row["Format"]
-                ] + row["last_round_time"]
-
-            elif row["Format"] in exception_format_time.keys():
-
-                if (row["last_round"] - 1) >= 2:
-                    return (
-                        exception_format_time[row["Format"]][0]
-                        + (row["last_round"] - 2)
-                        * exception_format_time[row["Format"]][1]
-                        + row["last_round_time"]
-                    )
-                else:
-                    return (row["last_round"] - 1) * exception_format_time[
-                        row["Format"]
-                    ][0] + row["last_round_time"]
-
-        self.fights["total_time_fought(seconds)"] = self.fights.apply(
-            get_total_time, axis=1
+        # round lengths come from the format string itself, e.g. "1 Rnd + 2OT (15-3-3)",
+        # and total time is computed for all fights at once (see fight_time.py)
+        self.fights["total_time_fought(seconds)"] = total_time_fought(
+            self.fights["Format"],
+            self.fights["last_round"],
+            self.fights["last_round_time"],
         )
         self.fights.drop(
             ["Format", "Fight_type", "last_round_time"], axis=1, inplace=True
@@ -351,41 +408,104 @@ class Preprocessor:
         )
 
     def _create_fighter_attributes(self):
-        frame = FighterDetailProcessor(self.fights, self.fighter_details).frame
-        self.store = self.store.join(frame, how="outer")
+        processor = FighterDetailProcessor(
+            self.fights, self.fighter_details, self.feature_store
+        )
+        if not self.incremental:
+            # every fighter's state after these fights, for incremental runs
+            self.feature_store = FighterFeatureStore.from_fights(
+                processor.fights, numerical_columns, win_by_columns
+            )
+        self.store = self.store.join(processor.frame, how="outer")
 
     def _create_fighter_age(self):
-        self.store["R_DOB"] = pd.to_datetime(self.store["R_DOB"])
-        self.store["B_DOB"] = pd.to_datetime(self.store["B_DOB"])
+        # ages and layoffs of both corners, whole column ops (see date_features.py)
         self.store["date"] = pd.to_datetime(self.store["date"])
-
-        def get_age(row):
-            B_age = (row["date"] - row["B_DOB"]).days
-            R_age = (row["date"] - row["R_DOB"]).days
-
-            if np.isnan(B_age) != True:
-                B_age = math.floor(B_age / 365.25)
-
-            if np.isnan(R_age) != True:
-                R_age = math.floor(R_age / 365.25)
-
-            return pd.Series([B_age, R_age], index=["B_age", "R_age"])
-
-        self.store[["B_age", "R_age"]] = self.store[["date", "R_DOB", "B_DOB"]].apply(
-            get_age, axis=1
-        )
+        for corner in ("B", "R"):
+            self.store[f"{corner}_age"] = age_in_years(
+                self.store["date"], self.store[f"{corner}_DOB"]
+            )
+        if self.incremental:
+            # carries on from each fighter's last preprocessed fight
+            layoffs = self.feature_store.layoff_days(self.store)
+        else:
+            layoffs = layoff_days(self.store)
+        self.store[layoffs.columns] = layoffs
         self.store.drop(["R_DOB", "B_DOB"], axis=1, inplace=True)
 
-    def _save(self, filepath):
-        self.store.to_csv(filepath, index=False)
+    def _rows_from_interrupted_run(self, new_rows):
+        # rows of these fights already on top of the files, left by a run that
+        # stopped before saving the feature store (it's saved last), so they
+        # are replaced instead of added twice. found by fight in data.csv,
+        # preprocessed_data.csv has no fight columns but is data.csv minus draws
+        key = ["R_fighter", "B_fighter", "date"]
+        on_file = pd.read_csv(self.UFC_DATA_PATH, usecols=key + ["Winner"])
+        on_file["date"] = pd.to_datetime(on_file["date"])
+        new_keys = set(new_rows[key].itertuples(index=False, name=None))
+        is_new = [
+            fight in new_keys
+            for fight in on_file[key].itertuples(index=False, name=None)
+        ]
+        n_data = is_new.index(False) if False in is_new else len(is_new)
+        kept_non_draws = int((on_file["Winner"].iloc[n_data:] != "Draw").sum())
+        with open(self.PREPROCESSED_DATA_PATH, newline="") as f:
+            n_preprocessed = sum(1 for _ in csv.reader(f)) - 1
+        n_preprocessed -= kept_non_draws
+        if n_preprocessed < 0:
+            raise ValueError(
+                f"{self.PREPROCESSED_DATA_PATH} doesn't line up with "
+                f"{self.UFC_DATA_PATH}, rebuild them with incremental=False"
+            )
+        if n_data or n_preprocessed:
+            print("Replacing rows left by an interrupted run")
+        return {self.UFC_DATA_PATH: n_data, self.PREPROCESSED_DATA_PATH: n_preprocessed}
+
+    def _save(self, df, filepath, replaced_rows=0):
+        if not self.incremental:
+            df.to_csv(filepath, index=False)
+            return
+        # files are newest first, so new rows go on top
+        # and the rows already there are copied over as they are
+        with open(filepath, newline="") as old:
+            header = old.readline()
+            for _ in range(replaced_rows):
+                old.readline()
+            with atomic_write(filepath, newline="") as f:
+                f.write(header)
+                df.to_csv(f, header=False, index=False)
+                shutil.copyfileobj(old, f)
+
+    @staticmethod
+    def _on_file_columns(df, filepath):
+        # new rows with the columns (and column order) of filepath
+        with open(filepath, newline="") as f:
+            columns = next(csv.reader(f))
+        unknown = set(df.columns) - set(columns)
+        if unknown:
+            raise ValueError(
+                f"{filepath} has no {sorted(unknown)} columns, "
+                "rebuild it with incremental=False"
+            )
+        # only one hot columns of categories the new rows don't have are missing
+        return df.reindex(columns=columns, fill_value=False)
 
     def _fill_nas(self):
-        self.store["R_Reach_cms"].fillna(self.store["R_Height_cms"], inplace=True)
-        self.store["B_Reach_cms"].fillna(self.store["B_Height_cms"], inplace=True)
-        self.store.fillna(self.store.median(), inplace=True)
-
-        self.store["R_Stance"].fillna("Orthodox", inplace=True)
-        self.store["B_Stance"].fillna("Orthodox", inplace=True)
+        for corner in ("R", "B"):
+            self.store[f"{corner}_Reach_cms"] = self.store[
+                f"{corner}_Reach_cms"
+            ].fillna(self.store[f"{corner}_Height_cms"])
+        if self.incremental:
+            # medians of the last full rebuild, not of the few new rows
+            fill_values = self.feature_store.extras["fill_values"]
+        else:
+            fill_values = self.store.median(numeric_only=True)
+            self.feature_store.extras["fill_values"] = fill_values
+        self.store.fillna(fill_values, inplace=True)
+
+        for corner in ("R", "B"):
+            self.store[f"{corner}_Stance"] = self.store[f"{corner}_Stance"].fillna(
+                "Orthodox"
+            )
 
     def _drop_non_essential_cols(self):
         self.store.drop(self.store.index[self.store["Winner"] == "Draw"], inplace=True)
@@ -1,21 +1,28 @@
 import os
-import concurrent.futures
-from typing import Dict, List
+from typing import Dict, List, Optional, TextIO
 
 import pandas as pd
 from bs4 import BeautifulSoup
 
 from src.ufctools.legacy.scrape_fight_links import UFCLinks
-from src.ufctools.utils import make_soup, print_progress
+from src.ufctools.fetching import DEFAULT_POOL_SIZE, ensure_pool_size
+from src.ufctools.pipeline import FetchParsePipeline
+from src.ufctools.throttle import FetchError
+from src.ufctools.utils import parse_page, print_progress
 
 from src.ufctools.filepaths_and_schema import (  # isort:skip
     NEW_FIGHTS_DATA_PATH,
     TOTAL_FIGHTS_DATA_PATH,
 )
 
+# buffer for streaming fight rows to csv
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class FightDataScraper:
-    def __init__(self):
+    def __init__(
+        self, max_workers: int = DEFAULT_POOL_SIZE, parse_workers: Optional[int] = None
+    ):
         self.HEADER: str = (
             "R_fighter;B_fighter;R_KD;B_KD;R_SIG_STR.;B_SIG_STR.\
 ;R_SIG_STR_pct;B_SIG_STR_pct;R_TOTAL_STR.;B_TOTAL_STR.;R_TD;B_TD;R_TD_pct\
@@ -26,6 +33,13 @@ class FightDataScraper:
 
         self.NEW_FIGHTS_DATA_PATH = NEW_FIGHTS_DATA_PATH
         self.TOTAL_FIGHTS_DATA_PATH = TOTAL_FIGHTS_DATA_PATH
+        # one pooled connection per worker thread
+        self.max_workers = max_workers
+        ensure_pool_size(max_workers)
+        # parser processes, defaults to cpu count
+        self.parse_workers = parse_workers
+        # fights whose pages couldn't be fetched even after retries
+        self.failed_fight_links: List[str] = []
 
     def create_fight_data_csv(self) -> None:
         print("Scraping links!")
@@ -46,23 +60,23 @@ class FightDataScraper:
                 # but good enough for now
                 print(
                     f"""No new fight data to scrape.
-                        {self.TOTAL_EVENT_AND_FIGHTS_PATH} up to date."""
+                        {self.TOTAL_FIGHTS_DATA_PATH} up to date."""
                 )
                 return None
             else:
                 # if no data csv, scrape all fights and make it.
                 self._scrape_raw_fight_data(
                     all_fight_links,
-                    filepath=self.TOTAL_FIGHTS_PATH,
+                    filepath=self.TOTAL_FIGHTS_DATA_PATH,
                 )
         else:
             # scrape only fights from new events
             self._scrape_raw_fight_data(
-                new_fight_links, filepath=self.NEW_EVENT_AND_FIGHTS_PATH
+                new_fight_links, filepath=self.NEW_FIGHTS_DATA_PATH
             )
 
-            new_fights_data = pd.read_csv(self.NEW_FIGHTS_PATH)
-            old_fights_data = pd.read_csv(self.TOTAL_FIGHTS_PATH)
+            new_fights_data = pd.read_csv(self.NEW_FIGHTS_DATA_PATH)
+            old_fights_data = pd.read_csv(self.TOTAL_FIGHTS_DATA_PATH)
 
             # verify same column count
             assert len(new_fights_data.columns) == len(old_fights_data.columns)
@@ -80,7 +94,7 @@ class FightDataScraper:
 
             latest_total_fight_data.to_csv(self.TOTAL_FIGHTS_DATA_PATH, index=None)
             print(f"Updated {self.TOTAL_FIGHTS_DATA_PATH} with new fight data")
-            os.remove(self.NEW_EVENT_AND_FIGHTS_DATA_PATH)
+            os.remove(self.NEW_FIGHTS_DATA_PATH)
             print("Removed temporary files.")
 
         print("Successfully scraped and saved UFC fight data!")
@@ -91,63 +105,74 @@ class FightDataScraper:
         if filepath.exists():
             print(f"File {filepath} already exists, overwriting.")
 
-        total_stats = self._get_total_fight_stats(event_and_fight_links)
-        with open(filepath.as_posix(), "wb") as file:
-            file.write(bytes(self.HEADER, encoding="ascii", errors="ignore"))
-            file.write(bytes(total_stats, encoding="ascii", errors="ignore"))
-
-    def _get_fight_stats_task(self, fight, event_info):
-        total_fight_stats = ""
-        try:
-            fight_soup = make_soup(fight)
-            fight_stats = self._get_fight_stats(fight_soup)
-            fight_details = self._get_fight_details(fight_soup)
-            result_data = self._get_fight_result_data(fight_soup)
-            total_fight_stats = (
-                fight_stats + ";" + fight_details + ";" + event_info + ";" + result_data
-            )
-        except Exception as e:
-            print("Error getting fight stats, " + str(e))
-            pass
-
-        return total_fight_stats
-
-    def _get_total_fight_stats(self, fight_links: Dict[str, List[str]]) -> str:
-        total_stats = ""
+        # rows are written as they come in rather than built up into one big string
+        with open(
+            filepath.as_posix(),
+            "w",
+            encoding="ascii",
+            errors="ignore",
+            newline="",
+            buffering=WRITE_BUFFER_SIZE,
+        ) as file:
+            file.write(self.HEADER)
+            self._get_total_fight_stats(event_and_fight_links, file)
+
+    def _get_total_fight_stats(
+        self, fight_links: Dict[str, List[str]], file: TextIO
+    ) -> int:
+        # streams one line per fight to file, returns number of fights written
+        rows_written = 0
+
+        # pages are downloaded on threads and parsed in worker processes
+        pipeline = FetchParsePipeline(
+            io_workers=self.max_workers, parse_workers=self.parse_workers
+        )
 
-        fight_count = len(fight_links)
+        # event pages first, for the event info that goes on each of its fights
+        event_infos = {}
+        for event, _, event_info, error in pipeline.run(
+            [(event, None) for event in fight_links], parse_event_info
+        ):
+            if error is not None:
+                raise error
+            event_infos[event] = event_info
+
+        fight_items = [
+            (fight, event_infos[event])
+            for event, fights in fight_links.items()
+            for fight in fights
+        ]
+        fight_count = len(fight_items)
         print(f"Scraping data for {fight_count} fights: ")
         print_progress(0, fight_count, prefix="Progress:", suffix="Complete")
 
-        for index, (event, fights) in enumerate(fight_links.items()):
-            event_soup = make_soup(event)
-            event_info = self._get_event_info(event_soup)
-
-            # Get data for each fight in the event in parallel.
-            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-                futures = []
-                for fight in fights:
-                    futures.append(
-                        executor.submit(
-                            self._get_fight_stats_task,
-                            fight=fight,
-                            event_info=event_info,
-                        )
-                    )
-                for future in concurrent.futures.as_completed(futures):
-                    fight_stats = future.result()
-                    if fight_stats != "":
-                        if total_stats == "":
-                            total_stats = fight_stats
-                        else:
-                            total_stats = total_stats + "\n" + fight_stats
-                    print_progress(
-                        index + 1, fight_count, prefix="Progress:", suffix="Complete"
-                    )
-
-        return total_stats
-
-    def _get_fight_stats(self, fight_soup: BeautifulSoup) -> str:
+        # results come back in event/fight order
+        for index, (fight, _, fight_stats, error) in enumerate(
+            pipeline.run(fight_items, parse_fight_stats)
+        ):
+            if isinstance(error, FetchError):
+                # keep track of these so they aren't lost silently
+                print("Error fetching fight, " + str(error))
+                self.failed_fight_links.append(fight)
+            elif error is not None:
+                print("Error getting fight stats, " + str(error))
+            else:
+                file.write(fight_stats + "\n")
+                rows_written += 1
+            print_progress(
+                index + 1, fight_count, prefix="Progress:", suffix="Complete"
+            )
+
+        if self.failed_fight_links:
+            print(
+                f"{len(self.failed_fight_links)} fight/s could not be fetched, "
+                "see failed_fight_links"
+            )
+
+        return rows_written
+
+    @staticmethod
+    def _get_fight_stats(fight_soup: BeautifulSoup) -> str:
         tables = fight_soup.findAll("tbody")
         # hard coded to grab totals and significant strike stats.
         # skips per round stats
@@ -176,7 +201,8 @@ class FightDataScraper:
         fight_stats = ";".join(fight_stats)
         return fight_stats
 
-    def _get_fight_details(self, fight_soup: BeautifulSoup) -> str:
+    @staticmethod
+    def _get_fight_details(fight_soup: BeautifulSoup) -> str:
         columns = ""
         for div in fight_soup.findAll("div", {"class": "b-fight-details__content"}):
             for col in div.findAll("p", {"class": "b-fight-details__text"}):
@@ -202,7 +228,8 @@ class FightDataScraper:
 
         return fight_details
 
-    def _get_event_info(self, event_soup: BeautifulSoup) -> str:
+    @staticmethod
+    def _get_event_info(event_soup: BeautifulSoup) -> str:
         event_info = ""
         for info in event_soup.findAll("li", {"class": "b-list__box-list-item"}):
             if event_info == "":
@@ -221,7 +248,8 @@ class FightDataScraper:
 
         return event_info
 
-    def _get_fight_result_data(self, fight_soup: BeautifulSoup) -> str:
+    @staticmethod
+    def _get_fight_result_data(fight_soup: BeautifulSoup) -> str:
         winner = ""
         for div in fight_soup.findAll("div", {"class": "b-fight-details__person"}):
             if (
@@ -246,3 +274,20 @@ class FightDataScraper:
         )
 
         return fight_type + ";" + winner
+
+
+# module level parse functions so they can run in the pipeline's worker processes.
+# signature is (url, page bytes, context), see pipeline.py
+
+
+def parse_event_info(event_link: str, page: bytes, context=None) -> str:
+    event_soup = parse_page(page)
+    return FightDataScraper._get_event_info(event_soup)
+
+
+def parse_fight_stats(fight_link: str, page: bytes, event_info: str) -> str:
+    fight_soup = parse_page(page)
+    fight_stats = FightDataScraper._get_fight_stats(fight_soup)
+    fight_details = FightDataScraper._get_fight_details(fight_soup)
+    result_data = FightDataScraper._get_fight_result_data(fight_soup)
+    return fight_stats + ";" + fight_details + ";" + event_info + ";" + result_data
@@ -1,21 +1,31 @@
 import pickle
-import concurrent.futures
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
+from bs4 import BeautifulSoup
 
-from src.ufctools.utils import make_soup, print_progress
+from src.ufctools.fetching import DEFAULT_POOL_SIZE, ensure_pool_size
+from src.ufctools.pipeline import FetchParsePipeline
+from src.ufctools.utils import make_soup, parse_page, print_progress
 
 from src.ufctools.filepaths_and_schema import (  # isort:skip
     FIGHTER_DETAILS,
     PAST_FIGHTER_LINKS_PICKLE,
     SCRAPED_FIGHTER_DATA_DICT_PICKLE,
+    UFCSTATS_BASE_URL,
 )
 
 
 class FighterDetailsScraper:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_POOL_SIZE,
+        base_url: str = UFCSTATS_BASE_URL,
+        parse_workers: Optional[int] = None,
+    ):
+        # base_url can point at a stand-in server (see standin.py)
+        self.base_url = base_url
         self.HEADER = [
             "Height",
             "Weight",
@@ -38,11 +48,16 @@ class FighterDetailsScraper:
         self.new_fighters_exists = False
         self.new_fighter_links: Dict[str, List[str]] = {}
         self.all_fighter_links: Dict[str, List[str]] = {}
+        # one pooled connection per worker thread
+        self.max_workers = max_workers
+        ensure_pool_size(max_workers)
+        # parser processes, defaults to cpu count
+        self.parse_workers = parse_workers
 
     def _get_fighter_group_urls(self) -> List[str]:
         alphas = [chr(i) for i in range(ord("a"), ord("a") + 26)]
         fighter_group_urls = [
-            f"http://ufcstats.com/statistics/fighters?char={alpha}&page=all"
+            f"{self.base_url}/statistics/fighters?char={alpha}&page=all"
             for alpha in alphas
         ]
         return fighter_group_urls
@@ -105,8 +120,8 @@ class FighterDetailsScraper:
 
         return new_fighter_links, all_fighter_links
 
-    def _get_fighter_data_task(self, fighter_name, fighter_url):
-        another_soup = make_soup(fighter_url)
+    @staticmethod
+    def _get_fighter_data(another_soup: BeautifulSoup) -> List[str]:
         divs = another_soup.findAll(
             "li",
             {"class": "b-list__box-list-item b-list__box-list-item_type_block"},
@@ -133,7 +148,7 @@ class FighterDetailsScraper:
                 .replace("TD Def.:", "")
                 .replace("Sub. Avg.:", "")
             )
-        return fighter_name, data
+        return data
 
     def _get_fighter_name_and_details(
         self, fighter_name_and_link: Dict[str, List[str]]
@@ -143,28 +158,23 @@ class FighterDetailsScraper:
         l = len(fighter_name_and_link)
         print(f"Scraping data for {l} fighters: ")
 
-        # Get fighter data in parallel.
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            futures = []
-            for index, (fighter_name, fighter_url) in enumerate(
-                fighter_name_and_link.items()
-            ):
-                futures.append(
-                    executor.submit(
-                        FighterDetailsScraper._get_fighter_data_task,
-                        self=self,
-                        fighter_name=fighter_name,
-                        fighter_url=fighter_url,
-                    )
-                )
-            idx_progress = 0
-            print_progress(0, l, prefix="Progress:", suffix="Complete")
-            for future in concurrent.futures.as_completed(futures):
-                fighter_name_and_details[future.result()[0]] = future.result()[1]
-                print_progress(
-                    idx_progress + 1, l, prefix="Progress:", suffix="Complete"
-                )
-                idx_progress += 1
+        # pages are downloaded on threads and parsed in worker processes
+        pipeline = FetchParsePipeline(
+            io_workers=self.max_workers, parse_workers=self.parse_workers
+        )
+        print_progress(0, l, prefix="Progress:", suffix="Complete")
+        for index, (fighter_url, fighter_name, details, error) in enumerate(
+            pipeline.run(
+                [(url, name) for name, url in fighter_name_and_link.items()],
+                parse_fighter_details,
+            )
+        ):
+            if error is not None:
+                # left out, same as fighters with no data below
+                print(f"Error getting fighter details for {fighter_url}, {error}")
+            else:
+                fighter_name_and_details[fighter_name] = details
+            print_progress(index + 1, l, prefix="Progress:", suffix="Complete")
 
         fighters_with_no_data = []
         for name, details in fighter_name_and_details.items():
@@ -234,3 +244,11 @@ class FighterDetailsScraper:
         print(
             f"Successfully scraped and saved ufc fighter data to {self.FIGHTER_DETAILS_PATH}\n"
         )
+
+
+# module level so it can run in the pipeline's worker processes, see pipeline.py
+def parse_fighter_details(
+    fighter_url: str, page: bytes, fighter_name: str
+) -> List[str]:
+    fighter_soup = parse_page(page)
+    return FighterDetailsScraper._get_fighter_data(fighter_soup)
@@ -0,0 +1,159 @@
+import concurrent.futures
+import os
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from src.ufctools.fetching import DEFAULT_POOL_SIZE, ensure_pool_size
+from src.ufctools.utils import fetch_page, get_parser, set_parser
+
+# two stage fetch -> parse pipeline.
+# with a plain thread pool the downloads overlap fine, but every thread then
+# builds its BeautifulSoup tree under the GIL, so parsing runs on one core no
+# matter how many workers there are. here:
+# - io threads download raw pages (bytes) into a bounded queue
+# - a process pool parses them, so parsing scales with core count
+# - results come back out in the same order as the input
+# the bounded queue means fetchers wait when parsing falls behind, and
+# fetchers never run more than a window of max_buffered + 2 * parse_workers
+# pages ahead of the next result out, so a slow page at the head of the line
+# can't pile up finished pages behind it. memory is capped by that window no
+# matter how big the input is.
+
+# parse_func(url, page, context) -> anything picklable.
+# has to be a module level function so it can be sent to worker processes.
+ParseFunc = Callable[[str, bytes, Any], Any]
+
+
+class FetchParsePipeline:
+    def __init__(
+        self,
+        io_workers: int = DEFAULT_POOL_SIZE,
+        parse_workers: Optional[int] = None,
+        max_buffered: Optional[int] = None,
+    ):
+        """
+        Args:
+            io_workers (int): threads downloading pages
+            parse_workers (int, optional): parser processes, defaults to cpu count
+            max_buffered (int, optional): max downloaded pages waiting to be parsed,
+                defaults to 4 per parse worker
+        """
+        self.io_workers = io_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.max_buffered = max_buffered or 4 * self.parse_workers
+        # one pooled connection per io thread
+        ensure_pool_size(io_workers)
+
+    def run(
+        self, items: Iterable[Tuple[str, Any]], parse_func: ParseFunc
+    ) -> Iterator[Tuple[str, Any, Any, Optional[Exception]]]:
+        """
+        Fetches and parses pages, yielding results in input order.
+
+        Args:
+            items (Iterable[Tuple[str, Any]]): (url, context) pairs. context is
+                handed to parse_func untouched (e.g. event info for a fight page)
+            parse_func (ParseFunc): module level parse function
+
+        Yields:
+            Tuple: (url, context, result, error). error is the exception raised
+            by the fetch (e.g. FetchError) or parse, in which case result is None.
+        """
+        items = list(items)
+        if not items:
+            return
+
+        todo = queue.Queue()
+        for idx in range(len(items)):
+            todo.put(idx)
+        fetched = queue.Queue(maxsize=self.max_buffered)
+        stop = threading.Event()
+        # parses submitted at once, enough to keep every worker busy
+        max_parsing = 2 * self.parse_workers
+        # pages fetched but not yielded yet (queued, parsing or parsed and
+        # waiting for their turn) are at most this many
+        window = self.max_buffered + max_parsing
+        next_idx = 0
+        moved_on = threading.Condition()
+
+        def fetch_worker():
+            while not stop.is_set():
+                try:
+                    idx = todo.get_nowait()
+                except queue.Empty:
+                    return
+                # wait for the head of line to catch up
+                with moved_on:
+                    while idx >= next_idx + window and not stop.is_set():
+                        moved_on.wait(0.1)
+                if stop.is_set():
+                    return
+                try:
+                    page, error = fetch_page(items[idx][0]), None
+                except Exception as e:
+                    page, error = None, e
+                # blocks while queue is full (parsers behind), unless told to stop
+                while not stop.is_set():
+                    try:
+                        fetched.put((idx, page, error), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+        threads = [
+            threading.Thread(target=fetch_worker, daemon=True)
+            for _ in range(min(self.io_workers, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+
+        # parser backend is module state in utils, pass it on to the workers
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            initializer=set_parser,
+            initargs=(get_parser(),),
+        )
+        try:
+            pending = {}
+            received = 0
+            while next_idx < len(items):
+                head = pending.get(next_idx)
+                if head is not None and head.done():
+                    del pending[next_idx]
+                    try:
+                        result, error = head.result(), None
+                    except Exception as e:
+                        result, error = None, e
+                    url, context = items[next_idx]
+                    yield url, context, result, error
+                    with moved_on:
+                        next_idx += 1
+                        moved_on.notify_all()
+                elif received < len(items) and (
+                    len(pending) < max_parsing or head is None
+                ):
+                    # head of line not fetched yet has to be pulled through
+                    # even if it means going over max_parsing, fetchers
+                    # staying inside the window keeps pending bounded
+                    idx, page, error = fetched.get()
+                    received += 1
+                    if error is None:
+                        url, context = items[idx]
+                        pending[idx] = pool.submit(parse_func, url, page, context)
+                    else:
+                        pending[idx] = _failed_future(error)
+                else:
+                    concurrent.futures.wait([head])
+        finally:
+            # also runs if the consumer stops iterating early
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            for thread in threads:
+                thread.join()
+
+
+def _failed_future(error: Exception) -> concurrent.futures.Future:
+    future = concurrent.futures.Future()
+    future.set_exception(error)
+    return future
@@ -0,0 +1,186 @@
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# exponentially weighted averages of every fighter's history, for all fighters,
+# stats and spans in one sweep.
+#
+# histories are stored ragged (CSR style): one contiguous float32 matrix with
+# every fighter's fights back to back, oldest first, and offsets where each
+# fighter's rows start
+#   values[offsets[f] : offsets[f + 1]]  ->  fights of fighter f
+#
+# the ewm recursion is sequential within a fighter, so the sweep steps through
+# fight number k = 0, 1, ... and updates the k-th fight of every fighter that
+# has one at once. fighters are ordered by number of fights, so the ones still
+# going at step k are a prefix of that order and the running state is a plain
+# slice. the number of steps is the longest career, not the number of fights.
+# the running state (EWMState) can be kept after the sweep and fed more fights
+# one at a time (see feature_store.py).
+#
+# matches pandas .ewm(span=span, adjust=False).mean() (ignore_na=False):
+# a missing value leaves the average as is but still decays its weight, so the
+# next value counts for more. pandas weighs that next value 1 - old weight
+# instead of alpha when com == 1 (span 3), so the same is done here.
+# accumulation is float64.
+
+CAREER = "career"
+
+
+class FighterHistories:
+    def __init__(self, offsets: np.ndarray, values: np.ndarray, columns: List[str]):
+        """
+        Args:
+            offsets (np.ndarray): start row of each fighter, plus total rows
+            values (np.ndarray): (rows, columns) float32, fighters back to back,
+                each fighter's fights oldest first
+            columns (List[str]): stat of each column of values
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.columns = list(columns)
+
+    @classmethod
+    def from_long(
+        cls, long: pd.DataFrame, columns: List[str], fighter_col: str = "hero_fighter"
+    ) -> "FighterHistories":
+        # long: one row per fighter per fight, grouped by fighter, oldest first
+        # (see fighter_history.fighter_fights_long)
+        fighter = long[fighter_col].to_numpy()
+        starts = np.flatnonzero(fighter[1:] != fighter[:-1]) + 1
+        offsets = np.concatenate([[0], starts, [len(long)]]) if len(long) else [0]
+        return cls(offsets, long[columns].to_numpy(dtype=np.float32), columns)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def ewm_before(
+        self, spans: Sequence[int] = (3,), career: bool = False
+    ) -> Dict[Union[int, str], np.ndarray]:
+        """
+        Averages of each fighter's fights before each of their fights.
+
+        Args:
+            spans (Sequence[int]): ewm spans (adjust=False)
+            career (bool): also average of all fights before, missing values
+                skipped
+
+        Returns:
+            Dict[Union[int, str], np.ndarray]: (rows, columns) float64 per span,
+            plus CAREER. aligned with values, NaN before a fighter's first fight
+        """
+        return self.sweep(spans, career)[0]
+
+    def sweep(
+        self, spans: Sequence[int] = (3,), career: bool = False
+    ) -> Tuple[Dict[Union[int, str], np.ndarray], "EWMState"]:
+        # averages before each fight (see ewm_before) and state after every
+        # fighter's last fight, one slot per fighter in offsets order
+        n_rows, n_cols = self.values.shape
+        lengths = self.lengths
+        # longest careers first, so fighters still going at step k are a prefix
+        order = np.argsort(-lengths, kind="stable")
+        starts = self.offsets[:-1][order]
+        # fighters with more than k fights
+        steps = np.arange(lengths.max(initial=0))
+        n_active = np.searchsorted(-lengths[order], -steps)
+
+        state = EWMState(spans, len(order), n_cols)
+        averages = {
+            key: np.full((n_rows, n_cols), np.nan) for key in state.keys(career)
+        }
+        for k, m in enumerate(n_active):
+            rows = starts[:m] + k
+            # state so far is the average before this fight
+            for key, values in state.averages(slice(0, m), career).items():
+                averages[key][rows] = values
+            state.update(slice(0, m), self.values[rows])
+
+        return averages, state.take(np.argsort(order))
+
+
+class EWMState:
+    def __init__(self, spans: Sequence[int], n_fighters: int, n_cols: int):
+        """
+        Running averages of a set of fighters, one slot per fighter.
+
+        Args:
+            spans (Sequence[int]): ewm spans (adjust=False)
+            n_fighters (int): number of slots
+            n_cols (int): number of stats
+        """
+        self.spans = list(spans)
+        spans_arr = np.asarray(self.spans, dtype=np.float64)
+        # broadcast over (spans, fighters, columns)
+        self.alpha = (2 / (spans_arr + 1))[:, None, None]
+        self.com_is_1 = ((spans_arr - 1) / 2 == 1)[:, None, None]
+        self.weighted = np.full((len(self.spans), n_fighters, n_cols), np.nan)
+        self.old_wt = np.ones_like(self.weighted)
+        # career sums/counts of observed values
+        self.total = np.zeros((n_fighters, n_cols))
+        self.count = np.zeros((n_fighters, n_cols))
+
+    def __len__(self) -> int:
+        return self.weighted.shape[1]
+
+    def keys(self, career: bool = False) -> List[Union[int, str]]:
+        return self.spans + [CAREER] if career else list(self.spans)
+
+    def averages(self, fighters, career: bool = False):
+        # current averages of fighters (slice or slots), NaN before any values
+        averages = {
+            span: self.weighted[i, fighters] for i, span in enumerate(self.spans)
+        }
+        if career:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                averages[CAREER] = self.total[fighters] / self.count[fighters]
+        return averages
+
+    def update(self, fighters, values: np.ndarray) -> None:
+        """
+        Adds one fight to each of fighters.
+
+        Args:
+            fighters: slice or distinct slots
+            values (np.ndarray): (fighters, columns) stats of the fight
+        """
+        cur = np.asarray(values, dtype=np.float64)
+        observed = ~np.isnan(cur)
+
+        w = self.weighted[:, fighters]
+        ow = self.old_wt[:, fighters]
+        has = ~np.isnan(w)
+        # weight of the average decays every fight once there is one,
+        # missing value or not
+        np.multiply(ow, 1 - self.alpha, out=ow, where=has)
+        update = has & observed
+        new_wt = np.where(self.com_is_1, 1 - ow, self.alpha)
+        mixed = (ow * w + new_wt * cur) / (ow + new_wt)
+        np.copyto(w, mixed, where=update)
+        np.copyto(w, np.broadcast_to(cur, w.shape), where=~has & observed)
+        np.copyto(ow, 1.0, where=update)
+        # slots index a copy, slices a view. either way write it back
+        self.weighted[:, fighters] = w
+        self.old_wt[:, fighters] = ow
+
+        self.total[fighters] += np.where(observed, cur, 0)
+        self.count[fighters] += observed
+
+    def take(self, fighters: np.ndarray) -> "EWMState":
+        # new state with the given slots, in that order
+        state = EWMState(self.spans, 0, self.total.shape[1])
+        state.weighted = self.weighted[:, fighters]
+        state.old_wt = self.old_wt[:, fighters]
+        state.total = self.total[fighters]
+        state.count = self.count[fighters]
+        return state
+
+    def grow(self, n_fighters: int) -> None:
+        # adds empty slots at the end
+        new = EWMState(self.spans, n_fighters, self.total.shape[1])
+        self.weighted = np.concatenate([self.weighted, new.weighted], axis=1)
+        self.old_wt = np.concatenate([self.old_wt, new.old_wt], axis=1)
+        self.total = np.concatenate([self.total, new.total])
+        self.count = np.concatenate([self.count, new.count])
@@ -1,19 +1,15 @@
 from io import StringIO
-import os
-import pickle
-import re
-from typing import Dict, List, Iterable
+from typing import Dict, List, Iterable, Optional
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 import pandas as pd
-from tqdm import tqdm
 
 # hardcoded headers/filepaths
 from src.ufctools.filepaths_and_schema import (
     FIGHT_LINKS_PICKLE,
-    RAW_NEW_FIGHT_DATA_PATH,
     RAW_FIGHT_DATA_PATH,
     EVENT_DATA_PATH,
+    UFCSTATS_BASE_URL,
     web_fight_cols,
     web_strike_cols,
     event_cols,
@@ -21,77 +17,184 @@ from src.ufctools.filepaths_and_schema import (
 
 from src.ufctools.utils import (
     make_soup,
-    print_progress,
     add_prefix_label,
     add_suffix_label,
 )
+from src.ufctools.checkpoint import ScrapeJournal
+from src.ufctools.columnar import add_event_info
+from src.ufctools.crawler import AsyncCrawler
+from src.ufctools.fetching import DEFAULT_POOL_SIZE
+from src.ufctools.fightlog import FightLog
+from src.ufctools.state import LinkState, NOT_LOADED
+from src.ufctools.stat_parsing import cast_stat_columns, parse_stat
+
+# journal rows moved to the fight log per segment when a scrape finishes
+SEGMENT_ROWS = 2000
+
+# columns of scraped fights returned by scrape_new_fights (when not using a
+# store), enough to know which fights and fighters are new
+new_fight_cols = [
+    "FIGHT_ID",
+    "FIGHT_LINK",
+    "R_FIGHTER",
+    "R_FIGHTER_ID",
+    "R_FIGHTER_LINK",
+    "B_FIGHTER",
+    "B_FIGHTER_ID",
+    "B_FIGHTER_LINK",
+]
 
 
 # should refactor these to not just be giant classes/move static methods out
 class UFCLinks:
     def __init__(
-        self, all_events_url="http://ufcstats.com/statistics/events/completed?page=all"
+        self,
+        all_events_url=None,
+        max_concurrency=DEFAULT_POOL_SIZE,
+        base_url=UFCSTATS_BASE_URL,
+        full_rescan=False,
+        store=None,
     ):
+        # base_url can point at a stand-in server (see standin.py)
+        self.base_url = base_url
+        # optional UFCStore (see storage.py). if given, event data and fight links
+        # live there instead of event_data.csv/fight_links.pickle
+        self.store = store
+        if all_events_url is None:
+            all_events_url = f"{base_url}/statistics/events/completed?page=all"
         self.all_events_url = all_events_url
+        # paginated listing (newest first) used to look for new events.
+        # full_rescan pulls the whole listing from all_events_url instead
+        self.events_page_url = f"{base_url}/statistics/events/completed?page={{}}"
+        self.full_rescan = full_rescan
+        # max number of event pages requested at once
+        self.max_concurrency = max_concurrency
         self.EVENT_DATA_PATH = EVENT_DATA_PATH
-        self.EVENT_DATA = None
         self.FIGHT_LINKS_PICKLE_PATH = FIGHT_LINKS_PICKLE
-        self.FIGHT_LINKS = None
-        # pulls web data and compares to local data to prep class instance
-        self._initiate_class()
+        # event data/fight links, written back only when changed (see state.py).
+        # construction doesn't touch disk or network.
+        # local data is loaded on first access of EVENT_DATA/FIGHT_LINKS,
+        # web data is only pulled by refresh()/get_fight_links()
+        self.state = LinkState(
+            event_data_path=self.EVENT_DATA_PATH,
+            fight_links_path=self.FIGHT_LINKS_PICKLE_PATH,
+            store=store,
+        )
+
+    @property
+    def EVENT_DATA(self) -> pd.DataFrame:
+        return self.state.event_data
+
+    @property
+    def FIGHT_LINKS(self) -> Optional[Dict[str, List[str]]]:
+        return self.state.fight_links
+
+    def refresh(self) -> pd.DataFrame:
+        # pulls web data and compares to local data, returns updated event data
+        with self.state.batch():
+            if self._has_event_data() and not self.full_rescan:
+                # only look at listing pages until we hit an event we already have
+                self._update_event_data()
+            else:
+                self._rescan_event_data()
+        return self.EVENT_DATA
 
     def get_fight_links(self, force_refresh=False):
 
         # if force_refresh is True, retrieves all fight links from events regardless
         # of FIGHT_LINKS_SCRAPED value (refresh also forced if fight link file doesnt exist)
         # otherwise, only scrapes links where FIGHT_LINKS_SCRAPED == False
-        if force_refresh or not self.FIGHT_LINKS_PICKLE_PATH.exists():
-            print(f"Scraping all fight links to {self.FIGHT_LINKS_PICKLE_PATH}")
-            fight_link_dict = self._initiate_fight_links()
-        else:
-            print("Checking for new events to scrape")
-            # check new events, load local data and update
-            new_fight_links = self._get_unscraped_fight_links()
-            fight_link_dict = self.FIGHT_LINKS.copy()
-            fight_link_dict.update(new_fight_links)
-
-        # this triggers resaving of event_data.csv and fight_links.pickle
-        # whether or not there's actually new data, which is kinda confusing
-        # but i don't wanna fix it right now.
-        self.FIGHT_LINKS = fight_link_dict
-        self._update_event_fight_link_scraped_status()
-        self._write_fight_links()
-
-        return fight_link_dict
-
-    # should probably break this into subfunctions
-    def _initiate_class(self):
-        # get latest event data from web
+        # event data and fight links are written once at the end, and only if
+        # there's actually new data
+        with self.state.batch():
+            if force_refresh or not self._has_fight_links():
+                print(
+                    f"Scraping all fight links to {self._saved_to(self.FIGHT_LINKS_PICKLE_PATH)}"
+                )
+                self.state.set_fight_links(self._initiate_fight_links())
+            else:
+                print("Checking for new events to scrape")
+                # check new events, load local data and update
+                self.state.update_fight_links(self._get_unscraped_fight_links())
+            self._update_event_fight_link_scraped_status()
+
+        return self.FIGHT_LINKS
+
+    def _saved_to(self, filepath):
+        # where event data/fight links are written, the store replaces both files
+        return filepath if self.store is None else self.store.DB_PATH
+
+    def _has_event_data(self) -> bool:
+        return self.state.has_event_data()
+
+    def _has_fight_links(self) -> bool:
+        return self.state.has_fight_links()
+
+    def _update_event_data(self) -> pd.DataFrame:
+        # incremental update: walk listing newest first, stop at first known event
+        local_event_df = self.EVENT_DATA
+        new_event_df = self._scrape_new_events(local_event_df.index)
+
+        if new_event_df.empty:
+            print("No new events, local data up to date")
+            return local_event_df
+
+        print(f"{new_event_df.shape[0]} new event/s. Updating local event data.")
+        updated_df = pd.concat([new_event_df, local_event_df])
+        self.state.set_event_data(updated_df, changed_ids=new_event_df.index)
+        return updated_df
+
+    def _scrape_new_events(self, known_event_ids: pd.Index) -> pd.DataFrame:
+        # listing is newest first, so every event before the first known one is new.
+        # usually that means a single page fetch.
+        new_pages = []
+        seen_ids = set()
+        page_num = 1
+        while True:
+            page_url = self.events_page_url.format(page_num)
+            print(f"Pulling event data from {page_url}")
+            page_df = self._scrape_events_page(page_url)
+            # past the last page (or site handing back a page we've already seen)
+            if page_df.empty or seen_ids.issuperset(page_df.index):
+                break
+            seen_ids.update(page_df.index)
+
+            known = page_df.index.isin(known_event_ids)
+            if known.any():
+                new_pages.append(page_df.iloc[: known.argmax()])
+                break
+            new_pages.append(page_df)
+            page_num += 1
+
+        if not new_pages:
+            return self._scrape_events_page(None)
+        return pd.concat(new_pages)
+
+    def _rescan_event_data(self) -> pd.DataFrame:
+        # full rescan: pull entire listing and diff against local data
         print(f"Pulling event data from {self.all_events_url}")
         web_event_df = self._scrape_all_events()
         web_event_ids = web_event_df.index
 
-        if not self.EVENT_DATA_PATH.exists():
+        if not self._has_event_data():
             # if no event data file, initate event data by writing this to csv
             # with no comparisons
 
             print(
-                f"No existing event data, writing all web data locally to {self.EVENT_DATA_PATH}"
+                f"No existing event data, writing all web data locally to {self._saved_to(self.EVENT_DATA_PATH)}"
             )
-            self._write_event_data(web_event_df)
+            self.state.set_event_data(web_event_df)
             # common label to update EVENT_DATA property with
             event_df = web_event_df
         else:
             # otherwise, event data file already exists.
             # compare with all_event_df by id and only write rows
             # that aren't present in existing file
-            print(f"Reading local event data from {self.EVENT_DATA_PATH}")
-            local_event_df = pd.read_csv(
-                self.EVENT_DATA_PATH, sep=";", parse_dates=["DATE"], index_col="ID"
-            )
+            local_event_df = self.EVENT_DATA
 
             local_event_ids = local_event_df.index
-            new_event_ids = web_event_ids.difference(local_event_ids)
+            # kept in listing order (Index.difference would sort them by id)
+            new_event_ids = web_event_ids[~web_event_ids.isin(local_event_ids)]
 
             # return local data unless new events present in web data.
 
@@ -104,7 +207,7 @@ class UFCLinks:
                 updated_df = pd.concat(
                     [web_event_df.loc[new_event_ids], local_event_df]
                 )
-                self._write_event_data(updated_df)
+                self.state.set_event_data(updated_df, changed_ids=new_event_ids)
                 # return updated event df if new events present in web
                 event_df = updated_df
             else:
@@ -112,23 +215,23 @@ class UFCLinks:
                 print("No new events, local data up to date")
                 event_df = local_event_df
 
-        # set event data property
-        self.EVENT_DATA = event_df
-
-        # load fight links if they already exist.
-        if self.FIGHT_LINKS_PICKLE_PATH.exists():
-            print(f"Loading local fight links from {self.FIGHT_LINKS_PICKLE_PATH}")
-            # load prev events and links
-            with open(self.FIGHT_LINKS_PICKLE_PATH, "rb") as event_fight_dict:
-                prev_fight_links = pickle.load(event_fight_dict)
-                self.FIGHT_LINKS = prev_fight_links
+        return event_df
 
     def _scrape_all_events(self) -> pd.DataFrame:
         # reads all events from all_events_url column and
         # initiates event data table as dataframe.
+        return self._scrape_events_page(self.all_events_url)
+
+    def _scrape_events_page(self, events_url: str) -> pd.DataFrame:
+        # reads events listed on one page of completed events listing.
+        # events_url None (or a page with no event table) gives an empty table
         event_text = ";".join(event_cols)
-        soup = make_soup(self.all_events_url)
-        for row in soup.tbody.findAll("tr", {"class": "b-statistics__table-row"}):
+        rows = []
+        if events_url is not None:
+            soup = make_soup(events_url)
+            if soup.tbody is not None:
+                rows = soup.tbody.findAll("tr", {"class": "b-statistics__table-row"})
+        for row in rows:
 
             # case handling for blank row that exists at top of table.
             # text is just empty string/newline chars
@@ -169,43 +272,35 @@ class UFCLinks:
 
         return event_df
 
-    def _write_event_data(self, df):
-        filepath = self.EVENT_DATA_PATH
-        df.to_csv(filepath, sep=";")
-
-        return df
-
     # given list of event links, gets all links to fights for that event and
     # stores in dictionary using event link as key
-    # not sure why this uses custom print progress instead of tqdm
+    # event pages are fetched concurrently through the async crawler
     def _make_link_dict(self, event_links: list[str]) -> dict[str, str]:
 
         num_events = len(event_links)
-        event_fight_dict = {}
         print(f"Scraping fight links from {num_events} events: ")
-        print_progress(0, num_events, prefix="Progress:", suffix="Complete")
-        for index, link in enumerate(event_links):
-            event_fights = []
-            soup = make_soup(link)
-            for row in soup.findAll(
-                "tr",
-                {
-                    "class": "b-fight-details__table-row b-fight-details__table-row__hover js-fight-details-click"
-                },
-            ):
-                href = row.get("data-link")
-                event_fights.append(href)
-
-            event_fight_dict[link] = event_fights
-
-            print_progress(index + 1, num_events, prefix="Progress:", suffix="Complete")
+        crawler = AsyncCrawler(max_concurrency=self.max_concurrency)
+        event_fight_dict, _ = crawler.crawl(
+            event_links, event_fetcher=self.get_event_fight_links
+        )
 
         return event_fight_dict
 
-    def _write_fight_links(self):
-        # might not need this as a subfunction but i don't want to write it twice
-        with open(self.FIGHT_LINKS_PICKLE_PATH, "wb") as f:
-            pickle.dump(self.FIGHT_LINKS, f)
+    # given single event link, get links to all fights on event page (in card order)
+    @staticmethod
+    def get_event_fight_links(event_link: str) -> list[str]:
+        event_fights = []
+        soup = make_soup(event_link)
+        for row in soup.findAll(
+            "tr",
+            {
+                "class": "b-fight-details__table-row b-fight-details__table-row__hover js-fight-details-click"
+            },
+        ):
+            href = row.get("data-link")
+            event_fights.append(href)
+
+        return event_fights
 
     def _initiate_fight_links(self):
         # to initiate, make dict from all event data links
@@ -228,138 +323,224 @@ class UFCLinks:
         # assuming that if event is in there, fight links have been scraped.
         # it's not really airtight logic, but good enough for now
         scraped_ids = [id.split("/")[-1] for id in self.FIGHT_LINKS.keys()]
-        event_df = self.EVENT_DATA
-        event_df.loc[scraped_ids, "FIGHT_LINKS_SCRAPED"] = True
-        self.EVENT_DATA = event_df
-        self._write_event_data(event_df)
-        return event_df
+        # only events whose flag flips get written
+        self.state.set_event_status(scraped_ids, "FIGHT_LINKS_SCRAPED", True)
+        return self.EVENT_DATA
 
 
 class FightDataScraper:
-    def __init__(self):
-        self.NEW_FIGHTS_DATA_PATH = RAW_NEW_FIGHT_DATA_PATH
+    def __init__(
+        self,
+        max_concurrency=DEFAULT_POOL_SIZE,
+        base_url=UFCSTATS_BASE_URL,
+        full_rescan=False,
+        store=None,
+        dataset=None,
+    ):
         self.FIGHT_DATA_PATH = RAW_FIGHT_DATA_PATH
-        # when fight scraper initiated, update/load event links.
-        self.events = UFCLinks()
-        self.events.get_fight_links()
-        # load any existing processed data
-        self.fight_data = self._load_local_fight_data()
-        # load any existing unprocessed data
-        self.temp_fight_data = self._load_temp_fight_data()
-
-    def _load_temp_fight_data(self) -> None:
-        if self.NEW_FIGHTS_DATA_PATH.exists():
-            print(
-                f"Reading unprocessed local fight data from {self.NEW_FIGHTS_DATA_PATH}"
-            )
-            local_fight_df = pd.read_csv(
-                self.NEW_FIGHTS_DATA_PATH,
-                sep=";",
-                index_col="FIGHT_ID",
+        # max number of event/fight pages requested at once
+        self.max_concurrency = max_concurrency
+        # event data/fight links, loaded lazily and pulled from the web by refresh()
+        # full_rescan re-reads the whole event listing instead of just new events
+        self.events = UFCLinks(
+            max_concurrency=max_concurrency,
+            base_url=base_url,
+            full_rescan=full_rescan,
+            store=store,
+        )
+        # optional UFCStore (see storage.py). if given, fights are committed
+        # straight to it and nothing is loaded up front, use store.get_fights
+        self.store = store
+        # optional ColumnarDataset (see columnar.py). if given, newly scraped
+        # fights are also upserted into it (needs pyarrow)
+        self.dataset = dataset
+        # fight data is appended to as a log, see fightlog.py
+        self.fight_log = (
+            FightLog(base_path=self.FIGHT_DATA_PATH) if store is None else None
+        )
+        # nothing is read until first access, so construction is instant
+        self._fight_data = NOT_LOADED
+        self._journal = NOT_LOADED
+
+    # existing processed data
+    @property
+    def fight_data(self) -> Optional[pd.DataFrame]:
+        if self._fight_data is NOT_LOADED:
+            self._fight_data = (
+                None if self.store is not None else self._load_local_fight_data()
             )
-            return local_fight_df
-        else:
-            return None
+        return self._fight_data
+
+    @fight_data.setter
+    def fight_data(self, fight_df: Optional[pd.DataFrame]) -> None:
+        self._fight_data = fight_df
+
+    # events committed by an unfinished scrape
+    @property
+    def journal(self) -> Optional[ScrapeJournal]:
+        if self._journal is NOT_LOADED:
+            self._journal = None if self.store is not None else ScrapeJournal()
+        return self._journal
+
+    def refresh(self, force_refresh=False) -> None:
+        # pulls new events and their fight links from the web
+        self.events.refresh()
+        self.events.get_fight_links(force_refresh=force_refresh)
 
     def _load_local_fight_data(self) -> None:
-        if self.FIGHT_DATA_PATH.exists():
+        if self.fight_log.exists():
             print(f"Reading local fight data from {self.FIGHT_DATA_PATH}")
-            local_fight_df = pd.read_csv(
-                self.FIGHT_DATA_PATH,
-                sep=";",
-                index_col="FIGHT_ID",
-            )
-            return local_fight_df
+            return self.fight_log.read()
         else:
             return None
 
     # master function for scraping all missing fight data
-
+    # each event is committed to the scrape journal (see checkpoint.py), or the
+    # store if there is one, as soon as its fights are done, so a crashed/
+    # interrupted run picks up where it stopped and only one event's rows are
+    # held in memory at a time.
+    # returns the new fights, only new_fight_cols of them unless there is a
+    # store (full rows are in fight_data).
     def scrape_new_fights(self, force_refresh=False, itercap=1000) -> pd.DataFrame:
 
+        # event data/fight links are only brought up to date when asked to
+        self.refresh()
         events_df = self.events.EVENT_DATA
 
         if force_refresh:
             # reset data scraped status
-            events_df["FIGHT_DATA_SCRAPED"] = False
-            self.events._write_event_data(events_df)
-            # delete fight data
-            if self.FIGHT_DATA_PATH.exists():
-                os.remove(self.FIGHT_DATA_PATH)
+            if self.store is not None:
+                # also resets scraped status in store
+                self.store.delete_fights()
+                events_df["FIGHT_DATA_SCRAPED"] = False
+            else:
+                self.events.state.set_event_status(
+                    events_df.index, "FIGHT_DATA_SCRAPED", False
+                )
+                # delete fight data and any half finished scrape
+                self.fight_log.clear()
+                self.fight_data = None
+                self.journal.clear()
+
+        # events committed by a previous run that didn't get to finish
+        # count as scraped
+        if self._journaled_events() > 0:
+            print(f"Resuming scrape, {len(self.journal)} event/s already committed.")
+            self._reconcile_scraped_status(events_df)
 
         # get links to all events with FIGHT_DATA_SCRAPED == FALSE
         unscraped_events = events_df[~events_df["FIGHT_DATA_SCRAPED"]]
 
         # EXIT HERE IF NOTHING TO SCRAPE
         # ugly breakpoint
-        if unscraped_events.shape[0] == 0:
+        if unscraped_events.shape[0] == 0 and self._journaled_events() == 0:
             print("No new fights to scrape.")
             return None
 
-        # multiprocessing goes here???
-        # should this save as we go?
-
-        new_fight_data = []
+        unscraped_events = unscraped_events.iloc[:itercap]
         print(f"Scraping fights from {unscraped_events.shape[0]} event/s.")
+        event_ids = {
+            link: event_id for event_id, link in unscraped_events["LINK"].items()
+        }
 
-        x = 0
-        for event_row in tqdm(unscraped_events.itertuples()):
-            if x >= itercap:
-                break
-            # print(event_row)
-            event_fights_df = self.scrape_event_fights(event_row.LINK)
-            # update fight scraped status in events data
-            # have to access by 'Index' --- seems to throwaway label of 'ID'
-            events_df.at[event_row.Index, "FIGHT_DATA_SCRAPED"] = True
+        committed_ids = []
 
-            new_fight_data.append(event_fights_df)
-            x += 1
+        def commit_event(event_link, fight_links, fight_records):
+            event_id = event_ids[event_link]
+            if self.store is not None:
+                # rows and scraped flag go in together in one transaction
+                self.store.commit_event_fights(event_id, fight_records)
+                events_df.at[event_id, "FIGHT_DATA_SCRAPED"] = True
+                committed_ids.append(event_id)
+            else:
+                self.journal.commit(event_id, event_link, fight_links, fight_records)
+
+        # event pages (for any events missing fight links) and fight pages
+        # are all fetched as one concurrent crawl.
+        # events that errored out entirely never get committed, so stay unscraped
+        crawler = AsyncCrawler(max_concurrency=self.max_concurrency)
+        try:
+            crawler.crawl(
+                unscraped_events["LINK"],
+                event_fetcher=self.events.get_event_fight_links,
+                fight_fetcher=self.get_fight_stats,
+                known_fight_links=self.events.FIGHT_LINKS,
+                on_event=commit_event,
+                keep_records=False,
+            )
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+
+        if self.store is not None:
+            if not committed_ids:
+                print("No fights scraped.")
+                return None
+            new_fights = self.store.get_fights(event_ids=committed_ids)
+            self._export_fights(new_fights, events_df)
+            return new_fights
+        return self._finalize_journal(events_df)
+
+    def _journaled_events(self) -> int:
+        # number of events committed to journal but not merged into fight data
+        return 0 if self.journal is None else len(self.journal)
+
+    def _reconcile_scraped_status(self, events_df: pd.DataFrame) -> None:
+        # journaled events are durable, so their flags can be written right away
+        self.events.state.set_event_status(
+            self.journal.event_ids, "FIGHT_DATA_SCRAPED", True
+        )
 
-        # update local event saved data file
-        self.events._write_event_data(events_df)
+    def _finalize_journal(self, events_df: pd.DataFrame) -> pd.DataFrame:
+        if len(self.journal) == 0:
+            print("No fights scraped.")
+            return None
 
-        # save scraped data to temp file
-        # BEFORE MERGING TO EXISTING DATA (just in case)
-        new_fights_df = pd.concat(new_fight_data)
-        new_fights_df.to_csv(self.NEW_FIGHTS_DATA_PATH, sep=";")
+        # journal rows go into the fight log a segment at a time, so a long
+        # backfill is never loaded whole. a crash part way just means the next
+        # run appends the journal again, reads keep the newest copy of a fight
+        print(f"Appending fight data to {self.fight_log.LOG_DIR}")
+        new_fights = []
+        for records in self.journal.iter_chunks(SEGMENT_ROWS):
+            self.fight_log.append_records(records)
+            self._export_fights(
+                cast_stat_columns(pd.DataFrame.from_records(records, index="FIGHT_ID")),
+                events_df,
+            )
+            new_fights.extend(
+                {col: record.get(col) for col in new_fight_cols} for record in records
+            )
+        # fight data in memory (if any) is stale, read from the log on next access
+        self.fight_data = NOT_LOADED
 
-        self._update_fight_data()
-        return new_fights_df
+        # update local event saved data file (only if flags changed)
+        self._reconcile_scraped_status(events_df)
 
-    def _update_fight_data(self, cleanup_temp_data=True):
-        # if local fight data exists, concatenate temp data to it and overwrite
-        # otherwise, promote temp data file to local fight data
+        # everything in journal is now in fight data
+        self.journal.clear()
+        return pd.DataFrame.from_records(
+            new_fights, columns=new_fight_cols, index="FIGHT_ID"
+        )
 
-        if self.fight_data is not None:
-            print("Updating fight data.")
-            self.fight_data = pd.concat([self.temp_fight_data, self.fight_data])
-        else:
-            self.fight_data = self.temp_fight_data.copy()
-        print(f"Saving fight data to {self.FIGHT_DATA_PATH}")
-        self.fight_data.to_csv(self.FIGHT_DATA_PATH, sep=";")
-
-        if cleanup_temp_data:
-            print("Removing temporary files")
-            self.temp_fight_data = None
-            os.remove(self.NEW_FIGHTS_DATA_PATH)
-        return None
-
-    # given an event link, scrape all fights to dataframe
-    def scrape_event_fights(self, event_link: str) -> pd.DataFrame:
-        event_fight_data = []
-        event_fight_links = self.events.FIGHT_LINKS[event_link]
-        for fight_link in event_fight_links:
-            try:
-                event_fight_data.append(self.get_fight_stats(fight_link))
-            except Exception as e:
-                print(f"error processing {fight_link}: {e}")
-
-        event_fights_df = pd.DataFrame.from_records(event_fight_data, index="FIGHT_ID")
-        return event_fights_df
+    def _export_fights(
+        self, fight_df: Optional[pd.DataFrame], events_df: pd.DataFrame
+    ) -> None:
+        # upserts fights into the columnar dataset, partitioned by event year
+        if self.dataset is None or fight_df is None:
+            return
+        self.dataset.write(add_event_info(fight_df, events_df, self.events.FIGHT_LINKS))
 
     def get_fight_stats(self, fight_link: str) -> dict:
 
         fight_soup = make_soup(fight_link)
+        return self.parse_fight_page(fight_link, fight_soup)
+
+    # single pass extractor for a fight page.
+    # page is walked once to pick out the sections we need, then each section
+    # is unpacked on its own. replaces the old approach of separate findAll
+    # passes per extractor (two "tbody" scans, regex search per round table, etc).
+    # the old multi-pass extractor lives on in benchmarks/bench_fight_parse.py.
+    def parse_fight_page(self, fight_link: str, fight_soup: BeautifulSoup) -> dict:
 
         # - 4 things to grab
 
@@ -380,23 +561,30 @@ class FightDataScraper:
         fight_id = fight_link.split("/")[-1]
         fight_stats = {"FIGHT_ID": fight_id, "FIGHT_LINK": fight_link}
 
-        fight_fighters = self._get_fighters(fight_soup)
+        persons, attr_raw, tables = self._split_fight_page(fight_soup)
 
-        fight_attr = self._get_fight_attr(fight_soup)
+        r_raw, b_raw = persons
+        r = self._get_fighter(r_raw)
+        b = self._get_fighter(b_raw)
+        fight_fighters = add_prefix_label(r, "R") | add_prefix_label(b, "B")
+
+        fight_attr = self._parse_fight_attr(attr_raw)
         ###########
 
-        fight_other_stats = self._get_fight_table_stats(
-            fight_soup,
+        # tables: other stats totals, other stats per round,
+        # sig strike totals, sig strike per round
+        fight_other_stats = self._extract_table_stats(
+            tables[0],
+            tables[1],
             header_lbls=web_fight_cols,
             omit_lbls=["FIGHTER", "SIG_STR", "SIG_STR_PCT"],
-            table_index=0,
         )
 
-        fight_strike_stats = self._get_fight_table_stats(
-            fight_soup,
+        fight_strike_stats = self._extract_table_stats(
+            tables[2],
+            tables[3],
             header_lbls=web_strike_cols,
             omit_lbls=["FIGHTER"],
-            table_index=2,
         )
 
         fight_stats.update(fight_fighters)
@@ -409,21 +597,67 @@ class FightDataScraper:
 
         return fight_stats
 
-    #############
-    # parsing fighter names/results here
+    # walks page once, returns (fighter boxes, fight attribute box, stat tbodies)
+    # in document order. doesn't descend into a section once found.
+    @classmethod
+    def _split_fight_page(cls, fight_soup: BeautifulSoup):
+        persons, attr_raw, tables = [], None, []
+        for section in cls._iter_fight_sections(fight_soup):
+            if section.name == "tbody":
+                tables.append(section)
+            elif "b-fight-details__person" in section["class"]:
+                persons.append(section)
+            else:
+                attr_raw = section
+        return persons, attr_raw, tables
 
-    # given soup of fight link, parse fighter data to dict
-    def _get_fighters(self, fight_soup: BeautifulSoup) -> dict:
-        fighters = {}
+    @classmethod
+    def _iter_fight_sections(cls, tag: Tag):
+        for child in tag.children:
+            if not isinstance(child, Tag):
+                continue
+            classes = child.get("class") or ()
+            if (
+                child.name == "tbody"
+                or "b-fight-details__person" in classes
+                or "b-fight-details__fight" in classes
+            ):
+                yield child
+            else:
+                yield from cls._iter_fight_sections(child)
 
-        r_raw, b_raw = fight_soup.find_all("div", {"class": "b-fight-details__person"})
+    # given totals tbody and per round tbody of one stat table, unpack both.
+    # round tbody has a "Round N" header row (th cells only) before each stats row (td cells),
+    # so each row with td cells is the next round.
+    def _extract_table_stats(
+        self,
+        tot_tbody: Tag,
+        round_tbody: Tag,
+        header_lbls: List,
+        omit_lbls: Iterable = (),
+    ) -> Dict:
+        tot_tds = self._child_tds(tot_tbody.find("tr"))
+        stats_dict = add_suffix_label(
+            self._unpack_cells(tot_tds, header_lbls, omit_lbls), "TOT"
+        )
 
-        r = self._get_fighter(r_raw)
-        b = self._get_fighter(b_raw)
+        round_num = 0
+        for tr in round_tbody.find_all("tr"):
+            tds = self._child_tds(tr)
+            if not tds:
+                continue
+            round_num += 1
+            round_stats_dict = self._unpack_cells(tds, header_lbls, omit_lbls)
+            stats_dict.update(add_suffix_label(round_stats_dict, f"R{round_num}"))
+
+        return stats_dict
 
-        fighters = add_prefix_label(r, "R") | add_prefix_label(b, "B")
+    @staticmethod
+    def _child_tds(tr_soup: Tag) -> List[Tag]:
+        return [td for td in tr_soup.children if getattr(td, "name", None) == "td"]
 
-        return fighters
+    #############
+    # parsing fighter names/results here
 
     # given single "b-fight-details__person" element, get name, link and result.
     @staticmethod
@@ -447,8 +681,8 @@ class FightDataScraper:
     ########
     # scraping fight attributes (everything in the the non-tabular box) and all associated routines HERE
 
-    def _get_fight_attr(self, fight_soup: BeautifulSoup) -> Dict:
-        attr_raw = fight_soup.find("div", {"class": "b-fight-details__fight"})
+    # given "b-fight-details__fight" html soup, parse attributes to dict
+    def _parse_fight_attr(self, attr_raw: BeautifulSoup) -> Dict:
         fight_name = attr_raw.i.text.strip().upper()
         weight = self._parse_weightclass(fight_name)
 
@@ -542,119 +776,24 @@ class FightDataScraper:
 
     ###########################
 
-    # smashing the rows of all fights together should induce all round labels
-    # for all fights.
-    # using default arg to hardcode headers. could add header parsing logic but lazy
-    # table-index: what table to look for. set to 0 for other stats, 2 for strike stats
-    # (parses initial index as total stats, then expects round by round table next)
-
-    def _get_fight_table_stats(
-        self,
-        fight_soup: BeautifulSoup,
-        header_lbls: list = web_fight_cols,
-        omit_lbls: Iterable = (
-            "FIGHTER",
-            "SIG_STR",
-            "SIG_STR_PCT",
-        ),  # omit these by default, redundant
-        table_index: int = 0,
-    ) -> Dict:
-
-        tables = fight_soup.findAll("tbody")
-
-        tot_soup = tables[table_index]
-
-        # initiate dict with total stats
-
-        stats_dict = self._unpack_table_row(
-            tot_soup.find("tr"), header_lbls=header_lbls, omit_lbls=omit_lbls
-        )
-
-        stats_dict = add_suffix_label(stats_dict, "TOT")
-
-        # get per round stats (second table/tbody)
-
-        round_soup = tables[table_index + 1]
-        round_stats_dict = self._parse_round_table(
-            round_soup, header_lbls, omit_lbls=omit_lbls
-        )
-        stats_dict.update(round_stats_dict)
-
-        return stats_dict
-
-    def _parse_round_table(
-        self,
-        round_tbody_soup: BeautifulSoup,
-        header_lbls: List,
-        omit_lbls: Iterable = (),
-    ) -> Dict:
-        # heuristic here is given the tbody of a round by round stat table:
-        # - look for the text elements with the word "Round" in them
-        # - parse the first tr element after each such text
-
-        all_round_stats = {}
-        round_text_elts = round_tbody_soup.findAll(string=re.compile("Round"))
-
-        # counter for round number
-        round_num = 0
-
-        for elt in round_text_elts:
-            round_num += 1
-            round_stats_raw = elt.find_next("tr")
-            round_stats_dict = self._unpack_table_row(
-                round_stats_raw, header_lbls, omit_lbls
-            )
-            # add round number to labels
-            round_stats_dict = add_suffix_label(round_stats_dict, f"R{round_num}")
-            all_round_stats.update(round_stats_dict)
-
-        return all_round_stats
-
     # helper function: each <tr> element of fight table contains two rows semantically.
     # data for each fighter is stacked on top of each other within the same cell
     # unsure if this was done intentionally to make it harder to scrape or if it's just
     # dubious formatting. but we need to unpack it.
 
-    def _unpack_table_row(
-        self, tr_soup: BeautifulSoup, header_lbls: List, omit_lbls: Iterable = ()
+    # unpacks list of <td> cells (in header order) to dict with adjusted labels
+    # for each fighter, e.g. a KD cell holding 1 and 3 becomes {"R_KD": 1, "B_KD": 3}
+    def _unpack_cells(
+        self, td_soups: List, header_lbls: List, omit_lbls: Iterable = ()
     ) -> Dict:
-        """
-            Unpacks each cell of table row to dictionary with adjusted labels for each fighter
-            e.g.
-
-            KD
-            1
-            3
-
-            becomes
-            {"R_KD": 1, "B_KD": 3}
-
-
-        Args:
-            row_soup (BeautifulSoup): <tr> object
-            header_lbls (List): labels for headers in web table
-            omit_lbls (List): labels for cells/cols to drop (sometimes we want the whole row, sometimes we don't)
-
-        Returns:
-            Dict: Dictionary with label keys to stat.
-        """
-
-        # add corner prefixes to omit lbls
-        lbls_to_drop = [f"R_{lbl}" for lbl in omit_lbls] + [
-            f"B_{lbl}" for lbl in omit_lbls
-        ]
-
         row_dict = {}
-        # unpack cells with ordered header lbls
-        for td_soup, lbl in zip(tr_soup.findAll("td"), header_lbls):
-
+        # unpack cells with ordered header lbls,
+        # skipping any lbls specified (no point parsing them)
+        for td_soup, lbl in zip(td_soups, header_lbls):
+            if lbl in omit_lbls:
+                continue
             row_dict.update(self._unpack_table_cell(td_soup, lbl))
 
-        # drop any lbls specified
-
-        for lbl in lbls_to_drop:
-            del row_dict[lbl]
-
         return row_dict
 
     @staticmethod
@@ -665,6 +804,10 @@ class FightDataScraper:
         # and may explode otherwise
         r_stat, b_stat = td_soup.stripped_strings
 
-        cell_dict = {f"R_{lbl}": r_stat, f"B_{lbl}": b_stat}
+        # stats are stored typed ("23 of 57" -> SIG_STR_LND/SIG_STR_ATT ints etc),
+        # see stat_parsing.py
+        cell_dict = add_prefix_label(parse_stat(r_stat, lbl), "R") | add_prefix_label(
+            parse_stat(b_stat, lbl), "B"
+        )
 
         return cell_dict
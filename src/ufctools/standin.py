@@ -0,0 +1,180 @@
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from src.ufctools.filepaths_and_schema import UFCSTATS_BASE_URL
+from src.ufctools.fixtures import FixtureArchive, generate_synthetic_site
+
+# local stand-in for ufcstats.com.
+# serves a fixture archive (recorded or synthetic) with configurable latency
+# and error rate, so scraper throughput can be measured reproducibly without
+# touching the real site. links inside pages are rewritten to point back at
+# the stand-in so crawls stay local.
+#
+# e.g.
+# with StandInServer(generate_synthetic_site(), latency=0.05) as server:
+#     scraper = FightDataScraper(base_url=server.base_url, max_concurrency=128)
+#
+# or from the command line:
+# python -m src.ufctools.standin --synthetic-events 200 --latency 0.05 --error-rate 0.01
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # default listen backlog (5) drops connections well before 100 concurrent clients
+    request_queue_size = 1024
+
+
+class StandInServer:
+    def __init__(
+        self,
+        archive: FixtureArchive,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            archive (FixtureArchive): pages to serve
+            host (str): interface to bind
+            port (int): port to bind, 0 picks a free one
+            latency (float): seconds added before every response
+            latency_jitter (float): uniform +/- seconds on top of latency
+            error_rate (float): fraction of requests answered with error_status
+            error_status (int): status code for injected errors
+            seed (int, optional): rng seed for latency/error injection
+        """
+        self.archive = archive
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+
+        self._server = _StandInHTTPServer((host, port), self._make_handler())
+        self.base_url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread = None
+
+        # rewrite links once up front rather than per request
+        self._pages = {
+            path: html.replace(archive.base_url, self.base_url).encode("utf-8")
+            for path, html in archive.pages.items()
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, so pooled clients are measured realistically
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                delay, fail = server._draw()
+                if delay > 0:
+                    time.sleep(delay)
+
+                body = server._pages.get(self.path)
+                if fail:
+                    status, body = server.error_status, b"injected error"
+                elif body is None:
+                    status, body = 404, b"not found"
+                else:
+                    status = 200
+
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # per request logging swamps the terminal under load
+                pass
+
+        return Handler
+
+    def _draw(self):
+        with self._rng_lock:
+            self.request_count += 1
+            jitter = self._rng.uniform(-self.latency_jitter, self.latency_jitter)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.error_count += 1
+        return max(0.0, self.latency + jitter), fail
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="local stand-in ufcstats server")
+    parser.add_argument("--archive", help="fixture archive (.zip) to serve")
+    parser.add_argument(
+        "--synthetic-events",
+        type=int,
+        default=50,
+        help="events to generate when no archive given",
+    )
+    parser.add_argument("--fights-per-event", type=int, default=12)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.archive:
+        archive = FixtureArchive.load(args.archive)
+    else:
+        archive = generate_synthetic_site(
+            n_events=args.synthetic_events,
+            fights_per_event=args.fights_per_event,
+            seed=args.seed,
+            base_url=UFCSTATS_BASE_URL,
+        )
+
+    server = StandInServer(
+        archive,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    print(f"Serving {len(archive)} pages at {server.base_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# fight table cells come as text: "23 of 57", "45%", "3:21", "1", and "--"/"---"
+# when there's nothing to show. these turn them into numbers once, at scrape
+# time, so raw fight data from scraping.py is stored typed (fight log, sqlite,
+# parquet) and nothing reading it re-splits strings:
+# - "X of Y" stats -> <LBL>_LND / <LBL>_ATT ints
+# - percents -> fraction (0.45)
+# - control time -> seconds
+# - counts -> int
+# missing values ("--", "---", "") -> None
+# legacy/preprocess.py doesn't read that data yet, it still parses the legacy
+# scrapers' text csvs, with the whole column functions at the bottom of this file.
+
+# web table labels (see web_fight_cols/web_strike_cols) by cell format
+landed_of_attempted_lbls = {
+    "SIG_STR",
+    "ALL_STR",
+    "TD",
+    "HEAD",
+    "BODY",
+    "LEG",
+    "DISTANCE",
+    "CLINCH",
+    "GROUND",
+}
+pct_lbls = {"SIG_STR_PCT", "TD_PCT"}
+time_lbls = {"CTRL"}
+count_lbls = {"KD", "SUB_ATT", "REV"}
+
+MISSING_STATS = {"", "--", "---"}
+
+# compact dtypes for stat columns when loaded into pandas.
+# nullable ints since old fights are missing some stats.
+# control time is int32, fights with no time limit can run long
+COUNT_DTYPE = "Int16"
+TIME_DTYPE = "Int32"
+PCT_DTYPE = "float32"
+
+# R_<stat>_<TOT|R#>, e.g. R_SIG_STR_LND_TOT, B_CTRL_R2
+_STAT_COL_RE = re.compile(r"^[RB]_(?P<stat>.+)_(?:TOT|R\d+)$")
+
+
+def parse_landed_of_attempted(stat: str) -> Dict[str, Optional[int]]:
+    if stat in MISSING_STATS:
+        return {"LND": None, "ATT": None}
+    landed, attempted = stat.split(" of ")
+    return {"LND": int(landed), "ATT": int(attempted)}
+
+
+def parse_pct(stat: str) -> Optional[float]:
+    if stat in MISSING_STATS:
+        return None
+    return float(stat.rstrip("%")) / 100
+
+
+def parse_time(stat: str) -> Optional[int]:
+    # "m:ss" -> seconds
+    if stat in MISSING_STATS:
+        return None
+    minutes, seconds = stat.split(":")
+    return int(minutes) * 60 + int(seconds)
+
+
+def parse_count(stat: str) -> Optional[int]:
+    if stat in MISSING_STATS:
+        return None
+    return int(stat)
+
+
+def parse_stat(stat: str, lbl: str) -> Dict:
+    """
+    Parses text of one fighter's table cell to typed stat/s.
+
+    Args:
+        stat (str): cell text, e.g. "23 of 57"
+        lbl (str): web table label of cell, e.g. "SIG_STR"
+
+    Returns:
+        Dict: label -> value, e.g. {"SIG_STR_LND": 23, "SIG_STR_ATT": 57}.
+        labels with no known format are passed through as text.
+    """
+    if lbl in landed_of_attempted_lbls:
+        parsed = parse_landed_of_attempted(stat)
+        return {f"{lbl}_{part}": value for part, value in parsed.items()}
+    if lbl in pct_lbls:
+        return {lbl: parse_pct(stat)}
+    if lbl in time_lbls:
+        return {lbl: parse_time(stat)}
+    if lbl in count_lbls:
+        return {lbl: parse_count(stat)}
+    return {lbl: stat}
+
+
+def stat_col_dtype(col: str) -> Optional[str]:
+    # dtype for a stat column of fight data, None for anything else
+    match = _STAT_COL_RE.match(col)
+    if match is None:
+        return None
+    stat = match.group("stat")
+    # whole label checked first, SUB_ATT is a count not an attempted half
+    if stat in count_lbls:
+        return COUNT_DTYPE
+    if stat in time_lbls:
+        return TIME_DTYPE
+    if stat in pct_lbls:
+        return PCT_DTYPE
+    if stat.endswith(("_LND", "_ATT")) and stat[:-4] in landed_of_attempted_lbls:
+        return COUNT_DTYPE
+    return None
+
+
+def cast_stat_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # downcasts typed stat columns (read back from csv/json as int64/float64).
+    # columns still holding text, from files scraped before stats were
+    # parsed, are left alone
+    dtypes = {}
+    for col in df.columns:
+        dtype = stat_col_dtype(col)
+        if dtype is not None and pd.api.types.is_numeric_dtype(df[col]):
+            dtypes[col] = dtype
+    if not dtypes:
+        return df
+    return df.astype(dtypes)
+
+
+########
+# vectorized versions for whole columns of text stats (e.g. fight data scraped
+# before stats were parsed at scrape time, see legacy/preprocess.py).
+# the given columns are flattened into one array of fixed width byte strings
+# and the numbers in them (runs of digits) are read with numpy ops over all
+# cells at once, instead of a python call (or a regex match) per cell.
+# cells that don't fit the format (including "--"/"---") come out as NaN.
+
+
+def _digit_runs(
+    df: pd.DataFrame, columns: List[str], n_runs: int, separator: str
+) -> np.ndarray:
+    """
+    Reads first n_runs numbers out of each text cell, e.g. "23 of 57" -> 23, 57.
+
+    Args:
+        df (pd.DataFrame): frame holding the columns
+        columns (List[str]): text columns
+        n_runs (int): numbers expected in each cell
+        separator (str): character every valid cell contains (e.g. ":")
+
+    Returns:
+        np.ndarray: float array of shape (rows, columns, n_runs),
+        all NaN for cells without exactly n_runs numbers and the separator
+    """
+    # column after column, as one flat array of byte strings
+    flat = np.concatenate([df[col].to_numpy(dtype=object) for col in columns])
+    try:
+        cells = flat.astype("S")
+    except UnicodeEncodeError:
+        cells = np.char.encode(flat.astype("U"), "ascii", "replace")
+    width = max(cells.dtype.itemsize, 1)
+    # one row per character position, so each step below is a contiguous op
+    chars = np.ascontiguousarray(cells.view(np.uint8).reshape(len(cells), width).T)
+
+    digits = chars.astype(np.int16) - ord("0")
+    is_digit = (digits >= 0) & (digits <= 9)
+    run_starts = is_digit.copy()
+    run_starts[1:] &= ~is_digit[:-1]
+    # which number (1st, 2nd, ...) each character position belongs to
+    run_ids = np.cumsum(run_starts, axis=0, dtype=np.int16)
+
+    numbers = np.zeros((n_runs, len(cells)))
+    for run in range(n_runs):
+        number = numbers[run]
+        for pos in range(width):
+            in_run = is_digit[pos] & (run_ids[pos] == run + 1)
+            np.copyto(number, number * 10 + digits[pos], where=in_run)
+
+    valid = (run_ids[-1] == n_runs) & (chars == ord(separator)).any(axis=0)
+    numbers[:, ~valid] = np.nan
+    # (runs, columns, rows) -> (rows, columns, runs)
+    return numbers.reshape(n_runs, len(columns), len(df)).transpose(2, 1, 0)
+
+
+def _to_frame(values: np.ndarray, df: pd.DataFrame, columns: List[str]):
+    # columns with nothing missing become ints
+    complete = ~np.isnan(values).any(axis=0)
+    return pd.DataFrame(
+        {
+            col: values[:, i].astype(np.int64) if complete[i] else values[:, i]
+            for i, col in enumerate(columns)
+        },
+        index=df.index,
+    )
+
+
+def split_landed_of_attempted(
+    df: pd.DataFrame, columns: List[str]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Splits "X of Y" text columns.
+
+    Args:
+        df (pd.DataFrame): frame holding the columns
+        columns (List[str]): "X of Y" columns
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: landed and attempted, with the same
+        columns as given
+    """
+    numbers = _digit_runs(df, columns, n_runs=2, separator="f")
+    landed = _to_frame(numbers[:, :, 0], df, columns)
+    attempted = _to_frame(numbers[:, :, 1], df, columns)
+    return landed, attempted
+
+
+def pct_to_fraction(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    # "45%" -> 0.45
+    numbers = _digit_runs(df, columns, n_runs=1, separator="%")
+    return pd.DataFrame(numbers[:, :, 0] / 100, index=df.index, columns=columns)
+
+
+def time_to_seconds(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    # "m:ss" -> seconds
+    numbers = _digit_runs(df, columns, n_runs=2, separator=":")
+    return _to_frame(numbers[:, :, 0] * 60 + numbers[:, :, 1], df, columns)
@@ -0,0 +1,206 @@
+import pickle
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.ufctools.fileio import atomic_write
+
+from src.ufctools.filepaths_and_schema import (  # isort:skip
+    EVENT_DATA_PATH,
+    FIGHT_LINKS_PICKLE,
+    event_cols,
+)
+
+# marks lazily loaded attributes that haven't been loaded yet
+# (None is a valid loaded value, e.g. no local fight data)
+NOT_LOADED = object()
+
+# event data and fight links with write-behind.
+# changes are made in memory and the events/event links they touch are marked
+# dirty. flush() then writes only if something actually changed:
+# - with a store (see storage.py), just the dirty rows/links are upserted
+#   (all links are replaced after set_fight_links)
+# - otherwise event_data.csv / fight_links.pickle are replaced atomically
+#   (temp file + rename), so readers never see a half written file
+# inside batch() flushes are held back until the outermost batch ends,
+# so one logical operation (e.g. a refresh) writes each file at most once.
+
+
+class LinkState:
+    def __init__(
+        self,
+        event_data_path: Path = EVENT_DATA_PATH,
+        fight_links_path: Path = FIGHT_LINKS_PICKLE,
+        store=None,
+    ):
+        self.EVENT_DATA_PATH = Path(event_data_path)
+        self.FIGHT_LINKS_PICKLE_PATH = Path(fight_links_path)
+        self.store = store
+        self._event_data = NOT_LOADED
+        self._fight_links = NOT_LOADED
+        # event ids / event links changed since last flush
+        self._dirty_event_ids = set()
+        self._dirty_event_links = set()
+        # all fight links replaced, not just the dirty events' ones
+        self._fight_links_replaced = False
+        self._batch_depth = 0
+
+    ########
+    # loading
+
+    def has_event_data(self) -> bool:
+        if self._event_data is not NOT_LOADED and not self._event_data.empty:
+            return True
+        if self.store is not None:
+            return self.store.has_events()
+        return self.EVENT_DATA_PATH.exists()
+
+    def has_fight_links(self) -> bool:
+        if self._fight_links is not NOT_LOADED and self._fight_links is not None:
+            return True
+        if self.store is not None:
+            return self.store.has_fight_links()
+        return self.FIGHT_LINKS_PICKLE_PATH.exists()
+
+    @property
+    def event_data(self) -> pd.DataFrame:
+        if self._event_data is NOT_LOADED:
+            self._event_data = self._read_event_data()
+        return self._event_data
+
+    @property
+    def fight_links(self) -> Optional[Dict[str, List[str]]]:
+        if self._fight_links is NOT_LOADED:
+            self._fight_links = self._read_fight_links()
+        return self._fight_links
+
+    def _read_event_data(self) -> pd.DataFrame:
+        # local event data, empty table if there's none yet
+        if self.store is not None:
+            if self.store.has_events():
+                return self.store.get_events()
+        elif self.EVENT_DATA_PATH.exists():
+            print(f"Reading local event data from {self.EVENT_DATA_PATH}")
+            return pd.read_csv(
+                self.EVENT_DATA_PATH, sep=";", parse_dates=["DATE"], index_col="ID"
+            )
+        return _empty_event_data()
+
+    def _read_fight_links(self) -> Optional[Dict[str, List[str]]]:
+        # load fight links if they already exist.
+        if self.store is not None:
+            if self.store.has_fight_links():
+                return self.store.get_fight_links()
+        elif self.FIGHT_LINKS_PICKLE_PATH.exists():
+            print(f"Loading local fight links from {self.FIGHT_LINKS_PICKLE_PATH}")
+            with open(self.FIGHT_LINKS_PICKLE_PATH, "rb") as event_fight_dict:
+                return pickle.load(event_fight_dict)
+        return None
+
+    ########
+    # changes
+
+    def set_event_data(
+        self, event_df: pd.DataFrame, changed_ids: Optional[Iterable[str]] = None
+    ) -> None:
+        # replaces event data. changed_ids are the rows that differ from what's
+        # on disk, all rows if None
+        self._event_data = event_df
+        self._dirty_event_ids.update(
+            event_df.index if changed_ids is None else changed_ids
+        )
+        self._flush_unless_batched()
+
+    def set_event_status(self, event_ids: Iterable[str], col: str, value: bool) -> None:
+        # sets a scraped flag, only events whose flag actually flips are dirty
+        event_df = self.event_data
+        rows = event_df.index.isin(list(event_ids))
+        changed = rows & (event_df[col] != value)
+        if changed.any():
+            self._dirty_event_ids.update(event_df.index[changed])
+            event_df.loc[changed, col] = value
+        self._flush_unless_batched()
+
+    def update_fight_links(self, new_fight_links: Dict[str, List[str]]) -> None:
+        # adds/replaces fight links of given events
+        fight_links = self.fight_links
+        if fight_links is None:
+            fight_links = {}
+        for event_link, links in new_fight_links.items():
+            if fight_links.get(event_link) != links:
+                self._dirty_event_links.add(event_link)
+            fight_links[event_link] = links
+        self._fight_links = fight_links
+        self._flush_unless_batched()
+
+    def set_fight_links(self, fight_links: Dict[str, List[str]]) -> None:
+        # replaces all fight links
+        self._fight_links = {}
+        self._fight_links_replaced = True
+        self.update_fight_links(fight_links)
+
+    ########
+    # writing
+
+    def is_dirty(self) -> bool:
+        return bool(
+            self._dirty_event_ids
+            or self._dirty_event_links
+            or self._fight_links_replaced
+        )
+
+    @contextmanager
+    def batch(self):
+        # defers flushing to the end of the (outermost) batch
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        self._flush_unless_batched()
+
+    def _flush_unless_batched(self) -> None:
+        if self._batch_depth == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        # writes dirty state, no-op when nothing changed
+        if self._dirty_event_ids:
+            self._write_event_data()
+            self._dirty_event_ids = set()
+        if self._dirty_event_links or self._fight_links_replaced:
+            self._write_fight_links()
+            self._dirty_event_links = set()
+            self._fight_links_replaced = False
+
+    def _write_event_data(self) -> None:
+        event_df = self._event_data
+        if self.store is not None:
+            dirty = event_df.index.intersection(list(self._dirty_event_ids))
+            self.store.upsert_events(event_df.loc[dirty])
+            return
+        with atomic_write(self.EVENT_DATA_PATH, newline="") as f:
+            event_df.to_csv(f, sep=";")
+
+    def _write_fight_links(self) -> None:
+        if self.store is not None and self._fight_links_replaced:
+            # links of events no longer in there have to go as well
+            self.store.replace_fight_links(self._fight_links)
+            return
+        if self.store is not None:
+            self.store.upsert_fight_links(
+                {link: self._fight_links[link] for link in self._dirty_event_links}
+            )
+            return
+        with atomic_write(self.FIGHT_LINKS_PICKLE_PATH, mode="wb") as f:
+            pickle.dump(self._fight_links, f)
+
+
+def _empty_event_data() -> pd.DataFrame:
+    event_df = pd.DataFrame(columns=event_cols)
+    event_df["DATE"] = pd.to_datetime(event_df["DATE"])
+    for col in ("FIGHT_LINKS_SCRAPED", "FIGHT_DATA_SCRAPED"):
+        event_df[col] = event_df[col].astype(bool)
+    return event_df.set_index("ID")
@@ -0,0 +1,338 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.ufctools.filepaths_and_schema import UFC_DB_PATH, event_cols
+from src.ufctools.stat_parsing import cast_stat_columns
+
+# single embedded sqlite store for events, fight links, fights and fighters.
+# replaces the csv/pickle files that get fully re-read and rewritten on every
+# update: writes here are upserts of just the new/changed rows, each in one
+# transaction, and lookups by event/fight/fighter id or date use indexes.
+#
+# fight and fighter rows are stored as json (fight schema varies with number
+# of rounds) next to the indexed key columns.
+
+# rows per executemany call for bulk inserts
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    ID TEXT PRIMARY KEY,
+    TITLE TEXT,
+    DATE TEXT,
+    LOCATION TEXT,
+    LINK TEXT,
+    FIGHT_LINKS_SCRAPED INTEGER NOT NULL DEFAULT 0,
+    FIGHT_DATA_SCRAPED INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS events_date ON events (DATE);
+
+CREATE TABLE IF NOT EXISTS fight_links (
+    FIGHT_LINK TEXT PRIMARY KEY,
+    EVENT_LINK TEXT NOT NULL,
+    POSITION INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fight_links_event ON fight_links (EVENT_LINK);
+
+CREATE TABLE IF NOT EXISTS fights (
+    FIGHT_ID TEXT PRIMARY KEY,
+    EVENT_ID TEXT NOT NULL,
+    POSITION INTEGER NOT NULL,
+    R_FIGHTER_ID TEXT,
+    B_FIGHTER_ID TEXT,
+    DATA TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fights_event ON fights (EVENT_ID);
+CREATE INDEX IF NOT EXISTS fights_r_fighter ON fights (R_FIGHTER_ID);
+CREATE INDEX IF NOT EXISTS fights_b_fighter ON fights (B_FIGHTER_ID);
+
+CREATE TABLE IF NOT EXISTS fighters (
+    FIGHTER_ID TEXT PRIMARY KEY,
+    FIGHTER TEXT,
+    FIGHTER_LINK TEXT,
+    SCRAPED_AT TEXT,
+    DATA TEXT NOT NULL
+);
+"""
+
+
+class UFCStore:
+    def __init__(self, db_path: Path = UFC_DB_PATH):
+        self.DB_PATH = Path(db_path)
+        self.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # crawler callbacks can run on a different thread than the one that
+        # opened the store, writes are serialized with a lock instead
+        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self):
+        # commits on success, rolls back everything on error
+        with self._lock:
+            with self.conn:
+                yield self.conn
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _read_sql(self, query: str, params=()) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(query, self.conn, params=params)
+
+    ########
+    # events
+
+    def has_events(self) -> bool:
+        with self._lock:
+            query = "SELECT 1 FROM events LIMIT 1"
+            return self.conn.execute(query).fetchone() is not None
+
+    def get_events(self) -> pd.DataFrame:
+        # same layout as event_data.csv (newest first)
+        event_df = self._read_sql(
+            f"SELECT {', '.join(event_cols)} FROM events ORDER BY DATE DESC, rowid"
+        )
+        event_df["DATE"] = pd.to_datetime(event_df["DATE"])
+        for col in ("FIGHT_LINKS_SCRAPED", "FIGHT_DATA_SCRAPED"):
+            event_df[col] = event_df[col].astype(bool)
+        return event_df.set_index("ID")
+
+    def upsert_events(self, event_df: pd.DataFrame) -> None:
+        rows = (
+            (
+                event_id,
+                row["TITLE"],
+                row["DATE"].strftime("%Y-%m-%d"),
+                row["LOCATION"],
+                row["LINK"],
+                int(row["FIGHT_LINKS_SCRAPED"]),
+                int(row["FIGHT_DATA_SCRAPED"]),
+            )
+            for event_id, row in event_df.iterrows()
+        )
+        with self.transaction() as conn:
+            _execute_batched(
+                conn,
+                f"INSERT OR REPLACE INTO events ({', '.join(event_cols)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    ########
+    # fight links
+
+    def has_fight_links(self) -> bool:
+        with self._lock:
+            query = "SELECT 1 FROM fight_links LIMIT 1"
+            return self.conn.execute(query).fetchone() is not None
+
+    def get_fight_links(self) -> Dict[str, List[str]]:
+        # same layout as fight_links.pickle, event link -> fight links in card order,
+        # events in listing order (newest first)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT l.EVENT_LINK, l.FIGHT_LINK FROM fight_links l "
+                "LEFT JOIN events e ON e.LINK = l.EVENT_LINK "
+                "ORDER BY e.DATE DESC, e.rowid, l.EVENT_LINK, l.POSITION"
+            ).fetchall()
+        fight_links = {}
+        for event_link, fight_link in rows:
+            fight_links.setdefault(event_link, []).append(fight_link)
+        return fight_links
+
+    def upsert_fight_links(self, fight_links: Dict[str, List[str]]) -> None:
+        # replaces the fight links of the given events (a fight dropped from a
+        # card is dropped here too), other events are left alone
+        with self.transaction() as conn:
+            _execute_batched(
+                conn,
+                "DELETE FROM fight_links WHERE EVENT_LINK = ?",
+                ((event_link,) for event_link in fight_links),
+            )
+            self._insert_fight_links(conn, fight_links)
+
+    def replace_fight_links(self, fight_links: Dict[str, List[str]]) -> None:
+        # replaces all fight links
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM fight_links")
+            self._insert_fight_links(conn, fight_links)
+
+    @staticmethod
+    def _insert_fight_links(conn, fight_links: Dict[str, List[str]]) -> None:
+        rows = (
+            (fight_link, event_link, position)
+            for event_link, links in fight_links.items()
+            for position, fight_link in enumerate(links)
+        )
+        _execute_batched(
+            conn,
+            "INSERT OR REPLACE INTO fight_links (FIGHT_LINK, EVENT_LINK, POSITION) "
+            "VALUES (?, ?, ?)",
+            rows,
+        )
+
+    ########
+    # fights
+
+    def commit_event_fights(self, event_id: str, records: List[dict]) -> None:
+        # fight rows and the event's FIGHT_DATA_SCRAPED flag in one transaction,
+        # so an event is either fully stored and flagged or not at all
+        with self.transaction() as conn:
+            self._upsert_fights(conn, event_id, records)
+            conn.execute(
+                "UPDATE events SET FIGHT_DATA_SCRAPED = 1 WHERE ID = ?", (event_id,)
+            )
+
+    def upsert_fights(self, event_id: str, records: Iterable[dict]) -> None:
+        with self.transaction() as conn:
+            self._upsert_fights(conn, event_id, records)
+
+    @staticmethod
+    def _upsert_fights(conn, event_id: str, records: Iterable[dict]) -> None:
+        rows = (
+            (
+                record["FIGHT_ID"],
+                event_id,
+                position,
+                record.get("R_FIGHTER_ID"),
+                record.get("B_FIGHTER_ID"),
+                json.dumps(record, default=str),
+            )
+            for position, record in enumerate(records)
+        )
+        _execute_batched(
+            conn,
+            "INSERT OR REPLACE INTO fights "
+            "(FIGHT_ID, EVENT_ID, POSITION, R_FIGHTER_ID, B_FIGHTER_ID, DATA) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def delete_fights(self) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM fights")
+            conn.execute("UPDATE events SET FIGHT_DATA_SCRAPED = 0")
+
+    def get_fights(
+        self,
+        fight_ids: Optional[Iterable[str]] = None,
+        event_ids: Optional[Iterable[str]] = None,
+        fighter_id: Optional[str] = None,
+        start_date=None,
+        end_date=None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Loads fights matching all given filters (all fights if none given).
+
+        Args:
+            fight_ids (Iterable[str], optional): only these fights
+            event_ids (Iterable[str], optional): only fights on these events
+            fighter_id (str, optional): only fights with this fighter in either corner
+            start_date (optional): only events on or after this date
+            end_date (optional): only events on or before this date
+
+        Returns:
+            pd.DataFrame: fight data indexed by FIGHT_ID, newest event first,
+            card order within event. None if no fights match.
+        """
+        where = []
+        params = []
+        if fight_ids is not None:
+            fight_ids = list(fight_ids)
+            where.append(f"f.FIGHT_ID IN ({', '.join('?' * len(fight_ids))})")
+            params += fight_ids
+        if event_ids is not None:
+            event_ids = list(event_ids)
+            where.append(f"f.EVENT_ID IN ({', '.join('?' * len(event_ids))})")
+            params += event_ids
+        if fighter_id is not None:
+            where.append("(f.R_FIGHTER_ID = ? OR f.B_FIGHTER_ID = ?)")
+            params += [fighter_id, fighter_id]
+        if start_date is not None:
+            where.append("e.DATE >= ?")
+            params.append(pd.Timestamp(start_date).strftime("%Y-%m-%d"))
+        if end_date is not None:
+            where.append("e.DATE <= ?")
+            params.append(pd.Timestamp(end_date).strftime("%Y-%m-%d"))
+
+        query = "SELECT f.DATA FROM fights f LEFT JOIN events e ON e.ID = f.EVENT_ID"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY e.DATE DESC, f.EVENT_ID, f.POSITION"
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        if not rows:
+            return None
+        fight_df = pd.DataFrame.from_records(
+            [json.loads(data) for (data,) in rows], index="FIGHT_ID"
+        )
+        return cast_stat_columns(fight_df)
+
+    ########
+    # fighters
+
+    def get_fighters(self) -> pd.DataFrame:
+        fighter_df = self._read_sql(
+            "SELECT FIGHTER_ID, FIGHTER, FIGHTER_LINK, SCRAPED_AT, DATA FROM fighters"
+        )
+        details = pd.DataFrame.from_records(
+            [json.loads(data) for data in fighter_df.pop("DATA")],
+            index=fighter_df.index,
+        )
+        fighter_df = pd.concat([fighter_df, details], axis=1)
+        fighter_df["SCRAPED_AT"] = pd.to_datetime(fighter_df["SCRAPED_AT"])
+        return fighter_df.set_index("FIGHTER_ID")
+
+    def upsert_fighters(self, fighter_df: pd.DataFrame) -> None:
+        detail_cols = [
+            col
+            for col in fighter_df.columns
+            if col not in ("FIGHTER", "FIGHTER_LINK", "SCRAPED_AT")
+        ]
+        rows = (
+            (
+                fighter_id,
+                row["FIGHTER"],
+                row["FIGHTER_LINK"],
+                None if pd.isna(row["SCRAPED_AT"]) else row["SCRAPED_AT"].isoformat(),
+                json.dumps(
+                    {
+                        col: None if pd.isna(row[col]) else row[col]
+                        for col in detail_cols
+                    },
+                    default=str,
+                ),
+            )
+            for fighter_id, row in fighter_df.iterrows()
+        )
+        with self.transaction() as conn:
+            _execute_batched(
+                conn,
+                "INSERT OR REPLACE INTO fighters "
+                "(FIGHTER_ID, FIGHTER, FIGHTER_LINK, SCRAPED_AT, DATA) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+
+def _execute_batched(conn, statement: str, rows: Iterable[tuple]) -> None:
+    # executemany in chunks so huge inserts don't build one giant list
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(statement, batch)
+            batch = []
+    if batch:
+        conn.executemany(statement, batch)
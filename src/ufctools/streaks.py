@@ -0,0 +1,115 @@
+from typing import Dict
+
+import numpy as np
+
+# win/loss records of many fighters at once. results of all fighters are laid
+# out back to back in one array (each fighter's fights oldest first), with a
+# flag marking where each fighter's fights start. streaks are runs of equal
+# results, so everything comes from where runs and fighters start:
+# - run length: position - position of the run's first fight
+# - longest streak: running max that restarts per fighter, done as one
+#   running max by lifting every fighter above the one before
+# - counts: running sum minus the running sum where the fighter started
+# a draw (or no contest) breaks both streaks and counts as neither win nor loss.
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+result_stats = [
+    "current_win_streak",
+    "current_lose_streak",
+    "longest_win_streak",
+    "wins",
+    "losses",
+    "draw",
+]
+
+
+def _segment_cumsum(values: np.ndarray, segment_id: np.ndarray) -> np.ndarray:
+    totals = np.cumsum(values)
+    before = totals - values
+    starts = np.flatnonzero(np.diff(segment_id, prepend=-1))
+    return totals - before[starts][segment_id]
+
+
+def streak_stats(
+    results: np.ndarray, fighter_start: np.ndarray, before: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Record of each fighter at every one of their fights.
+
+    Args:
+        results (np.ndarray): WIN, DRAW or LOSS per fight, grouped by fighter
+            and oldest fight first
+        fighter_start (np.ndarray): True at each fighter's first fight
+        before (bool): record going into each fight if True (first fights are
+            all 0), else record including it
+
+    Returns:
+        Dict[str, np.ndarray]: int arrays of result_stats, aligned with results
+    """
+    results = np.asarray(results)
+    fighter_start = np.asarray(fighter_start, dtype=bool).copy()
+    n = len(results)
+    if n == 0:
+        return {stat: np.zeros(0, dtype=np.int64) for stat in result_stats}
+    fighter_start[0] = True
+    fighter_id = np.cumsum(fighter_start) - 1
+
+    run_start = fighter_start.copy()
+    run_start[1:] |= results[1:] != results[:-1]
+    run_id = np.cumsum(run_start) - 1
+    run_len = np.arange(n) - np.flatnonzero(run_start)[run_id] + 1
+
+    won = results == WIN
+    lost = results == LOSS
+    win_streak = np.where(won, run_len, 0)
+    # streaks are at most n long, so lifting by n + 1 per fighter
+    # keeps a fighter's running max from carrying over to the next
+    lift = fighter_id * (n + 1)
+    longest = np.maximum.accumulate(win_streak + lift) - lift
+
+    stats = {
+        "current_win_streak": win_streak,
+        "current_lose_streak": np.where(lost, run_len, 0),
+        "longest_win_streak": longest,
+        "wins": _segment_cumsum(won.astype(np.int64), fighter_id),
+        "losses": _segment_cumsum(lost.astype(np.int64), fighter_id),
+        "draw": _segment_cumsum((results == DRAW).astype(np.int64), fighter_id),
+    }
+    if before:
+        for stat, values in stats.items():
+            shifted = np.zeros(n, dtype=np.int64)
+            shifted[1:] = values[:-1]
+            shifted[fighter_start] = 0
+            stats[stat] = shifted
+    return stats
+
+
+def next_record(record: np.ndarray, results: np.ndarray) -> np.ndarray:
+    """
+    Records after one more fight, e.g. to carry on from streak_stats(before=False).
+
+    Args:
+        record (np.ndarray): (fighters, result_stats) int record so far
+        results (np.ndarray): WIN, DRAW or LOSS of each fighter's next fight
+
+    Returns:
+        np.ndarray: (fighters, result_stats) records including that fight
+    """
+    record = np.asarray(record, dtype=np.int64)
+    won = results == WIN
+    lost = results == LOSS
+    win_streak, lose_streak, longest, wins, losses, draws = record.T
+    win_streak = np.where(won, win_streak + 1, 0)
+    return np.column_stack(
+        [
+            win_streak,
+            np.where(lost, lose_streak + 1, 0),
+            np.maximum(longest, win_streak),
+            wins + won,
+            losses + lost,
+            draws + (results == DRAW),
+        ]
+    )
@@ -0,0 +1,225 @@
+import random
+import threading
+import time
+from typing import Optional
+
+# flow control for the shared fetch session (see fetching.py):
+# - AdaptiveRateLimiter: token bucket + in-flight limit that back off on
+#   slow responses/429/5xx and creep back up while the site is healthy
+# - CircuitBreaker: pauses all fetching for a cooldown when most recent
+#   requests are failing, then lets a single probe through
+# - backoff_delay: jittered exponential backoff between retries
+
+
+class FetchError(Exception):
+    # raised once a page still fails after all retries, or fails for good (4xx)
+    pass
+
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = 0.5,
+    cap: float = 30.0,
+    retry_after: Optional[float] = None,
+) -> float:
+    # "full jitter" exponential backoff, spreads retries out so workers
+    # that failed together don't all come back at the same instant.
+    # a Retry-After from the server is treated as a floor.
+    delay = random.uniform(0, min(cap, base * 2**attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class AdaptiveRateLimiter:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_rate: float = 50.0,
+        min_rate: float = 0.5,
+        latency_tolerance: float = 3.0,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        latency_smoothing: float = 0.1,
+    ):
+        """
+        Args:
+            max_concurrency (int): ceiling on requests in flight (usually pool size)
+            min_concurrency (int): floor on requests in flight
+            max_rate (float): ceiling on requests per second
+            min_rate (float): floor on requests per second
+            latency_tolerance (float): response slower than this multiple of the
+                baseline latency counts as congestion
+            decrease_factor (float): multiplier applied to limit/rate on congestion
+            decrease_cooldown (float): min seconds between decreases, so a burst of
+                bad responses from one slow patch only backs off once
+            latency_smoothing (float): weight of each new latency in the baseline
+                (an ewma of recent successful full responses)
+        """
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.latency_smoothing = latency_smoothing
+
+        # start at the ceiling and only back off once the site pushes back
+        self.concurrency = float(max_concurrency)
+        self.rate = max_rate
+        self.in_flight = 0
+        # smoothed rather than the fastest latency ever seen, one fast error page
+        # would otherwise make every normal page look congested for good
+        self.baseline_latency = None
+
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        # bucket holds at most one second worth of tokens (and at least one token)
+        capacity = max(1.0, self.rate)
+        self._tokens = min(
+            capacity, self._tokens + (now - self._last_refill) * self.rate
+        )
+        self._last_refill = now
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.in_flight < int(self.concurrency) and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.in_flight += 1
+                    return
+                if self.in_flight >= int(self.concurrency):
+                    # woken by release
+                    self._cond.wait()
+                else:
+                    self._cond.wait((1 - self._tokens) / self.rate)
+
+    def release(self, latency: float, ok: bool, sample: bool = True) -> None:
+        # sample=False keeps latency out of the baseline, for responses that
+        # aren't a full page (e.g. 304s) and would drag it down
+        with self._cond:
+            self.in_flight -= 1
+            congested = (not ok) or (
+                self.baseline_latency is not None
+                and latency > self.latency_tolerance * self.baseline_latency
+            )
+            if ok and sample:
+                if self.baseline_latency is None:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency += self.latency_smoothing * (
+                        latency - self.baseline_latency
+                    )
+
+            now = time.monotonic()
+            if congested:
+                # multiplicative decrease
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._last_decrease = now
+                    self.concurrency = max(
+                        self.min_concurrency, self.concurrency * self.decrease_factor
+                    )
+                    if not ok:
+                        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            else:
+                # additive increase, roughly +1 in flight per window of successes
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + 1 / self.concurrency
+                )
+                self.rate = min(self.max_rate, self.rate + 1 / self.concurrency)
+            self._cond.notify_all()
+
+    def raise_ceiling(self, max_concurrency: int) -> None:
+        # for a pool grown mid-run. in-flight limit moves up by as much as the
+        # ceiling did, so a backed off limiter stays backed off relative to it
+        with self._cond:
+            if max_concurrency <= self.max_concurrency:
+                return
+            self.concurrency += max_concurrency - self.max_concurrency
+            self.max_concurrency = max_concurrency
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        window: int = 20,
+        failure_threshold: float = 0.5,
+        cooldown: float = 30.0,
+    ):
+        """
+        Args:
+            window (int): number of most recent requests considered
+            failure_threshold (float): failure fraction over window that opens breaker
+            cooldown (float): seconds fetching is paused once open
+        """
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.state = "closed"
+        self._results = []
+        self._opened_at = 0.0
+        self._probe_thread = None
+        self._cond = threading.Condition()
+
+    def wait(self) -> None:
+        # blocks while open. after cooldown one caller is let through as a probe,
+        # everybody else waits on its result.
+        with self._cond:
+            while True:
+                if self.state == "closed":
+                    return
+                remaining = self._opened_at + self.cooldown - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                elif self._probe_thread is None:
+                    self.state = "half-open"
+                    self._probe_thread = threading.get_ident()
+                    return
+                else:
+                    self._cond.wait()
+
+    def record(self, ok: bool) -> None:
+        with self._cond:
+            # only the probe's result decides whether to close again,
+            # stragglers from before the breaker opened are ignored
+            if self.state != "closed":
+                if self._probe_thread != threading.get_ident():
+                    return
+                self._probe_thread = None
+                if ok:
+                    self.state = "closed"
+                    self._results = []
+                else:
+                    self._open()
+                self._cond.notify_all()
+                return
+
+            self._results.append(ok)
+            self._results = self._results[-self.window :]
+            failures = self._results.count(False)
+            if (
+                self.state == "closed"
+                and len(self._results) >= self.window
+                and failures / len(self._results) >= self.failure_threshold
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        print(f"Too many failed requests, pausing for {self.cooldown:.0f}s")
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._results = []
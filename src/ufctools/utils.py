@@ -1,14 +1,41 @@
 # not sure if this needs to be seperate, but keeping it for now.
 
 import sys
-import requests
 from bs4 import BeautifulSoup
 
+from src.ufctools.fetching import fetch_text
+
+# html parser backend used by make_soup.
+# "lxml" is a good deal faster than the pure python html.parser
+# but needs lxml installed, so it's opt in via set_parser.
+PARSER_BACKENDS = ("html.parser", "lxml")
+_PARSER = "html.parser"
+
+
+def set_parser(parser: str) -> None:
+    global _PARSER
+    if parser not in PARSER_BACKENDS:
+        raise ValueError(f"parser must be one of {PARSER_BACKENDS}")
+    _PARSER = parser
+
+
+def get_parser() -> str:
+    return _PARSER
+
 
 def make_soup(url: str) -> BeautifulSoup:
-    source_code = requests.get(url, allow_redirects=False)
-    plain_text = source_code.text.encode("ascii", "replace")
-    return BeautifulSoup(plain_text, "html.parser")
+    # goes through shared pooled session (see fetching.py)
+    return parse_page(fetch_page(url))
+
+
+# make_soup split in its fetch and parse halves, so the two can run in
+# different places (see pipeline.py). raw pages are passed around as bytes.
+def fetch_page(url: str) -> bytes:
+    return fetch_text(url).encode("ascii", "replace")
+
+
+def parse_page(page: bytes) -> BeautifulSoup:
+    return BeautifulSoup(page, _PARSER)
 
 
 def print_progress(
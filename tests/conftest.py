@@ -0,0 +1,143 @@
+import random
+
+import pandas as pd
+import pytest
+
+from src.ufctools import fetching
+from src.ufctools.checkpoint import ScrapeJournal
+from src.ufctools.fightlog import FightLog
+from src.ufctools.fixtures import generate_synthetic_site
+from src.ufctools.scraping import FightDataScraper
+from src.ufctools.standin import StandInServer
+from src.ufctools.stat_parsing import time_to_seconds
+from src.ufctools.state import LinkState
+
+# stats of fights from make_fights, "landed of attempted" text
+fight_stats = [
+    "SIG_STR.",
+    "TOTAL_STR.",
+    "TD",
+    "HEAD",
+    "BODY",
+    "LEG",
+    "DISTANCE",
+    "CLINCH",
+    "GROUND",
+]
+fight_win_by = ["KO/TKO", "Submission", "Decision - Unanimous"]
+
+
+@pytest.fixture(scope="session")
+def site():
+    return generate_synthetic_site(n_events=6, fights_per_event=5, n_fighters=30)
+
+
+@pytest.fixture
+def make_fights():
+    # fights of a made up roster ("Fighter 0", "Fighter 1", ...) laid out like
+    # total_fight_data.csv (text stats as on the site), newest event first.
+    # events are 30 days apart, fights on an event share its date
+    def make_fights(n_events, fights_per_event=8, n_fighters=60, seed=0, first_event=0):
+        rng = random.Random(seed)
+        fighters = [f"Fighter {i}" for i in range(n_fighters)]
+        events = []
+        for event in range(first_event, first_event + n_events):
+            date = pd.Timestamp("2010-01-01") + pd.Timedelta(days=30 * event)
+            events.insert(
+                0, [_fight(rng, fighters, date) for _ in range(fights_per_event)]
+            )
+        return pd.DataFrame([fight for event in events for fight in event])
+
+    return make_fights
+
+
+@pytest.fixture
+def make_numeric_fights(make_fights):
+    # make_fights with the columns features are built from, as the preprocessor
+    # has them by then: date, landed counts, CTRL in seconds (NaN if missing),
+    # Winner "Draw" for draws, title_bout and win_by_ flags
+    def make_numeric_fights(*args, **kwargs):
+        fights = make_fights(*args, **kwargs)
+        numeric = fights[["R_fighter", "B_fighter", "last_round"]].copy()
+        numeric["date"] = pd.to_datetime(fights["date"], format="%B %d, %Y")
+        numeric["Winner"] = fights["Winner"].fillna("Draw")
+        numeric["title_bout"] = fights["Fight_type"].str.contains("Title Bout")
+        for corner in ("R", "B"):
+            numeric[f"{corner}_KD"] = fights[f"{corner}_KD"].astype(float)
+            numeric[f"{corner}_SIG_STR_landed"] = (
+                fights[f"{corner}_SIG_STR."].str.split(" of ").str[0].astype(float)
+            )
+            numeric[f"{corner}_CTRL"] = time_to_seconds(fights, [f"{corner}_CTRL"])[
+                f"{corner}_CTRL"
+            ].astype(float)
+        for win_by in fight_win_by:
+            numeric[f"win_by_{win_by.split(' - ')[0]}"] = fights["win_by"] == win_by
+        return numeric
+
+    return make_numeric_fights
+
+
+def _fight(rng, fighters, date):
+    red, blue = rng.sample(fighters, 2)
+    row = {"R_fighter": red, "B_fighter": blue}
+    for corner in ("R", "B"):
+        for stat in fight_stats:
+            attempted = rng.randint(0, 60)
+            row[f"{corner}_{stat}"] = f"{rng.randint(0, attempted)} of {attempted}"
+        row[f"{corner}_KD"] = rng.randint(0, 2)
+        row[f"{corner}_SIG_STR_pct"] = rng.choice(["50%", "33%", "---"])
+        row[f"{corner}_TD_pct"] = rng.choice(["0%", "25%", "---"])
+        row[f"{corner}_SUB_ATT"] = rng.randint(0, 2)
+        row[f"{corner}_REV"] = rng.randint(0, 1)
+        row[f"{corner}_CTRL"] = rng.choice(["1:23", "0:05", "12:41", "--"])
+    row.update(
+        win_by=rng.choice(fight_win_by),
+        last_round=rng.randint(1, 3),
+        last_round_time=f"{rng.randint(0, 4)}:{rng.randint(0, 59):02d}",
+        Format="3 Rnd (5-5-5)",
+        Referee="Herb Dean",
+        date=date.strftime("%B %d, %Y"),
+        location="Las Vegas, Nevada, USA",
+        Fight_type=rng.choice(["Lightweight Bout", "UFC Welterweight Title Bout"]),
+        # no winner is a draw
+        Winner=rng.choice([red, blue, red, blue, None]),
+    )
+    return row
+
+
+@pytest.fixture
+def server(site):
+    # stand-in ufcstats on localhost, fetched without the html cache
+    fetching.configure_session(pool_size=4, cache_mode="off", max_retries=0)
+    with StandInServer(site) as server:
+        yield server
+    fetching.configure_session()
+
+
+@pytest.fixture
+def make_scraper(server, tmp_path):
+    # FightDataScraper with all its files under tmp_path
+    def make_scraper(store=None):
+        scraper = FightDataScraper(
+            max_concurrency=4, base_url=server.base_url, store=store
+        )
+        scraper.events.EVENT_DATA_PATH = tmp_path / "event_data.csv"
+        scraper.events.FIGHT_LINKS_PICKLE_PATH = tmp_path / "fight_links.pickle"
+        scraper.events.state = LinkState(
+            event_data_path=scraper.events.EVENT_DATA_PATH,
+            fight_links_path=scraper.events.FIGHT_LINKS_PICKLE_PATH,
+            store=store,
+        )
+        if store is not None:
+            # nothing else touches disk
+            return scraper
+        scraper.FIGHT_DATA_PATH = tmp_path / "raw_fight_data.csv"
+        scraper.fight_log = FightLog(
+            base_path=scraper.FIGHT_DATA_PATH,
+            log_dir=tmp_path / "fight_log",
+            compact_after=None,
+        )
+        scraper._journal = ScrapeJournal(tmp_path / "scrape_journal.jsonl")
+        return scraper
+
+    return make_scraper
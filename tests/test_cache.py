@@ -0,0 +1,58 @@
+import pytest
+
+from src.ufctools.cache import CacheMissError, HTMLCache
+from src.ufctools.crawler import AsyncCrawler
+from src.ufctools.fetching import FetchSession
+from src.ufctools.throttle import FetchError
+
+
+def test_put_and_read(tmp_path):
+    cache = HTMLCache(tmp_path)
+    assert cache.get("http://a") is None
+    entry = cache.put("http://a", "<html>a</html>", etag='"1"')
+    assert cache.get("http://a") == entry
+    assert cache.get_text("http://a") == "<html>a</html>"
+
+
+def test_identical_pages_stored_once(tmp_path):
+    cache = HTMLCache(tmp_path)
+    a = cache.put("http://a", "<html>same</html>")
+    b = cache.put("http://b", "<html>same</html>")
+    assert a["content_hash"] == b["content_hash"]
+    assert len(list((tmp_path / "objects").rglob("*.html.gz"))) == 1
+
+
+def test_validator_headers_only_etag_and_last_modified(tmp_path):
+    cache = HTMLCache(tmp_path)
+    assert cache.validator_headers(None) == {}
+    entry = cache.put("http://a", "<html></html>")
+    assert cache.validator_headers(entry) == {}
+    entry = cache.put("http://a", "<html></html>", etag='"1"', last_modified="Sat")
+    assert cache.validator_headers(entry) == {
+        "If-None-Match": '"1"',
+        "If-Modified-Since": "Sat",
+    }
+
+
+def test_only_mode_serves_cache_and_raises_on_miss(tmp_path):
+    cache = HTMLCache(tmp_path)
+    cache.put("http://a", "<html>a</html>")
+    session = FetchSession(cache=cache, cache_mode="only")
+    assert session.get_text("http://a") == "<html>a</html>"
+    with pytest.raises(FetchError):
+        session.get_text("http://missing")
+    session.close()
+
+
+def test_cache_miss_leaves_event_unscraped():
+    def fight_fetcher(link):
+        if link == "fight-2":
+            raise CacheMissError(link)
+        return {"link": link}
+
+    fight_links = {"event-1": ["fight-1"], "event-2": ["fight-1", "fight-2"]}
+    links, records = AsyncCrawler(max_concurrency=2).crawl(
+        fight_links, fight_links.get, fight_fetcher
+    )
+    assert list(records) == ["event-1"]
+    assert list(links) == ["event-1"]
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from src.ufctools.columnar import ColumnarDataset
+
+
+@pytest.fixture
+def scraped(make_scraper, tmp_path):
+    # scrape with the dataset as export step
+    scraper = make_scraper()
+    scraper.dataset = ColumnarDataset(tmp_path / "dataset")
+    scraper.scrape_new_fights()
+    return scraper
+
+
+@pytest.fixture
+def dataset(scraped, tmp_path):
+    # scraped fights spread over three years
+    fight_df = scraped.dataset.read()
+    fight_df["EVENT_DATE"] = [
+        date.replace(year=2018 + i % 3) for i, date in enumerate(fight_df["EVENT_DATE"])
+    ]
+    dataset = ColumnarDataset(tmp_path / "years")
+    dataset.write(fight_df)
+    return dataset, fight_df
+
+
+def test_scrape_exports_to_dataset(scraped):
+    fight_df = scraped.dataset.read()
+    fight_data = scraped.fight_data
+    assert sorted(fight_df.index) == sorted(fight_data.index)
+    assert fight_df["EVENT_DATE"].notna().all()
+    fight_df = fight_df.loc[fight_data.index]
+    for col in ("R_FIGHTER", "WEIGHT_CLASS", "R_SIG_STR_LND_TOT", "B_CTRL_TOT"):
+        assert fight_df[col].tolist() == fight_data[col].tolist(), col
+
+
+def test_read_columns(dataset):
+    dataset, fight_df = dataset
+    got = dataset.read(columns=["WEIGHT_CLASS", "R_FIGHTER"])
+    assert got.index.name == "FIGHT_ID"
+    assert list(got.columns) == ["WEIGHT_CLASS", "R_FIGHTER"]
+    assert got.loc[fight_df.index, "R_FIGHTER"].tolist() == (
+        fight_df["R_FIGHTER"].tolist()
+    )
+
+
+def test_read_year_and_weight_class(dataset):
+    dataset, fight_df = dataset
+    assert dataset.years() == [2018, 2019, 2020]
+
+    got = dataset.read(start_date="2019-01-01", end_date="2019-12-31")
+    in_2019 = fight_df["EVENT_DATE"].dt.year == 2019
+    assert sorted(got.index) == sorted(fight_df.index[in_2019])
+
+    weight_class = fight_df["WEIGHT_CLASS"].iloc[0]
+    got = dataset.read(filters={"WEIGHT_CLASS": [weight_class]})
+    in_class = fight_df["WEIGHT_CLASS"] == weight_class
+    assert sorted(got.index) == sorted(fight_df.index[in_class])
+    # newest first
+    assert got["EVENT_DATE"].is_monotonic_decreasing
+
+
+def test_write_upserts(dataset):
+    dataset, fight_df = dataset
+    updated = fight_df.iloc[::2].copy()
+    updated["R_KD_TOT"] = 9
+    dataset.write(updated)
+
+    got = dataset.read()
+    assert got.index.is_unique
+    assert len(got) == len(fight_df)
+    assert (got.loc[updated.index, "R_KD_TOT"] == 9).all()
+    untouched = fight_df.index.difference(updated.index)
+    pd.testing.assert_series_equal(
+        got.loc[untouched, "R_KD_TOT"],
+        fight_df.loc[untouched, "R_KD_TOT"],
+        check_dtype=False,
+    )
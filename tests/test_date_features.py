@@ -0,0 +1,60 @@
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.ufctools.date_features import age_in_years, layoff_days
+
+
+def test_age_in_years():
+    rng = random.Random(0)
+    dates = pd.Series(
+        [
+            pd.Timestamp("2020-01-01") + pd.Timedelta(days=rng.randrange(0, 3000))
+            for _ in range(200)
+        ]
+    )
+    dob = pd.Series(
+        [
+            (
+                pd.NaT
+                if rng.random() < 0.1
+                else pd.Timestamp("1970-01-01")
+                + pd.Timedelta(days=rng.randrange(0, 12000))
+            )
+            for _ in range(200)
+        ]
+    )
+
+    def get_age(date, birth):
+        days = (date - birth).days
+        return np.nan if pd.isna(birth) else math.floor(days / 365.25)
+
+    expected = [get_age(date, birth) for date, birth in zip(dates, dob)]
+    assert np.allclose(age_in_years(dates, dob), expected, equal_nan=True)
+
+
+def test_layoff_days(make_numeric_fights):
+    # several fights on each date, a fighter can be on more than one
+    fights = make_numeric_fights(40, n_fighters=25)
+
+    # oldest fight first, fights lower down on the same date came first
+    last_date, longest = {}, {}
+    expected = {}
+    for idx in reversed(fights.index):
+        for prefix in ("R", "B"):
+            fighter = fights.loc[idx, f"{prefix}_fighter"]
+            date = fights.loc[idx, "date"]
+            days = (date - last_date[fighter]).days if fighter in last_date else np.nan
+            longest[fighter] = np.fmax(longest.get(fighter, np.nan), days)
+            last_date[fighter] = date
+            expected[(idx, f"{prefix}_days_since_last_fight")] = days
+            expected[(idx, f"{prefix}_longest_layoff")] = longest[fighter]
+
+    layoffs = layoff_days(fights)
+    for (idx, column), value in expected.items():
+        assert np.isclose(layoffs.loc[idx, column], value, equal_nan=True), (
+            idx,
+            column,
+        )
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from src.ufctools.date_features import layoff_days
+from src.ufctools.feature_store import FighterFeatureStore
+from src.ufctools.fighter_history import (
+    corner_frames,
+    fighter_fights_long,
+    history_features,
+)
+
+stats = ["KD", "SIG_STR_landed", "CTRL"]
+numerical_columns = [f"{side}_{stat}" for side in ("hero", "opp") for stat in stats]
+win_by_columns = ["win_by_KO/TKO", "win_by_Submission", "win_by_Decision"]
+
+
+def _assert_same(got, want):
+    assert list(got.columns) == list(want.columns)
+    for column in got.columns:
+        if column == "hero_fighter":
+            assert got[column].tolist() == want[column].tolist()
+        else:
+            assert np.allclose(
+                got[column].astype(float),
+                want[column].astype(float),
+                rtol=1e-5,
+                equal_nan=True,
+            ), column
+
+
+def test_update_matches_full_rebuild(make_numeric_fights):
+    fights = make_numeric_fights(50, n_fighters=40)
+    spans, career = (3, 5), True
+    long = fighter_fights_long(fights)
+    features = history_features(long, numerical_columns, win_by_columns, spans, career)
+    red, blue = corner_frames(long, features)
+
+    # built from the oldest fights, then two batches of newer ones
+    batches = [fights.iloc[300:], fights.iloc[150:300], fights.iloc[:150]]
+    store = FighterFeatureStore.from_fights(
+        batches[0], numerical_columns, win_by_columns, spans, career
+    )
+    for batch in batches[1:]:
+        assert store.is_new(batch).all()
+        assert store.can_update(batch)
+        new_red, new_blue = store.update(batch)
+        _assert_same(new_red, red.loc[batch.index])
+        _assert_same(new_blue, blue.loc[batch.index])
+    assert not store.is_new(fights).any()
+
+
+def test_layoff_days_matches_full_rebuild(make_numeric_fights):
+    fights = make_numeric_fights(50, n_fighters=40)
+    # batches split an event, so a date is shared by old and new fights
+    assert fights.loc[299, "date"] == fights.loc[300, "date"]
+    expected = layoff_days(fights)
+
+    batches = [fights.iloc[300:], fights.iloc[150:300], fights.iloc[:150]]
+    store = FighterFeatureStore.from_fights(
+        batches[0], numerical_columns, win_by_columns
+    )
+    for batch in batches[1:]:
+        got = store.layoff_days(batch)
+        _assert_same(got, expected.loc[batch.index])
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.ufctools import fetching
+from src.ufctools.standin import StandInServer
+from src.ufctools.throttle import FetchError
+
+
+@pytest.fixture(autouse=True)
+def default_session():
+    yield
+    fetching.configure_session()
+
+
+def test_grow_pool_while_fetching(site):
+    fetching.configure_session(pool_size=2, cache_mode="off", max_retries=0)
+    session = fetching.get_session()
+    urls = list(site.pages) * 3
+    # latency keeps requests in flight on the old pool while it's swapped out
+    with StandInServer(site, latency=0.02) as server:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [
+                pool.submit(fetching.fetch_text, server.base_url + url) for url in urls
+            ]
+            assert fetching.ensure_pool_size(8) is session
+            pages = [future.result() for future in futures]
+    assert all(pages)
+    assert session.pool_size == 8
+    assert session.limiter.max_concurrency == 8
+    # never shrinks
+    fetching.ensure_pool_size(4)
+    assert session.pool_size == 8
+
+
+def test_missing_page_raises_without_retrying(server):
+    session = fetching.configure_session(pool_size=4, cache_mode="off", max_retries=3)
+    with pytest.raises(FetchError, match="status 404"):
+        session.get_text(server.base_url + "/no-such-page")
+    assert server.request_count == 1
+
+
+def test_error_status_retried_then_raises(site):
+    session = fetching.configure_session(pool_size=4, cache_mode="off", max_retries=1)
+    with StandInServer(site, error_rate=1.0, error_status=503) as server:
+        with pytest.raises(FetchError, match="2 attempts"):
+            session.get_text(server.base_url + list(site.pages)[0])
+        assert server.request_count == 2
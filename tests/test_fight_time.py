@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.ufctools.fight_time import round_seconds, total_time_fought
+
+# table the legacy preprocessor looked formats up in, minus the entries it had
+# wrong ("1 Rnd (20)" as 20 seconds, "1 Rnd + OT (31-5)" as 155 seconds)
+time_in_first_round = {
+    "3 Rnd (5-5-5)": 5 * 60,
+    "5 Rnd (5-5-5-5-5)": 5 * 60,
+    "1 Rnd + OT (12-3)": 12 * 60,
+    "No Time Limit": 1,
+    "3 Rnd + OT (5-5-5-5)": 5 * 60,
+    "2 Rnd (5-5)": 5 * 60,
+    "1 Rnd (15)": 15 * 60,
+    "1 Rnd (10)": 10 * 60,
+    "1 Rnd (12)": 12 * 60,
+    "1 Rnd + OT (30-5)": 30 * 60,
+    "1 Rnd (18)": 18 * 60,
+    "1 Rnd + OT (15-3)": 15 * 60,
+    "1 Rnd (30)": 30 * 60,
+    "1 Rnd + OT (27-3)": 27 * 60,
+    "1 Rnd + OT (30-3)": 30 * 60,
+}
+
+exception_format_time = {
+    "1 Rnd + 2OT (15-3-3)": [15 * 60, 3 * 60],
+    "1 Rnd + 2OT (24-3-3)": [24 * 60, 3 * 60],
+}
+
+
+def get_total_time(row):
+    if row["Format"] in time_in_first_round:
+        return (row["last_round"] - 1) * time_in_first_round[row["Format"]] + row[
+            "last_round_time"
+        ]
+    if (row["last_round"] - 1) >= 2:
+        return (
+            exception_format_time[row["Format"]][0]
+            + (row["last_round"] - 2) * exception_format_time[row["Format"]][1]
+            + row["last_round_time"]
+        )
+    return (row["last_round"] - 1) * exception_format_time[row["Format"]][0] + row[
+        "last_round_time"
+    ]
+
+
+def test_total_time_fought():
+    rng = random.Random(0)
+    rows = []
+    for _ in range(500):
+        time_format = rng.choice(
+            list(time_in_first_round) + list(exception_format_time)
+        )
+        # no time limit fights can go any number of rounds
+        n_rounds = (
+            5 if time_format == "No Time Limit" else len(round_seconds(time_format))
+        )
+        rows.append(
+            {
+                "Format": time_format,
+                "last_round": rng.randint(1, n_rounds),
+                "last_round_time": rng.randint(0, 300),
+            }
+        )
+    fights = pd.DataFrame(rows)
+
+    seconds = total_time_fought(
+        fights["Format"], fights["last_round"], fights["last_round_time"]
+    )
+    assert np.allclose(seconds, fights.apply(get_total_time, axis=1))
+
+
+def test_total_time_fought_unknown():
+    fights = pd.DataFrame(
+        {
+            "Format": ["No Time Limit", "No Time Limit", "3 Rnd (5-5-5)", "Who knows"],
+            "last_round": [1, 3, 4, 1],
+            "last_round_time": [754, 10, 10, 10],
+        }
+    )
+    seconds = total_time_fought(
+        fights["Format"], fights["last_round"], fights["last_round_time"]
+    )
+    # each round past the first of a no time limit fight is a second
+    assert seconds[:2].tolist() == [754, 12]
+    assert seconds[2:].isna().all()
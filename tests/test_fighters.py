@@ -0,0 +1,22 @@
+from src.ufctools import fighters
+from src.ufctools.fighters import FighterDetailsRefresher, fighters_in_fights
+
+
+def test_refresh_fighters_in_new_fights(make_scraper, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        fighters, "FIGHTER_DETAILS_DATA_PATH", tmp_path / "raw_fighter_details.csv"
+    )
+    new_fights = make_scraper().scrape_new_fights()
+    in_fights = fighters_in_fights(new_fights)
+
+    refreshed = FighterDetailsRefresher(max_concurrency=4).refresh(new_fights)
+    assert sorted(refreshed.index) == sorted(in_fights.index)
+    assert refreshed["SCRAPED_AT"].notna().all()
+    assert list(refreshed["FIGHTER_LINK"]) == list(
+        in_fights.loc[refreshed.index, "FIGHTER_LINK"]
+    )
+
+    # saved details are picked up, nothing left to refresh without new fights
+    refresher = FighterDetailsRefresher(max_concurrency=4)
+    assert sorted(refresher.fighter_details.index) == sorted(in_fights.index)
+    assert refresher.refresh(None).empty
@@ -0,0 +1,64 @@
+import threading
+
+import pandas as pd
+
+from src.ufctools import fightlog
+from src.ufctools.fightlog import FightLog
+
+
+def _fights(fight_ids, kd):
+    return pd.DataFrame(
+        {"R_KD_TOT": kd, "DETAILS": "X"}, index=pd.Index(fight_ids, name="FIGHT_ID")
+    )
+
+
+def _kd(log):
+    return log.read()["R_KD_TOT"].to_dict()
+
+
+def test_last_write_wins_across_compaction(tmp_path):
+    log = FightLog(tmp_path / "base.csv", tmp_path / "log", compact_after=None)
+    log.append(_fights(["c", "a", "b"], 0))
+    log.append(_fights(["b"], 1))
+    log.compact()
+    assert log.segments() == []
+    # base is sorted
+    assert pd.read_csv(log.BASE_PATH, sep=";")["FIGHT_ID"].tolist() == ["a", "b", "c"]
+    assert _kd(log) == {"a": 0, "b": 1, "c": 0}
+
+    # segments win over base, newer segments over older ones
+    log.append(_fights(["a", "b"], 2))
+    log.append(_fights(["a", "d"], 3))
+    assert _kd(log) == {"a": 3, "b": 2, "c": 0, "d": 3}
+    log.compact()
+    assert _kd(log) == {"a": 3, "b": 2, "c": 0, "d": 3}
+
+
+def test_append_during_background_compaction(tmp_path, monkeypatch):
+    log = FightLog(tmp_path / "base.csv", tmp_path / "log", compact_after=None)
+    log.append(_fights(["a", "b"], 0))
+    log.append(_fights(["b", "c"], 1))
+
+    # holds the compaction after it has read the segments, before it writes
+    merged, resume = threading.Event(), threading.Event()
+    merge = fightlog._merge
+
+    def held_merge(frames):
+        if threading.current_thread() is not threading.main_thread():
+            merged.set()
+            resume.wait(5)
+        return merge(frames)
+
+    monkeypatch.setattr(fightlog, "_merge", held_merge)
+    compaction = log.compact_in_background()
+    assert merged.wait(5)
+    racing_segment = log.append(_fights(["a", "d"], 2))
+    assert _kd(log) == {"a": 2, "b": 1, "c": 1, "d": 2}
+    resume.set()
+    compaction.join()
+
+    # only the segments it merged are gone
+    assert log.segments() == [racing_segment]
+    assert _kd(log) == {"a": 2, "b": 1, "c": 1, "d": 2}
+    log.compact()
+    assert _kd(log) == {"a": 2, "b": 1, "c": 1, "d": 2}
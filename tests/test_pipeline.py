@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from src.ufctools import pipeline
+from src.ufctools.pipeline import FetchParsePipeline
+
+
+def parse_upper(url, page, context):
+    if context == "bad":
+        raise ValueError(url)
+    return page.upper()
+
+
+@pytest.fixture
+def fetch_log(monkeypatch):
+    # fetch_page stand-in: "slow" urls take a while, "fail" urls raise
+    log = []
+    lock = threading.Lock()
+
+    def fetch_page(url):
+        if url.startswith("slow"):
+            time.sleep(0.5)
+        if url.startswith("fail"):
+            raise IOError(url)
+        with lock:
+            log.append(url)
+        return url.encode()
+
+    monkeypatch.setattr(pipeline, "fetch_page", fetch_page)
+    return log
+
+
+def test_results_in_input_order(fetch_log):
+    items = [(f"page{i}", None) for i in range(30)]
+    items[3] = ("fail3", None)
+    items[5] = ("page5", "bad")
+    results = list(
+        FetchParsePipeline(io_workers=4, parse_workers=2).run(items, parse_upper)
+    )
+    assert [url for url, _, _, _ in results] == [url for url, _ in items]
+    for url, _, result, error in results:
+        if url in ("fail3", "page5"):
+            assert result is None and error is not None
+        else:
+            assert result == url.upper().encode() and error is None
+
+
+def test_slow_head_does_not_run_ahead(fetch_log):
+    # window: max_buffered + 2 * parse_workers
+    runner = FetchParsePipeline(io_workers=4, parse_workers=1, max_buffered=2)
+    window = 2 + 2
+    items = [("slow0", None)] + [(f"page{i}", None) for i in range(1, 50)]
+    results = runner.run(items, parse_upper)
+    url, _, _, _ = next(results)
+    assert url == "slow0"
+    # only pages inside the window got fetched while the head was stuck
+    assert len(fetch_log) <= window
+    assert len(list(results)) == 49
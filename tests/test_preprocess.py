@@ -0,0 +1,137 @@
+import random
+
+import pandas as pd
+import pytest
+
+from src.ufctools.feature_store import FighterFeatureStore
+from src.ufctools.legacy.preprocess import Preprocessor
+
+# legacy text csvs (as the legacy scrapers write them) for a made up roster
+
+# career stats, dropped by the preprocessor
+future_cols = [
+    "SLpM",
+    "Str_Acc",
+    "SApM",
+    "Str_Def",
+    "TD_Avg",
+    "TD_Acc",
+    "TD_Def",
+    "Sub_Avg",
+]
+
+
+class LegacyData:
+    def __init__(self, tmp_path, make_fights, n_fighters=60, seed=0):
+        self.tmp_path = tmp_path
+        self.make_fights = make_fights
+        self.n_fighters = n_fighters
+        self.rng = random.Random(seed)
+        self.fighters = [f"Fighter {i}" for i in range(n_fighters)]
+        self.fights = pd.DataFrame()
+        self.n_events = 0
+        details = pd.DataFrame(
+            {
+                "Height": [
+                    self.rng.choice(["5' 11\"", "6' 2\""]) for _ in self.fighters
+                ],
+                "Weight": ["155 lbs."] * n_fighters,
+                "Reach": [self.rng.choice(['72"', '70"', None]) for _ in self.fighters],
+                "Stance": [
+                    self.rng.choice(["Orthodox", "Southpaw", None])
+                    for _ in self.fighters
+                ],
+                "DOB": ["Jul 13, 1988"] * n_fighters,
+            },
+            index=pd.Index(self.fighters, name="fighter_name"),
+        )
+        details[future_cols] = 0
+        details.to_csv(tmp_path / "fighter_details.csv")
+
+    def add_events(self, n_events, fights_per_event=8):
+        # newer events go on top
+        new_fights = self.make_fights(
+            n_events,
+            fights_per_event,
+            self.n_fighters,
+            seed=self.n_events,
+            first_event=self.n_events,
+        )
+        self.fights = pd.concat([new_fights, self.fights], ignore_index=True)
+        self.n_events += n_events
+        self.fights.to_csv(self.tmp_path / "total_fight_data.csv", sep=";", index=False)
+
+    def preprocessor(self):
+        preprocessor = Preprocessor()
+        preprocessor.FIGHTER_DETAILS_PATH = self.tmp_path / "fighter_details.csv"
+        preprocessor.TOTAL_EVENT_AND_FIGHTS_PATH = (
+            self.tmp_path / "total_fight_data.csv"
+        )
+        preprocessor.UFC_DATA_PATH = self.tmp_path / "data.csv"
+        preprocessor.PREPROCESSED_DATA_PATH = self.tmp_path / "preprocessed_data.csv"
+        preprocessor.FEATURE_STORE_PATH = self.tmp_path / "feature_store.pickle"
+        return preprocessor
+
+    def outputs(self):
+        return (
+            pd.read_csv(self.tmp_path / "data.csv"),
+            pd.read_csv(self.tmp_path / "preprocessed_data.csv"),
+        )
+
+
+@pytest.fixture
+def legacy_data(tmp_path, make_fights):
+    data = LegacyData(tmp_path, make_fights)
+    data.add_events(30)
+    data.preprocessor().process_raw_data()
+    data.add_events(2)
+    return data
+
+
+def _full_rebuild(legacy_data):
+    legacy_data.preprocessor().process_raw_data()
+    return legacy_data.outputs()
+
+
+def test_incremental_matches_full_rebuild(legacy_data):
+    legacy_data.preprocessor().process_raw_data(incremental=True, verify=True)
+    data, preprocessed = legacy_data.outputs()
+    assert len(data) == len(legacy_data.fights)
+
+    full_data, full_preprocessed = _full_rebuild(legacy_data)
+    pd.testing.assert_frame_equal(data, full_data, check_dtype=False)
+    assert list(preprocessed.columns) == list(full_preprocessed.columns)
+    assert len(preprocessed) == len(full_preprocessed)
+
+
+def test_nothing_new(legacy_data):
+    legacy_data.preprocessor().process_raw_data(incremental=True)
+    before = legacy_data.outputs()
+    legacy_data.preprocessor().process_raw_data(incremental=True)
+    for got, want in zip(legacy_data.outputs(), before):
+        pd.testing.assert_frame_equal(got, want)
+
+
+@pytest.mark.parametrize("files_written", [1, 2])
+def test_rerun_after_interrupted_run(legacy_data, monkeypatch, files_written):
+    # stops after writing one or both files, before the feature store is saved
+    save = Preprocessor._save
+    calls = []
+
+    def interrupted_save(self, *args, **kwargs):
+        if len(calls) == files_written:
+            raise KeyboardInterrupt
+        calls.append(1)
+        save(self, *args, **kwargs)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Preprocessor, "_save", interrupted_save)
+        patch.setattr(FighterFeatureStore, "save", interrupted_save)
+        with pytest.raises(KeyboardInterrupt):
+            legacy_data.preprocessor().process_raw_data(incremental=True)
+
+    legacy_data.preprocessor().process_raw_data(incremental=True, verify=True)
+    data, preprocessed = legacy_data.outputs()
+    full_data, full_preprocessed = _full_rebuild(legacy_data)
+    pd.testing.assert_frame_equal(data, full_data, check_dtype=False)
+    assert len(preprocessed) == len(full_preprocessed)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from src.ufctools.fighter_history import fighter_fights_long
+from src.ufctools.ragged_ewm import CAREER, FighterHistories
+
+
+def test_ewm_before_matches_pandas(make_numeric_fights):
+    # CTRL is missing in some fights
+    long = fighter_fights_long(make_numeric_fights(40, n_fighters=30))
+    histories = FighterHistories.from_long(
+        long, ["hero_KD", "hero_SIG_STR_landed", "hero_CTRL", "opp_CTRL"]
+    )
+    spans = (3, 5)
+    averages = histories.ewm_before(spans, career=True)
+
+    for start, end in zip(histories.offsets[:-1], histories.offsets[1:]):
+        fights = pd.DataFrame(histories.values[start:end].astype(float))
+        for i in range(end - start):
+            # what the legacy preprocessor took: ewm of every fight before, last row
+            before = fights.iloc[:i]
+            for span in spans:
+                expected = (
+                    before.ewm(span=span, adjust=False).mean().tail(1).to_numpy()
+                    if i
+                    else np.full((1, fights.shape[1]), np.nan)
+                )
+                assert np.allclose(
+                    averages[span][start + i], expected[0], rtol=1e-5, equal_nan=True
+                )
+            assert np.allclose(
+                averages[CAREER][start + i],
+                before.mean().to_numpy(),
+                rtol=1e-5,
+                equal_nan=True,
+            )
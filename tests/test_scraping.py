@@ -0,0 +1,165 @@
+import pandas as pd
+import pytest
+
+from src.ufctools import fetching, fixtures, scraping
+from src.ufctools.fightlog import FightLog
+from src.ufctools.fixtures import generate_synthetic_site
+from src.ufctools.scraping import UFCLinks, new_fight_cols
+from src.ufctools.standin import StandInServer
+from src.ufctools.state import LinkState
+
+
+def _n_fights(site):
+    return sum(path.startswith("/fight-details/") for path in site.pages)
+
+
+def test_scrape_new_fights(site, make_scraper, monkeypatch):
+    # small segments so the journal is moved over in several
+    monkeypatch.setattr(scraping, "SEGMENT_ROWS", 7)
+    scraper = make_scraper()
+    new_fights = scraper.scrape_new_fights()
+
+    assert list(new_fights.columns) == new_fight_cols[1:]
+    assert new_fights.index.name == "FIGHT_ID"
+    assert len(new_fights) == _n_fights(site)
+    assert len(scraper.fight_log.segments()) > 1
+    assert len(scraper.journal) == 0
+    assert scraper.events.EVENT_DATA["FIGHT_DATA_SCRAPED"].all()
+
+    fight_data = scraper.fight_data
+    assert sorted(fight_data.index) == sorted(new_fights.index)
+    assert fight_data["R_SIG_STR_LND_TOT"].dtype == "Int16"
+
+    # nothing left on a second run
+    assert make_scraper().scrape_new_fights() is None
+
+
+def test_scrape_resumes_from_journal(site, make_scraper):
+    scraper = make_scraper()
+    scraper.refresh()
+    event_id, event_link = next(iter(scraper.events.EVENT_DATA["LINK"].items()))
+    fight_links = scraper.events.FIGHT_LINKS[event_link]
+    records = [scraper.get_fight_stats(link) for link in fight_links]
+    scraper.journal.commit(event_id, event_link, fight_links, records)
+    scraper.journal.close()
+
+    # e.g. crashed after appending the journal but before clearing it
+    scraper.fight_log.append_records(records)
+
+    scraper = make_scraper()
+    new_fights = scraper.scrape_new_fights()
+    assert len(new_fights) == _n_fights(site)
+    fight_data = scraper.fight_data
+    assert fight_data.index.is_unique
+    assert len(fight_data) == _n_fights(site)
+
+
+def test_append_records_matches_append(tmp_path):
+    records = [
+        {"FIGHT_ID": "a", "R_KD_TOT": 1, "R_KD_R1": 1, "DETAILS": "X"},
+        {"FIGHT_ID": "b", "R_KD_TOT": None, "DETAILS": "Y", "R_KD_R2": 0},
+    ]
+    from_records = FightLog(tmp_path / "a.csv", tmp_path / "a", compact_after=None)
+    from_records.append_records(records)
+    from_frame = FightLog(tmp_path / "b.csv", tmp_path / "b", compact_after=None)
+    from_frame.append(pd.DataFrame.from_records(records, index="FIGHT_ID"))
+    pd.testing.assert_frame_equal(from_records.read(), from_frame.read())
+
+
+########
+# event discovery
+
+
+@pytest.fixture
+def paged_site(request, monkeypatch):
+    # listing split over three pages (plus the empty one past the end)
+    monkeypatch.setattr(fixtures, "EVENTS_PER_PAGE", 2)
+    site = generate_synthetic_site(n_events=6, fights_per_event=1, n_fighters=10)
+    if getattr(request, "param", None) == "repeat_last_page":
+        # e.g. a site that serves its last page for anything past the end
+        listing = "/statistics/events/completed?page="
+        site.pages[f"{listing}4"] = site.pages[f"{listing}3"]
+    return site
+
+
+@pytest.fixture
+def make_links(paged_site, tmp_path, monkeypatch):
+    # UFCLinks against paged_site, recording listing urls it pulls
+    fetching.configure_session(pool_size=4, cache_mode="off", max_retries=0)
+    pulled = []
+    scrape_events_page = UFCLinks._scrape_events_page
+
+    def recording_scrape_events_page(self, events_url):
+        if events_url is not None:
+            pulled.append(events_url.split("page=")[-1])
+        return scrape_events_page(self, events_url)
+
+    monkeypatch.setattr(UFCLinks, "_scrape_events_page", recording_scrape_events_page)
+
+    with StandInServer(paged_site) as server:
+
+        def make_links(**kwargs):
+            links = UFCLinks(base_url=server.base_url, **kwargs)
+            links.EVENT_DATA_PATH = tmp_path / "event_data.csv"
+            links.FIGHT_LINKS_PICKLE_PATH = tmp_path / "fight_links.pickle"
+            links.state = LinkState(
+                event_data_path=links.EVENT_DATA_PATH,
+                fight_links_path=links.FIGHT_LINKS_PICKLE_PATH,
+            )
+            pulled.clear()
+            return links, pulled
+
+        yield make_links
+    fetching.configure_session()
+
+
+def _listing_ids(links):
+    return list(links._scrape_all_events().index)
+
+
+def test_discovery_stops_at_first_known_event(make_links):
+    links, pulled = make_links()
+    event_ids = _listing_ids(links)
+    pulled.clear()
+    new_events = links._scrape_new_events(pd.Index(event_ids[3:]))
+    assert list(new_events.index) == event_ids[:3]
+    # known event is on page 2
+    assert pulled == ["1", "2"]
+
+
+def test_discovery_stops_on_empty_page(make_links):
+    links, pulled = make_links()
+    event_ids = _listing_ids(links)
+    pulled.clear()
+    new_events = links._scrape_new_events(pd.Index([]))
+    assert list(new_events.index) == event_ids
+    assert pulled == ["1", "2", "3", "4"]
+
+
+@pytest.mark.parametrize("paged_site", ["repeat_last_page"], indirect=True)
+def test_discovery_stops_on_repeated_page(make_links):
+    links, pulled = make_links()
+    event_ids = _listing_ids(links)
+    pulled.clear()
+    new_events = links._scrape_new_events(pd.Index([]))
+    assert list(new_events.index) == event_ids
+    assert pulled == ["1", "2", "3", "4"]
+
+
+def test_full_rescan_pulls_whole_listing(make_links):
+    links, pulled = make_links()
+    links.refresh()
+    event_data = links.EVENT_DATA
+    # drop the two newest events, as if scraped before they happened
+    with links.state.batch():
+        links.state.set_event_data(event_data.iloc[2:])
+
+    links, pulled = make_links(full_rescan=True)
+    refreshed = links.refresh()
+    assert pulled == ["all"]
+    assert list(refreshed.index) == list(event_data.index)
+
+    # without full_rescan, the newest page is enough
+    links, pulled = make_links()
+    links.refresh()
+    assert pulled == ["1"]
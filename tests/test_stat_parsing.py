@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from src.ufctools.stat_parsing import (
+    pct_to_fraction,
+    split_landed_of_attempted,
+    time_to_seconds,
+)
+
+# checked against the row by row conversions legacy/preprocess.py used to do
+
+
+def test_split_landed_of_attempted(make_fights):
+    df = make_fights(25)[["R_SIG_STR.", "B_SIG_STR.", "R_TD", "B_TD", "R_GROUND"]]
+    landed, attempted = split_landed_of_attempted(df, list(df.columns))
+    for col in df.columns:
+        assert landed[col].tolist() == [int(x.split("of")[0]) for x in df[col]]
+        assert attempted[col].tolist() == [int(x.split("of")[1]) for x in df[col]]
+        assert landed[col].dtype == np.int64
+
+
+def test_pct_to_fraction(make_fights):
+    def pct_to_frac(X):
+        if X != "---":
+            return float(X.replace("%", "")) / 100
+        return 0
+
+    df = make_fights(25)[["R_SIG_STR_pct", "B_SIG_STR_pct", "R_TD_pct", "B_TD_pct"]]
+    fractions = pct_to_fraction(df, list(df.columns)).fillna(0)
+    for col in df.columns:
+        assert np.allclose(fractions[col], df[col].apply(pct_to_frac))
+
+
+def test_time_to_seconds(make_fights):
+    def conv_to_sec(X):
+        if X != "--":
+            return int(X.split(":")[0]) * 60 + int(X.split(":")[1])
+        return 0
+
+    df = make_fights(25)[["R_CTRL", "B_CTRL"]]
+    seconds = time_to_seconds(df, list(df.columns)).fillna(0).astype("int64")
+    for col in df.columns:
+        assert seconds[col].tolist() == df[col].apply(conv_to_sec).tolist()
+
+    # no missing cells, ints straight away
+    df = pd.DataFrame({"last_round_time": ["5:00", "0:07", "12:34"]})
+    seconds = time_to_seconds(df, ["last_round_time"])["last_round_time"]
+    assert seconds.tolist() == [300, 7, 754]
+    assert seconds.dtype == np.int64
@@ -0,0 +1,150 @@
+import pandas as pd
+import pytest
+
+from src.ufctools.fileio import atomic_write
+from src.ufctools.state import LinkState
+from src.ufctools.storage import UFCStore
+
+
+def _event_data(n_events=4):
+    ids = [f"event{i}" for i in range(n_events)]
+    return pd.DataFrame(
+        {
+            "TITLE": [f"UFC {i}" for i in range(n_events)],
+            "DATE": pd.date_range("2020-01-01", periods=n_events)[::-1],
+            "LOCATION": "LAS VEGAS, NEVADA, USA",
+            "LINK": [f"http://ufcstats.com/event-details/{i}" for i in ids],
+            "FIGHT_LINKS_SCRAPED": False,
+            "FIGHT_DATA_SCRAPED": [True, False, True, False][:n_events],
+        },
+        index=pd.Index(ids, name="ID"),
+    )
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    # files written by LinkState, in order
+    writes = []
+    write_event_data = LinkState._write_event_data
+    write_fight_links = LinkState._write_fight_links
+
+    def counted_write_event_data(self):
+        writes.append("event_data")
+        write_event_data(self)
+
+    def counted_write_fight_links(self):
+        writes.append("fight_links")
+        write_fight_links(self)
+
+    monkeypatch.setattr(LinkState, "_write_event_data", counted_write_event_data)
+    monkeypatch.setattr(LinkState, "_write_fight_links", counted_write_fight_links)
+    return writes
+
+
+def _state(tmp_path, store=None):
+    return LinkState(
+        event_data_path=tmp_path / "event_data.csv",
+        fight_links_path=tmp_path / "fight_links.pickle",
+        store=store,
+    )
+
+
+def test_flush_without_changes_writes_nothing(tmp_path, writes):
+    state = _state(tmp_path)
+    state.flush()
+    state.set_event_data(_event_data())
+    writes.clear()
+
+    state.flush()
+    with state.batch():
+        pass
+    assert writes == []
+    assert not state.is_dirty()
+
+
+def test_set_event_status_only_dirties_flipped_rows(tmp_path):
+    state = _state(tmp_path)
+    with state.batch():
+        state.set_event_data(_event_data())
+        state.flush()
+        # event0/event2 already scraped
+        state.set_event_status(
+            ["event0", "event1", "event2"], "FIGHT_DATA_SCRAPED", True
+        )
+        assert state._dirty_event_ids == {"event1"}
+    assert not state.is_dirty()
+
+    reread = _state(tmp_path).event_data
+    assert reread["FIGHT_DATA_SCRAPED"].tolist() == [True, True, True, False]
+
+
+def test_nested_batch_writes_each_file_once(tmp_path, writes):
+    state = _state(tmp_path)
+    event_df = _event_data()
+    with state.batch():
+        state.set_event_data(event_df)
+        with state.batch():
+            state.update_fight_links({event_df["LINK"].iloc[0]: ["fight0"]})
+            state.set_event_status(["event0"], "FIGHT_LINKS_SCRAPED", True)
+        # inner batch ending doesn't write
+        assert writes == []
+        state.update_fight_links({event_df["LINK"].iloc[1]: ["fight1"]})
+    assert sorted(writes) == ["event_data", "fight_links"]
+
+    reread = _state(tmp_path)
+    assert len(reread.fight_links) == 2
+    assert reread.event_data["FIGHT_LINKS_SCRAPED"].tolist() == [
+        True,
+        False,
+        False,
+        False,
+    ]
+
+
+def test_store_upserts_only_dirty_rows(tmp_path, monkeypatch):
+    store = UFCStore(tmp_path / "ufc.db")
+    state = _state(tmp_path, store=store)
+    event_df = _event_data()
+    state.set_event_data(event_df)
+    state.set_fight_links({link: [f"{link}/fight"] for link in event_df["LINK"]})
+
+    upserted = []
+    upsert_events = store.upsert_events
+    upsert_fight_links = store.upsert_fight_links
+
+    def recording_upsert_events(df):
+        upserted.extend(df.index)
+        upsert_events(df)
+
+    def recording_upsert_fight_links(fight_links):
+        upserted.extend(fight_links)
+        upsert_fight_links(fight_links)
+
+    monkeypatch.setattr(store, "upsert_events", recording_upsert_events)
+    monkeypatch.setattr(store, "upsert_fight_links", recording_upsert_fight_links)
+
+    with state.batch():
+        state.set_event_status(["event1", "event2"], "FIGHT_DATA_SCRAPED", True)
+        state.update_fight_links({event_df.at["event3", "LINK"]: ["new fight"]})
+    assert upserted == ["event1", event_df.at["event3", "LINK"]]
+
+    assert store.get_events()["FIGHT_DATA_SCRAPED"].tolist() == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert store.get_fight_links()[event_df.at["event3", "LINK"]] == ["new fight"]
+    store.close()
+
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("half written")
+            raise RuntimeError
+    assert path.read_text() == "old"
+    # temp file cleaned up
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,72 @@
+import pytest
+
+from src.ufctools.storage import UFCStore
+
+
+def _n_fights(site):
+    return sum(path.startswith("/fight-details/") for path in site.pages)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = UFCStore(tmp_path / "ufc.db")
+    yield store
+    store.close()
+
+
+def test_scrape_into_store(site, make_scraper, store):
+    new_fights = make_scraper(store).scrape_new_fights()
+    assert len(new_fights) == _n_fights(site)
+    assert new_fights["R_SIG_STR_LND_TOT"].dtype == "Int16"
+
+    events = store.get_events()
+    assert events["FIGHT_LINKS_SCRAPED"].all()
+    assert events["FIGHT_DATA_SCRAPED"].all()
+    # listing order, like fight_links.pickle
+    assert list(store.get_fight_links()) == list(events["LINK"])
+    assert sorted(store.get_fights().index) == sorted(new_fights.index)
+
+    # nothing left on a second run
+    assert make_scraper(store).scrape_new_fights() is None
+
+
+def test_commit_event_fights_is_all_or_nothing(make_scraper, store):
+    scraper = make_scraper(store)
+    scraper.refresh()
+    event_id, event_link = next(iter(store.get_events()["LINK"].items()))
+    records = [
+        scraper.get_fight_stats(link) for link in store.get_fight_links()[event_link]
+    ]
+    # fails part way through the insert
+    del records[-1]["FIGHT_ID"]
+    with pytest.raises(KeyError):
+        store.commit_event_fights(event_id, records)
+    assert store.get_fights() is None
+    assert not store.get_events().at[event_id, "FIGHT_DATA_SCRAPED"]
+
+
+def test_get_fights_by_fighter(make_scraper, store):
+    fights = make_scraper(store).scrape_new_fights()
+    fighter_id = fights["R_FIGHTER_ID"].iloc[0]
+    in_fight = (fights["R_FIGHTER_ID"] == fighter_id) | (
+        fights["B_FIGHTER_ID"] == fighter_id
+    )
+    fighter_fights = store.get_fights(fighter_id=fighter_id)
+    assert sorted(fighter_fights.index) == sorted(fights.index[in_fight])
+
+
+def test_fight_links_replaced_per_event(make_scraper, store):
+    scraper = make_scraper(store)
+    scraper.refresh()
+    fight_links = store.get_fight_links()
+    first, second = list(fight_links)[:2]
+
+    # e.g. a fight dropped from the card
+    store.upsert_fight_links({first: fight_links[first][1:]})
+    assert store.get_fight_links()[first] == fight_links[first][1:]
+    assert store.get_fight_links()[second] == fight_links[second]
+
+    # set_fight_links replaces all of them
+    state = make_scraper(store).events.state
+    state.set_fight_links({second: fight_links[second]})
+    assert store.get_fight_links() == {second: fight_links[second]}
@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+
+from src.ufctools.streaks import (
+    DRAW,
+    LOSS,
+    WIN,
+    next_record,
+    result_stats,
+    streak_stats,
+)
+
+
+def get_result_stats(result_list):
+    # legacy/preprocess_fighter_data.py's record of a fighter, oldest fight first
+    current_win_streak = 0
+    current_lose_streak = 0
+    longest_win_streak = 0
+    wins = 0
+    losses = 0
+    draw = 0
+    for result in result_list:
+        if result == WIN:
+            wins += 1
+            current_win_streak += 1
+            current_lose_streak = 0
+            if longest_win_streak < current_win_streak:
+                longest_win_streak += 1
+        elif result == LOSS:
+            losses += 1
+            current_win_streak = 0
+            current_lose_streak += 1
+        elif result == DRAW:
+            draw += 1
+            current_lose_streak = 0
+            current_win_streak = 0
+    return [
+        current_win_streak,
+        current_lose_streak,
+        longest_win_streak,
+        wins,
+        losses,
+        draw,
+    ]
+
+
+def _careers(n_fighters=40, seed=0):
+    rng = random.Random(seed)
+    return [
+        rng.choices([WIN, LOSS, DRAW], weights=[5, 4, 1], k=rng.randint(1, 30))
+        for _ in range(n_fighters)
+    ]
+
+
+def test_streak_stats():
+    careers = _careers()
+    results = np.concatenate(careers)
+    fighter_start = np.zeros(len(results), dtype=bool)
+    fighter_start[np.cumsum([0] + [len(c) for c in careers[:-1]])] = True
+
+    before = streak_stats(results, fighter_start)
+    after = streak_stats(results, fighter_start, before=False)
+    row = 0
+    for career in careers:
+        for i in range(len(career)):
+            assert [before[s][row] for s in result_stats] == get_result_stats(
+                career[:i]
+            )
+            assert [after[s][row] for s in result_stats] == get_result_stats(
+                career[: i + 1]
+            )
+            row += 1
+
+
+def test_next_record():
+    careers = _careers()
+    longest = max(len(career) for career in careers)
+    record = np.zeros((len(careers), len(result_stats)), dtype=np.int64)
+    for k in range(longest):
+        # fighters whose career is still going, one fight each
+        fighters = [f for f, career in enumerate(careers) if len(career) > k]
+        results = np.array([careers[f][k] for f in fighters])
+        record[fighters] = next_record(record[fighters], results)
+    for fighter, career in enumerate(careers):
+        assert record[fighter].tolist() == get_result_stats(career)
@@ -0,0 +1,187 @@
+import threading
+import time
+
+import pytest
+
+from src.ufctools.throttle import AdaptiveRateLimiter, CircuitBreaker, backoff_delay
+
+
+def _request(limiter, latency, ok=True, sample=True):
+    limiter.acquire()
+    limiter.release(latency, ok=ok, sample=sample)
+
+
+########
+# AdaptiveRateLimiter
+
+
+def test_limiter_one_fast_response_does_not_collapse_concurrency():
+    limiter = AdaptiveRateLimiter(max_concurrency=8, max_rate=1e6, decrease_cooldown=0)
+    for _ in range(20):
+        _request(limiter, 0.2)
+    # e.g. a tiny error page
+    _request(limiter, 0.001)
+    for _ in range(50):
+        _request(limiter, 0.2)
+    assert limiter.concurrency == 8
+
+
+def test_limiter_baseline_follows_latency_up():
+    limiter = AdaptiveRateLimiter(max_concurrency=8, max_rate=1e6, decrease_cooldown=0)
+    for _ in range(20):
+        _request(limiter, 0.1)
+    for _ in range(100):
+        _request(limiter, 0.5)
+    assert limiter.baseline_latency == pytest.approx(0.5, rel=0.01)
+    # slower pages are the new normal, so concurrency recovers
+    for _ in range(100):
+        _request(limiter, 0.5)
+    assert limiter.concurrency == 8
+
+
+def test_limiter_skips_unsampled_latencies():
+    limiter = AdaptiveRateLimiter(max_rate=1e6)
+    _request(limiter, 0.2)
+    for _ in range(50):
+        _request(limiter, 0.001, sample=False)
+    assert limiter.baseline_latency == 0.2
+
+
+def test_limiter_backs_off_on_congestion():
+    limiter = AdaptiveRateLimiter(
+        max_concurrency=8, max_rate=1000, decrease_factor=0.5, decrease_cooldown=0
+    )
+    _request(limiter, 0.1)
+    _request(limiter, 1.0)
+    # slow response only cuts concurrency
+    assert limiter.concurrency == pytest.approx(4, abs=0.2)
+    assert limiter.rate == 1000
+    rate = limiter.rate
+    _request(limiter, 0.1, ok=False)
+    assert limiter.concurrency == pytest.approx(2, abs=0.2)
+    assert limiter.rate == pytest.approx(rate / 2)
+
+
+def test_limiter_decrease_cooldown():
+    limiter = AdaptiveRateLimiter(max_concurrency=8, max_rate=1e6, decrease_cooldown=60)
+    for _ in range(5):
+        _request(limiter, 0.1, ok=False)
+    assert limiter.concurrency == 4
+
+
+def test_limiter_floors():
+    limiter = AdaptiveRateLimiter(
+        max_concurrency=8,
+        min_concurrency=2,
+        max_rate=1e6,
+        min_rate=1e3,
+        decrease_cooldown=0,
+    )
+    for _ in range(20):
+        _request(limiter, 0.1, ok=False)
+    assert limiter.concurrency == 2
+    assert limiter.rate == 1e3
+
+
+def test_limiter_caps_in_flight():
+    limiter = AdaptiveRateLimiter(max_concurrency=2, max_rate=1e6)
+    limiter.acquire()
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def third():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=third)
+    thread.start()
+    assert not acquired.wait(0.1)
+    limiter.release(0.1, ok=True)
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.in_flight == 2
+
+
+########
+# CircuitBreaker
+
+
+def _open_breaker(cooldown):
+    breaker = CircuitBreaker(window=4, failure_threshold=0.5, cooldown=cooldown)
+    for ok in (True, True, False, False):
+        breaker.record(ok)
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_breaker_opens_on_failures_in_window():
+    breaker = CircuitBreaker(window=4, failure_threshold=0.5, cooldown=1)
+    for ok in (True, True, True, False):
+        breaker.record(ok)
+    assert breaker.state == "closed"
+    breaker.record(False)
+    assert breaker.state == "open"
+
+
+def test_breaker_waits_out_cooldown():
+    breaker = _open_breaker(cooldown=0.2)
+    start = time.monotonic()
+    breaker.wait()
+    assert time.monotonic() - start >= 0.15
+    assert breaker.state == "half-open"
+
+
+def test_breaker_lets_single_probe_through():
+    breaker = _open_breaker(cooldown=0)
+    breaker.wait()  # this thread is the probe
+    passed = threading.Event()
+
+    def other():
+        breaker.wait()
+        passed.set()
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    assert not passed.wait(0.1)
+
+    breaker.record(True)
+    assert passed.wait(1)
+    thread.join()
+    assert breaker.state == "closed"
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = _open_breaker(cooldown=0)
+    breaker.wait()
+    breaker.cooldown = 60
+    breaker.record(False)
+    assert breaker.state == "open"
+
+
+def test_breaker_ignores_stragglers():
+    breaker = _open_breaker(cooldown=0)
+    breaker.wait()
+    # result of a request that started before the breaker opened
+    thread = threading.Thread(target=breaker.record, args=(True,))
+    thread.start()
+    thread.join()
+    assert breaker.state == "half-open"
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+########
+# backoff_delay
+
+
+@pytest.mark.parametrize("attempt", range(8))
+def test_backoff_delay_bounds(attempt):
+    for _ in range(50):
+        delay = backoff_delay(attempt, base=0.5, cap=10)
+        assert 0 <= delay <= min(10, 0.5 * 2**attempt)
+
+
+def test_backoff_delay_retry_after_is_floor():
+    for _ in range(50):
+        assert backoff_delay(0, retry_after=5) == 5
+    assert backoff_delay(20, base=1, cap=30, retry_after=0) <= 30
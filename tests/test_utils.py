@@ -0,0 +1,41 @@
+import pytest
+
+from src.ufctools import utils
+from src.ufctools.fighters import parse_fighter_page
+from src.ufctools.fixtures import generate_synthetic_site
+from src.ufctools.scraping import FightDataScraper
+
+
+@pytest.fixture
+def parser():
+    yield utils.set_parser
+    utils.set_parser("html.parser")
+
+
+def test_set_parser_rejects_unknown(parser):
+    with pytest.raises(ValueError):
+        parser("html5lib")
+
+
+def test_parser_backends_extract_the_same(parser):
+    pytest.importorskip("lxml")
+    site = generate_synthetic_site(n_events=2, fights_per_event=4, n_fighters=20)
+    # extractors don't touch network, no need to go through __init__
+    scraper = FightDataScraper.__new__(FightDataScraper)
+
+    def extract():
+        out = {}
+        for path, html in site.pages.items():
+            page = html.encode("ascii", "replace")
+            if path.startswith("/fight-details/"):
+                soup = utils.parse_page(page)
+                out[path] = scraper.parse_fight_page(path, soup)
+            elif path.startswith("/fighter-details/"):
+                out[path] = parse_fighter_page(path, page, path)
+        return out
+
+    parser("html.parser")
+    expected = extract()
+    parser("lxml")
+    assert extract() == expected
+    assert len(expected) > 8